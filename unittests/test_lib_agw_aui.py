@@ -29,6 +29,71 @@ class lib_agw_aui_Tests(wtc.WidgetTestCase):
                           .Bottom())
         self._mgr.Update()
 
+    def test_lib_agw_auiGetPane(self):
+        self._mgr = aui.AuiManager()
+        self._mgr.SetManagedWindow(self.frame)
+
+        panes = []
+        for ii in range(4):
+            pane = wx.Panel(self.frame)
+            self._mgr.AddPane(pane, aui.AuiPaneInfo().Name("pane%d" % ii).Left())
+            panes.append(pane)
+
+        self.assertTrue(self._mgr.GetPane("pane2").window is panes[2])
+        self.assertEqual(self._mgr.GetPane(panes[3]).name, "pane3")
+        self.assertFalse(self._mgr.GetPane("pane9").IsOk())
+
+        self._mgr.DetachPane(panes[1])
+        self.assertFalse(self._mgr.GetPane("pane1").IsOk())
+        self.assertFalse(self._mgr.GetPane(panes[1]).IsOk())
+        self.assertTrue(self._mgr.GetPane("pane2").window is panes[2])
+
+        self._mgr.GetPane("pane3").Name("renamed")
+        self.assertFalse(self._mgr.GetPane("pane3").IsOk())
+        self.assertTrue(self._mgr.GetPane("renamed").window is panes[3])
+
+    def test_lib_agw_auiBatch(self):
+        self._mgr = aui.AuiManager()
+        self._mgr.SetManagedWindow(self.frame)
+
+        for ii in range(3):
+            self._mgr.AddPane(wx.Panel(self.frame), aui.AuiPaneInfo().Name("pane%d" % ii).Left())
+        self._mgr.Update()
+        self.myYield()
+
+        updates = []
+        self._mgr.DoUpdate = lambda: updates.append(1)
+
+        with aui.AuiUpdateLocker(self._mgr):
+            for ii in range(3):
+                self._mgr.ShowPane(self._mgr.GetPane("pane%d" % ii).window, False)
+            self.assertEqual(self._mgr.GetBatchCount(), 1)
+        self.myYield()
+
+        self.assertEqual(self._mgr.GetBatchCount(), 0)
+        self.assertEqual(len(updates), 1)
+
+    def test_lib_agw_auiHitTest(self):
+        self._mgr = aui.AuiManager()
+        self._mgr.SetManagedWindow(self.frame)
+        self.frame.SetSize((800, 600))
+
+        self._mgr.AddPane(wx.Panel(self.frame), aui.AuiPaneInfo().Name("center").CenterPane())
+        for ii in range(6):
+            self._mgr.AddPane(wx.Panel(self.frame), aui.AuiPaneInfo().Name("pane%d" % ii)
+                              .Caption("A pane").Left().Row(ii % 2))
+        self._mgr.Update()
+        self.myYield()
+
+        for pane in self._mgr.GetAllPanes():
+            rect = pane.rect
+            pt = wx.Point(rect.x + rect.width//2, rect.y + rect.height//2)
+            self.assertTrue(self._mgr.PaneHitTest(self._mgr.GetAllPanes(), pt) is pane)
+            part = self._mgr.HitTest(pt.x, pt.y)
+            self.assertTrue(part.pane is pane)
+
+        self.assertTrue(self._mgr.HitTest(-100, -100) is None)
+
     def tearDown(self):
         self._mgr.UnInit()
 
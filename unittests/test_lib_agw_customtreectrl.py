@@ -112,6 +112,132 @@ class lib_agw_customtreectrl_Tests(wtc.WidgetTestCase):
         else:
             self.assertEqual(len(tree.GetChildren()), 0)
 
+    def test_lib_agw_customtreectrlRows(self):
+        tree = CT.CustomTreeCtrl(self.frame)
+        root = tree.AddRoot('root item')
+        for i in range(5):
+            child = tree.AppendItem(root, 'child %d' % i)
+            for j in range(3):
+                tree.AppendItem(child, 'grandchild %d' % j)
+        tree.CalculatePositions()
+        tree._dirty = False
+
+        child = tree.GetLastChild(root)
+        tree.Expand(root)
+        self.assertEqual(tree.GetRowIndex(child), 5)
+        tree.Expand(tree.GetFirstChild(root)[0])
+        self.assertEqual(tree.GetRowIndex(child), 8)
+        self.assertEqual(tree.GetRowIndex(tree.GetLastChild(child)), -1)
+
+        rows = list(tree._rows)
+        tree.CalculatePositions()
+        self.assertEqual(list(tree._rows), rows)
+        for n, item in enumerate(rows):
+            self.assertEqual(item.GetY(), 2 + n * tree.GetLineHeight(item))
+
+    def test_lib_agw_customtreectrlRowBlocks(self):
+        tree = CT.CustomTreeCtrl(self.frame)
+        root = tree.AddRoot('root item')
+        children = [tree.AppendItem(root, 'child %d' % i) for i in range(1000)]
+        for child in children:
+            tree.AppendItem(child, 'grandchild')
+        tree.CalculatePositions()
+        tree._dirty = False
+
+        tree.Expand(root)
+        for child in children[::3]:
+            tree.Expand(child)
+        tree.Collapse(children[300])
+        tree.Expand(children[301])
+
+        rows = list(tree._rows)
+        tree.CalculatePositions()
+        self.assertEqual(list(tree._rows), rows)
+        y = 2
+        for n, item in enumerate(rows):
+            self.assertEqual(tree.GetRowIndex(item), n)
+            self.assertEqual(item.GetY(), y)
+            y += tree.GetLineHeight(item)
+
+        item = children[999]
+        self.assertEqual(tree._rows.GetRowAt(item.GetY() + 1), item)
+        self.assertEqual(item.HitTestRow((item.GetX() + 1, item.GetY() + 1), tree)[0], item)
+
+    def test_lib_agw_customtreectrlChildrenProvider(self):
+        def provider(item):
+            depth = tree.GetItemData(item)
+            return [('item %d' % i, depth < 2, depth + 1) for i in range(3)]
+
+        tree = CT.CustomTreeCtrl(self.frame)
+        tree.SetChildrenProvider(provider)
+        root = tree.AddRoot('root item', data=0)
+        tree.SetItemHasChildren(root)
+        self.assertEqual(tree.GetChildrenCount(root), 0)
+
+        tree.Expand(root)
+        self.assertEqual(tree.GetChildrenCount(root, False), 3)
+        child = tree.GetFirstChild(root)[0]
+        self.assertEqual(tree.GetItemText(child), 'item 0')
+        tree.Expand(child)
+        self.assertEqual(tree.GetChildrenCount(child, False), 3)
+        grandchild = tree.GetFirstChild(child)[0]
+        self.assertFalse(tree.ItemHasChildren(grandchild))
+
+        tree.SetMaxCollapsedItems(0)
+        tree.Collapse(child)
+        self.assertEqual(tree.GetChildrenCount(child), 0)
+        self.assertTrue(tree.ItemHasChildren(child))
+        tree.Expand(child)
+        self.assertEqual(tree.GetChildrenCount(child, False), 3)
+
+    def test_lib_agw_customtreectrlCollapsedBranchesDeleted(self):
+        def provider(item):
+            return [('item %d' % i, True, None) for i in range(3)]
+
+        tree = CT.CustomTreeCtrl(self.frame)
+        tree.SetChildrenProvider(provider)
+        tree.SetMaxCollapsedItems(100)
+        root = tree.AddRoot('root item')
+        tree.SetItemHasChildren(root)
+        tree.Expand(root)
+
+        first, second = root.GetChildren()[:2]
+        for item in (first, second):
+            tree.Expand(item)
+            tree.Collapse(item)
+        self.assertEqual(len(tree._collapsedBranches), 2)
+
+        tree.Delete(first)
+        self.assertEqual(len(tree._collapsedBranches), 1)
+        tree.CollapseAndReset(second)
+        self.assertEqual(len(tree._collapsedBranches), 0)
+
+    def test_lib_agw_customtreectrlLabelIndex(self):
+        tree = CT.CustomTreeCtrl(self.frame)
+        root = tree.AddRoot('root item')
+        apple = tree.AppendItem(root, 'Apple')
+        tree.AppendItem(apple, 'pineapple')
+        banana = tree.AppendItem(root, 'banana')
+        tree.EnableLabelIndex()
+        self.assertTrue(tree.IsLabelIndexEnabled())
+
+        self.assertEqual(tree.SearchItems('ap'), [apple])
+        self.assertEqual([tree.GetItemText(item) for item in
+                          tree.SearchItems('apple', substring=True)],
+                         ['Apple', 'pineapple'])
+        self.assertEqual(tree.FindItem(root, 'ban'), banana)
+
+        avocado = tree.AppendItem(root, 'avocado')
+        tree.SetItemText(banana, 'apricot')
+        self.assertEqual(tree.SearchItems('a'), [apple, banana, avocado])
+        tree.Delete(apple)
+        self.assertEqual(tree.SearchItems('a'), [banana, avocado])
+        self.assertEqual(tree.SearchItems('pine'), [])
+
+        tree.EnableLabelIndex(False)
+        self.assertFalse(tree.IsLabelIndexEnabled())
+        self.assertEqual(tree.SearchItems('a'), [banana, avocado])
+
     def test_lib_agw_customtreectrlConstantsExist(self):
         CT.TR_NO_BUTTONS
         CT.TR_SINGLE
@@ -48,6 +48,19 @@ class lib_agw_hypertreelist_Tests(wtc.WidgetTestCase):
         tree.SetColumnEditable(0, True)
         self.assertTrue(tree.IsColumnEditable(0))
 
+    def test_lib_agw_hypertreelistChildrenProvider(self):
+        tree = HTL.HyperTreeList(self.frame)
+        tree.AddColumn("First column")
+        tree.AddColumn("Second column")
+        tree.SetChildrenProvider(lambda item: [(['name', 'value'], False)])
+
+        root = tree.AddRoot('root item')
+        tree.SetItemHasChildren(root)
+        tree.Expand(root)
+        child = tree.GetFirstChild(root)[0]
+        self.assertEqual(tree.GetItemText(child), 'name')
+        self.assertEqual(tree.GetItemText(child, 1), 'value')
+
     def test_lib_agw_hypertreelistConstantsExist(self):
         HTL.TR_ALIGN_WINDOWS
         HTL.TR_AUTO_CHECK_CHILD
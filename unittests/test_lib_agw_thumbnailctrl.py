@@ -1,6 +1,11 @@
 import unittest
 from unittests import wtc
 import wx
+import os
+import shutil
+import tempfile
+import threading
+import time
 
 import wx.lib.agw.thumbnailctrl as TNC
 
@@ -11,6 +16,109 @@ class lib_agw_thumbnailctrl_Tests(wtc.WidgetTestCase):
     def test_lib_agw_thumbnailctrlCtor(self):
         tnc = TNC.ThumbnailCtrl(self.frame, -1, imagehandler=TNC.NativeImageHandler)
 
+    def test_lib_agw_thumbnailctrlCache(self):
+        folder = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(folder, 'image.png')
+            wx.Image(40, 30).SaveFile(filename, wx.BITMAP_TYPE_PNG)
+
+            cache = TNC.ThumbnailCache(os.path.join(folder, 'cache'))
+            key = cache.GetKey(filename, (300, 240))
+            self.assertEqual(key, cache.GetKey(filename, (300, 240)))
+            self.assertNotEqual(key, cache.GetKey(filename, (150, 120)))
+            self.assertTrue(cache.Load(key) is None)
+
+            img, originalsize, alpha = TNC.NativeImageHandler().LoadThumbnail(filename, (300, 240))
+            cache.Save(key, img, originalsize, alpha)
+            img, originalsize, alpha = cache.Load(key)
+            self.assertEqual(originalsize, (40, 30))
+            self.assertEqual(img.GetSize(), wx.Size(40, 30))
+
+            cache.Clear()
+            self.assertTrue(cache.Load(key) is None)
+        finally:
+            shutil.rmtree(folder)
+
+    def test_lib_agw_thumbnailctrlCacheDir(self):
+        folder = tempfile.mkdtemp()
+        try:
+            tnc = TNC.ThumbnailCtrl(self.frame, -1, imagehandler=TNC.NativeImageHandler)
+            self.assertTrue(tnc.GetCacheDir() is None)
+            tnc.SetCacheDir(folder)
+            self.assertEqual(tnc.GetCacheDir(), folder)
+            tnc.SetCacheDir(None)
+            self.assertTrue(tnc.GetCacheDir() is None)
+        finally:
+            shutil.rmtree(folder)
+
+    def test_lib_agw_thumbnailctrlBitmapCache(self):
+        scrolled = TNC.ScrolledThumbnail(self.frame, -1, imagehandler=TNC.NativeImageHandler)
+        thumb = TNC.Thumb(scrolled, os.getcwd(), 'image.png')
+        scrolled.OnThumbLoaded(thumb, (wx.Image(200, 160), (200, 160), False))
+
+        bmp = scrolled.GetThumbBitmap(thumb)
+        self.assertEqual(bmp.GetSize(), wx.Size(96, 76))
+        self.assertTrue(scrolled.GetThumbBitmap(thumb) is bmp)
+        self.assertTrue(scrolled.GetThumbBitmap(thumb, True) is not bmp)
+
+        scrolled.SetThumbSize(48, 40)
+        self.assertEqual(scrolled.GetThumbBitmap(thumb).GetSize(), wx.Size(48, 38))
+
+        scrolled.OnThumbLoaded(thumb, (wx.Image(200, 160), (200, 160), False))
+        scrolled.SetThumbSize(96, 80)
+        self.assertTrue(scrolled.GetThumbBitmap(thumb) is not bmp)
+
+        scrolled.SetBitmapCacheSize(0)
+        bmp = scrolled.GetThumbBitmap(thumb)
+        self.assertTrue(scrolled.GetThumbBitmap(thumb) is not bmp)
+
+    def test_lib_agw_thumbnailctrlBrokenNotCached(self):
+        folder = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(folder, 'broken.png')
+            with open(filename, 'wb') as f:
+                f.write(b'not an image')
+
+            cache = TNC.ThumbnailCache(os.path.join(folder, 'cache'))
+            loader = TNC.ThumbnailLoader(TNC.NativeImageHandler(), None, cache=cache)
+            noLog = wx.LogNull()
+            img, originalsize, alpha = loader.LoadThumbnail(filename)
+            del noLog
+            self.assertEqual(originalsize, (64, 64))
+            self.assertTrue(cache.Load(cache.GetKey(filename, (300, 240))) is None)
+        finally:
+            shutil.rmtree(folder)
+
+    def test_lib_agw_thumbnailctrlLoaderRunning(self):
+        class Handler(object):
+            def LoadThumbnail(self, filename, thumbnailsize):
+                started.set()
+                release.wait(5)
+                return wx.Image(40, 30), (40, 30), False
+
+        started, release = threading.Event(), threading.Event()
+        delivered = []
+        loader = TNC.ThumbnailLoader(Handler(), lambda data, result: delivered.append(data), workers=1)
+        loader.Start([('image.png', 'data')])
+        try:
+            self.assertTrue(started.wait(5))
+            # the only job is no longer pending, but it is being loaded
+            self.assertTrue(loader.IsRunning())
+            release.set()
+            # and it is still running until the thumbnail is delivered
+            time.sleep(0.5)
+            self.assertTrue(loader.IsRunning())
+            for ii in range(50):
+                self.myYield()
+                if not loader.IsRunning():
+                    break
+                time.sleep(0.1)
+            self.assertFalse(loader.IsRunning())
+            self.assertEqual(delivered, ['data'])
+        finally:
+            release.set()
+            loader.Stop()
+
     def test_lib_agw_thumbnailctrlEvents(self):
         TNC.EVT_THUMBNAILS_CAPTION_CHANGED
         TNC.EVT_THUMBNAILS_DCLICK
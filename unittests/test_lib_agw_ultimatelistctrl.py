@@ -20,6 +20,93 @@ class lib_agw_ultimatelistctrl_Tests(wtc.WidgetTestCase):
     def test_lib_agw_ultimatelistctrlCtorVirtual(self):
         ulc = ULC.UltimateListCtrl(self.frame, agwStyle=wx.LC_REPORT|wx.LC_VIRTUAL)
 
+    def test_lib_agw_ultimatelistctrlRowHeightTree(self):
+        heights = [10, 25, 0, 7, 13]
+        tree = ULC.RowHeightTree(heights)
+        self.assertEqual(tree.GetY(3), 35)
+        self.assertEqual(tree.GetTotalHeight(), 55)
+        self.assertEqual(tree.FindRow(-1), -1)
+        self.assertEqual(tree.FindRow(9), 0)
+        self.assertEqual(tree.FindRow(35), 3)
+        self.assertEqual(tree.FindRow(55), 5)
+        tree.SetHeight(1, 5)
+        self.assertEqual(tree.GetY(4), 22)
+        self.assertEqual(tree.FindRow(15), 3)
+        tree.InsertRow(1, 8)
+        tree.DeleteRow(4)
+        self.assertEqual(tree.GetY(5), 35)
+        self.assertEqual(tree.FindRow(13), 1)
+
+    def test_lib_agw_ultimatelistctrlVariableRowHeightInsert(self):
+        ulc = ULC.UltimateListCtrl(self.frame,
+                                   agwStyle=wx.LC_REPORT|ULC.ULC_HAS_VARIABLE_ROW_HEIGHT)
+        ulc.InsertColumn(0, "Text")
+        for i in range(2000):
+            ulc.InsertStringItem(i, "line\n" * (i % 3 + 1))
+        main = ulc._mainWin
+        heights = main.GetRowHeights()
+
+        # the tree is kept, and the lines are not all measured again
+        measured = []
+        getLineHeight = main.GetLineHeight
+        def GetLineHeight(line=None):
+            measured.append(line)
+            return getLineHeight(line)
+        main.GetLineHeight = GetLineHeight
+        ulc.InsertStringItem(1000, "line\n" * 4)
+        ulc.InsertStringItem(10, "line")
+        ulc.DeleteItem(500)
+        self.assertEqual(main.GetLineY(1999), main.GetLineY(1998) + getLineHeight(1998))
+        self.assertTrue(main.GetRowHeights() is heights)
+        self.assertTrue(len(measured) < 100)
+        del main.GetLineHeight
+
+        self.assertEqual(main.GetLineY(1500), ULC.LINE_SPACING + sum(
+            main.GetLineHeight(i) for i in range(1500)))
+
+    def test_lib_agw_ultimatelistctrlVariableRowHeight(self):
+        ulc = ULC.UltimateListCtrl(self.frame,
+                                   agwStyle=wx.LC_REPORT|ULC.ULC_HAS_VARIABLE_ROW_HEIGHT)
+        ulc.InsertColumn(0, "Text")
+        for i in range(20):
+            ulc.InsertStringItem(i, "line\n" * (i % 3 + 1))
+        main = ulc._mainWin
+        y = 0
+        for i in range(20):
+            self.assertEqual(main.GetLineY(i), ULC.LINE_SPACING + y)
+            y += main.GetLineHeight(i)
+        ulc.DeleteItem(5)
+        self.assertEqual(main.GetLineY(18), ULC.LINE_SPACING + sum(
+            main.GetLineHeight(i) for i in range(18)))
+
+    def test_lib_agw_ultimatelistctrlRowCache(self):
+        class VirtualList(ULC.UltimateListCtrl):
+            hints = []
+            def OnCacheHint(self, itemFrom, itemTo):
+                self.hints.append((itemFrom, itemTo))
+            def OnGetRows(self, itemFrom, itemTo):
+                return [(i, "row %d" % i) for i in range(itemFrom, itemTo + 1)]
+
+        ulc = VirtualList(self.frame, agwStyle=wx.LC_REPORT|wx.LC_VIRTUAL)
+        ulc.InsertColumn(0, "Index")
+        ulc.InsertColumn(1, "Text")
+        ulc.SetItemCount(100)
+        main = ulc._mainWin
+        main.CacheRows(10, 19)
+        self.assertEqual(ulc.hints, [(10, 19)])
+        self.assertEqual(ulc.GetItemText(15), "15")
+        self.assertEqual(main.GetLine(15).GetText(1), "row 15")
+        main.CacheRows(15, 24)
+        self.assertEqual(ulc.hints, [(10, 19), (20, 24)])
+        ulc.RefreshItem(12)
+        main.CacheRows(10, 19)
+        self.assertEqual(ulc.hints[-1], (12, 12))
+        main.RefreshLines(14, 15)
+        self.assertTrue(14 not in main._rowCache and 15 not in main._rowCache)
+        self.assertTrue(13 in main._rowCache)
+        ulc.SetRowCacheSize(5)
+        self.assertEqual(len(main._rowCache), 5)
+
     def test_lib_agw_thumbnailctrlStyles(self):
         ULC.ULC_VRULES
         ULC.ULC_HRULES
@@ -0,0 +1,73 @@
+import unittest
+from unittests import wtc
+import wx
+import socket
+import threading
+
+try:
+    import asyncio
+    import wx.lib.asyncloop as asyncloop
+except ImportError:
+    asyncloop = None
+
+import wx.lib.delayedresult as DR
+
+#---------------------------------------------------------------------------
+
+@unittest.skipIf(asyncloop is None, 'asyncio is not available')
+class lib_asyncloop_Tests(wtc.WidgetTestCase):
+
+    def setUp(self):
+        super(lib_asyncloop_Tests, self).setUp()
+        self.loop = asyncloop.WxEventLoop()
+
+    def tearDown(self):
+        self.loop.close()
+        super(lib_asyncloop_Tests, self).tearDown()
+
+    def test_lib_asyncloopTimers(self):
+        future = self.loop.create_future()
+        wx.CallLater(50, future.set_result, 'wx')
+        self.assertEqual(self.loop.run_until_complete(future), 'wx')
+
+        sleep = asyncio.sleep(0.05, result='asyncio')
+        self.assertEqual(self.loop.run_until_complete(sleep), 'asyncio')
+
+    def test_lib_asyncloopSockets(self):
+        a, b = socket.socketpair()
+        a.setblocking(False)
+        try:
+            threading.Timer(0.05, b.send, (b'x',)).start()
+            data = self.loop.run_until_complete(self.loop.sock_recv(a, 1))
+            self.assertEqual(data, b'x')
+        finally:
+            a.close()
+            b.close()
+
+    def test_lib_asyncloopAwaitEvent(self):
+        button = wx.Button(self.frame)
+        # without a loop, the current WxEventLoop is used
+        future = asyncloop.AwaitEvent(button, wx.EVT_BUTTON)
+        event = wx.CommandEvent(wx.wxEVT_BUTTON, button.GetId())
+        event.SetEventObject(button)
+        wx.CallAfter(button.GetEventHandler().ProcessEvent, event)
+        result = self.loop.run_until_complete(future)
+        self.assertEqual(result.GetEventType(), wx.wxEVT_BUTTON)
+
+    def test_lib_asyncloopShowDialog(self):
+        dialog = wx.Dialog(self.frame)
+        future = asyncloop.ShowDialog(dialog, loop=self.loop)
+        wx.CallLater(50, dialog.EndDialog, wx.ID_OK)
+        self.assertEqual(self.loop.run_until_complete(future), wx.ID_OK)
+        dialog.Destroy()
+
+    def test_lib_asyncloopRunInExecutor(self):
+        with DR.Executor(maxWorkers=2) as executor:
+            future = asyncloop.RunInExecutor(executor, pow, (2, 10),
+                                             loop=self.loop)
+            self.assertEqual(self.loop.run_until_complete(future), 1024)
+
+#---------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittests import wtc
+import wx
+import threading
+
+import wx.lib.delayedresult as DR
+
+#---------------------------------------------------------------------------
+
+class lib_delayedresult_Tests(wtc.WidgetTestCase):
+
+    def test_lib_delayedresultExecutor(self):
+        with DR.Executor(maxWorkers=2) as executor:
+            futures = [executor.submit(pow, ii, 2) for ii in range(10)]
+            self.assertEqual([future.result() for future in futures],
+                             [ii**2 for ii in range(10)])
+            self.assertEqual(list(executor.map(pow, [2, 3], [3, 2])), [8, 9])
+
+    def test_lib_delayedresultExecutorPriority(self):
+        gate = threading.Event()
+        order = []
+        executor = DR.Executor(maxWorkers=1)
+        executor.submit(gate.wait)
+
+        futures = [executor.schedule(order.append, args=(ii,), priority=priority)
+                   for ii, priority in enumerate([0, 2, 1])]
+        cancelled = executor.schedule(order.append, args=('x',), jobID='cancel')
+        self.assertEqual(executor.cancelJobs('cancel'), 1)
+        self.assertTrue(cancelled.cancelled())
+
+        gate.set()
+        executor.shutdown()
+        self.assertEqual(order, [1, 2, 0])
+
+    def test_lib_delayedresultExecutorCallbacks(self):
+        main = threading.current_thread()
+        results = []
+
+        def consumer(delayedResult):
+            results.append((delayedResult.get(), threading.current_thread() is main))
+
+        executor = DR.Executor(maxWorkers=2)
+        for ii in range(5):
+            executor.startWorker(consumer, pow, wargs=(ii, 2))
+        executor.shutdown()
+        self.myYield()
+
+        self.assertEqual(sorted(results), [(ii**2, True) for ii in range(5)])
+
+#---------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from unittests import wtc
 import wx
+import numpy as N
 
 import wx.lib.floatcanvas.FloatCanvas as fc
 import wx.lib.floatcanvas.NavCanvas as nc
@@ -127,6 +128,17 @@ class lib_floatcanvas_floatcanvas_Tests(wtc.WidgetTestCase):
         fccanvas.AddObject(obj)
         fccanvas.Destroy()
 
+    def test_lib_floatcanvas_fc_scaledbitmappyramid(self):
+        fccanvas = fc.FloatCanvas(self.frame)
+
+        bmp = wx.Bitmap(pngFile)
+        obj = fc.ScaledBitmapPyramid(bmp, (2, 2), 100, TileSize=16)
+
+        fccanvas.AddObject(obj)
+        fccanvas.ZoomToBB()
+        fccanvas.Draw(Force=True)
+        fccanvas.Destroy()
+
     def test_lib_floatcanvas_fc_scaledtext(self):
         fccanvas = fc.FloatCanvas(self.frame)
 
@@ -167,6 +179,115 @@ class lib_floatcanvas_floatcanvas_Tests(wtc.WidgetTestCase):
         fccanvas.AddObject(obj)
         fccanvas.Destroy()
 
+    def test_lib_floatcanvas_fc_zorder(self):
+        fccanvas = fc.FloatCanvas(self.frame)
+
+        objs = [fccanvas.AddCircle((i, i), 2) for i in range(5)]
+        fccanvas.RaiseObject(objs[0])
+        fccanvas.SetZIndex(objs[4], 0)
+        self.assertEqual(list(fccanvas._DrawList),
+                         [objs[4], objs[1], objs[2], objs[3], objs[0]])
+        self.assertEqual(fccanvas.GetZIndex(objs[3]), 3)
+
+        fccanvas.RemoveObjects(objs[1:3])
+        self.assertEqual(list(fccanvas._DrawList), [objs[4], objs[3], objs[0]])
+        fccanvas.Destroy()
+
+    def test_lib_floatcanvas_fc_rawboundingbox(self):
+        from wx.lib.floatcanvas.Utilities import BBox
+
+        class MovingRectangle(fc.Rectangle):
+            # moves the way the samples do, without calling Move()
+            def MoveTo(self, XY):
+                self.XY = N.array(XY, N.float)
+                self.BoundingBox = BBox.fromPoints((self.XY, self.XY + self.WH))
+                self._Canvas.BoundingBoxDirty = True
+
+        fccanvas = fc.FloatCanvas(self.frame, size=(200, 200))
+        fccanvas.AddRectangle((0, 0), (10, 10), FillColor='Red')
+        rect = fccanvas.AddObject(MovingRectangle((0, 0), (10, 10), FillColor='Blue'))
+        rect.Bind(fc.EVT_FC_LEFT_DOWN, lambda obj: None)
+
+        rect.MoveTo((100, 100))
+        self.assertEqual(fccanvas._DrawList.GetBox(rect).tolist(),
+                         [[100, 100], [110, 110]])
+        fccanvas.ZoomToBB()
+        self.assertEqual(fccanvas.BoundingBox.tolist(), [[0, 0], [110, 110]])
+        fccanvas.Draw(Force=True)
+        xy = fccanvas.WorldToPixel((105, 105))
+        color = fccanvas.GetHitTestColor(xy)
+        self.assertTrue(fccanvas.HitDict[fc.EVT_FC_LEFT_DOWN][color] is rect)
+        fccanvas.Destroy()
+
+    def test_lib_floatcanvas_fc_shapesets(self):
+        fccanvas = fc.FloatCanvas(self.frame)
+
+        xy = [(i, i) for i in range(10)]
+        circles = fccanvas.AddCircleSet(xy, 0.5, FillColor="Red",
+                                        Styles=[{}, {"FillColor": "Blue"}],
+                                        StyleIndex=[i % 2 for i in range(10)])
+        rects = fccanvas.AddRectangleSet(xy, (1, 2))
+        lines = fccanvas.AddLineSet([(0, 0, 1, 1), (2, 2, 3, 1)], LineWidth=2)
+        self.assertEqual(len(circles._StyleGroups()), 2)
+        self.assertEqual(rects.BoundingBox.tolist(), [[0, 0], [10, 11]])
+
+        circles.Bind(fc.EVT_FC_LEFT_DOWN, lambda obj: None)
+        self.assertEqual(len(set(circles.HitColors)), 10)
+        circles._SetHit(circles.HitColors[3])
+        self.assertEqual(circles.HitIndex, 3)
+
+        lines.SetLines([(0, 0, 5, 5)])
+        self.assertEqual(list(lines.StyleIndex), [0])
+        fccanvas.ZoomToBB()
+        fccanvas.Draw(Force=True)
+        fccanvas.Destroy()
+
+    def test_lib_floatcanvas_fc_hitcolors(self):
+        from wx.lib.floatcanvas.FCObjects import _colorGenerator
+        gen = _colorGenerator()
+        colors = [next(gen) for i in range(100)] + gen.Take(1000)
+        self.assertEqual(len(set(colors)), 1100)
+
+        fccanvas = fc.FloatCanvas(self.frame)
+        rect = fccanvas.AddRectangle((-10, -10), (20, 20), FillColor="Red")
+        rect.Bind(fc.EVT_FC_LEFT_DOWN, lambda obj: None)
+        fccanvas.ZoomToBB()
+        fccanvas.Draw(Force=True)
+        self.assertEqual(fccanvas.GetHitTestColor((-1, -1)), None)
+        fccanvas.Destroy()
+
+    def test_lib_floatcanvas_fc_textcache(self):
+        fccanvas = fc.FloatCanvas(self.frame)
+
+        text = fccanvas.AddScaledText("Hello", (0, 0), 10)
+        self.assertEqual(text.QuantizeFontSize(12), 12)
+        self.assertEqual(text.QuantizeFontSize(101), text.QuantizeFontSize(102))
+        for size in (12.5, 33, 101, 250.5):
+            self.assertTrue(text.QuantizeFontSize(size, Floor=True) <= size)
+        self.assertEqual(text.QuantizeFontSize(64, Floor=True), 64)
+        bitmap = text.GetTextBitmap("Hello", 20)
+        self.assertTrue(bitmap is text.GetTextBitmap("Hello", 20))
+        text.SetFont(20, text.Family, text.Style, text.Weight, text.Underlined, text.FaceName)
+        font = text.Font
+        text.SetFont(20, text.Family, text.Style, text.Weight, text.Underlined, text.FaceName)
+        self.assertTrue(font is text.Font)
+        fccanvas.Destroy()
+
+    def test_lib_floatcanvas_fc_tiles(self):
+        fccanvas = fc.FloatCanvas(self.frame, size=(200, 200))
+        fccanvas.TileSize = 64
+
+        for i in range(20):
+            fccanvas.AddRectangle((i, i), (2, 2), FillColor='Red')
+        fccanvas.ZoomToBB()
+        fccanvas.Draw(Force=True)
+        tiles = len(fccanvas._Tiles.Tiles)
+        self.assertTrue(tiles > 0)
+
+        fccanvas.MoveImage((10, 0), 'Pixel')
+        self.assertTrue(len(fccanvas._Tiles.Tiles) >= tiles)
+        fccanvas.Destroy()
+
     def test_lib_floatcanvas_floatcanvasEvents(self):
 
         fc.EVT_FC_ENTER_WINDOW
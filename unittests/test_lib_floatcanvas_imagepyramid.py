@@ -0,0 +1,57 @@
+import unittest
+from unittests import wtc
+import wx
+import shutil
+import tempfile
+
+import numpy as N
+from wx.lib.floatcanvas.Utilities.ImagePyramid import ImagePyramid
+
+#---------------------------------------------------------------------------
+
+class testImagePyramid(wtc.WidgetTestCase):
+
+    def setUp(self):
+        super(testImagePyramid, self).setUp()
+        data = N.arange(101 * 70 * 3, dtype=N.uint32).astype(N.uint8)
+        self.Image = wx.Image(101, 70, data.tobytes())
+
+    def Coverage(self, Pyramid, Origin, Size, Clip):
+        """Count how often each visible pixel is drawn."""
+        cover = N.zeros((Clip[3], Clip[2]), N.int32)
+        for bitmap, (x, y) in Pyramid.GetTiles(Origin, Size, Clip):
+            w, h = bitmap.GetSize()
+            cover[max(y, 0):max(y + h, 0), max(x, 0):max(x + w, 0)] += 1
+        return cover
+
+    def testLevels(self):
+        pyramid = ImagePyramid(self.Image, 16)
+        self.assertEqual(pyramid.Sizes, [(101, 70), (51, 35), (26, 18), (13, 9)])
+        self.assertEqual(pyramid.GetLevel(2), 0)
+        self.assertEqual(pyramid.GetLevel(0.3), 1)
+        self.assertEqual(pyramid.GetLevel(0.001), 3)
+
+    def testTiles(self):
+        pyramid = ImagePyramid(self.Image, 16)
+        for Origin, Size in (((3, 5), (101, 70)),
+                             ((-20, -10), (40, 28)),
+                             ((-500, -300), (1010, 700))):
+            cover = self.Coverage(pyramid, Origin, Size, (0, 0, 60, 50))
+            expected = N.zeros_like(cover)
+            expected[max(Origin[1], 0):Origin[1] + Size[1],
+                     max(Origin[0], 0):Origin[0] + Size[0]] = 1
+            self.assertTrue((cover == expected).all())
+
+    def testCacheDir(self):
+        CacheDir = tempfile.mkdtemp()
+        try:
+            pyramid = ImagePyramid(self.Image, 16, CacheDir)
+            self.assertTrue(pyramid.GetTiles((0, 0), (13, 9), (0, 0, 20, 20)))
+            pyramid.Close()
+        finally:
+            shutil.rmtree(CacheDir)
+
+#---------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
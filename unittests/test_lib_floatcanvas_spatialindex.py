@@ -0,0 +1,88 @@
+import unittest
+from unittests import wtc
+import wx
+
+import numpy as N
+from wx.lib.floatcanvas.Utilities.BBox import asBBox, NullBBox
+from wx.lib.floatcanvas.Utilities.SpatialIndex import SpatialIndex
+
+#---------------------------------------------------------------------------
+
+class testSpatialIndex(wtc.WidgetTestCase):
+
+    def setUp(self):
+        super(testSpatialIndex, self).setUp()
+        self.Index = SpatialIndex()
+        self.Objects = [object() for i in range(1000)]
+        for i, obj in enumerate(self.Objects):
+            x, y = i % 40, i // 40
+            self.Index.Insert(obj, ((x, y), (x + 0.5, y + 0.5)))
+
+    def Brute(self, BB):
+        BB = asBBox(BB)
+        return [obj for i, obj in enumerate(self.Objects)
+                if obj in self.Index and
+                asBBox(((i % 40, i // 40), (i % 40 + 0.5, i // 40 + 0.5))).Overlaps(BB)]
+
+    def testQuery(self):
+        BB = ((3.2, 4.2), (7, 9))
+        self.assertEqual(self.Index.Query(BB), self.Brute(BB))
+
+    def testQueryOrder(self):
+        found = self.Index.Query(((-1, -1), (100, 100)))
+        self.assertEqual(found, self.Objects)
+
+    def testRemove(self):
+        self.Index.Remove(self.Objects[5])
+        self.assertEqual(self.Index.Query(((5, 0), (5, 0))), [])
+        self.assertRaises(ValueError, self.Index.Remove, self.Objects[5])
+
+    def testListMethods(self):
+        self.assertEqual(len(self.Index), 1000)
+        self.assertEqual(self.Index.index(self.Objects[7]), 7)
+        self.Index.remove(self.Objects[3])
+        self.assertEqual(self.Index.index(self.Objects[7]), 6)
+        self.assertRaises(ValueError, self.Index.index, self.Objects[3])
+
+    def testUpdate(self):
+        obj = self.Objects[0]
+        self.Index.Update(obj, ((100, 100), (101, 101)))
+        self.assertEqual(self.Index.Query(((100, 100), (100, 100))), [obj])
+        self.assertEqual(self.Index.Query(((0, 0), (0.1, 0.1))), [])
+
+    def testNullBBox(self):
+        obj = object()
+        self.Index.Insert(obj, NullBBox())
+        self.assertFalse(obj in self.Index.Query(((-1, -1), (100, 100))))
+
+    def testRaiseLower(self):
+        first, second = self.Objects[:2]
+        self.Index.Raise(first)
+        self.Index.Lower(self.Objects[-1])
+        order = list(self.Index)
+        self.assertTrue(order[0] is self.Objects[-1])
+        self.assertTrue(order[-1] is first)
+        self.assertEqual(self.Index.GetPosition(second), 1)
+
+    def testSetPosition(self):
+        obj = self.Objects[10]
+        for i in range(100):
+            self.Index.SetPosition(obj, 3)
+            self.Index.SetPosition(self.Objects[20], 3)
+        self.assertEqual(self.Index.GetPosition(obj), 4)
+        self.Index.SetPosition(obj, -1)
+        self.assertTrue(list(self.Index)[-1] is obj)
+        found = self.Index.Query(((-1, -1), (100, 100)))
+        self.assertEqual(found, list(self.Index))
+
+    def testBoundingBox(self):
+        BB = self.Index.GetBoundingBox()
+        self.assertTrue(N.array_equal(BB, ((0, 0), (39.5, 24.5))))
+        for obj in self.Objects:
+            self.Index.Remove(obj)
+        self.assertTrue(self.Index.GetBoundingBox().IsNull())
+
+#---------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,26 @@ class lib_plot_PlotCanvas_Tests(wtc.WidgetTestCase):
         """ Ctor? """
         p = wxplot.PlotCanvas(self.frame)
 
+    def test_lib_plot_plotcanvasBackgroundCache(self):
+        p = wxplot.PlotCanvas(self.frame)
+        p.Draw(wxplot.PlotGraphics([wxplot.PolyLine([(0, 0), (1, 1)])]))
+        background = p._background
+        self.assertTrue(background is not None)
+        # only the data changed
+        p.Draw(wxplot.PlotGraphics([wxplot.PolyLine([(0, 1), (1, 0)])]))
+        self.assertTrue(p._background is background)
+        p.enableGrid = False
+        p.Redraw()
+        self.assertTrue(p._background is not background)
+
+    def test_lib_plot_emptyDecimatedSpline(self):
+        spline = wxplot.PolySpline([], decimate=True)
+        spline.scaleAndShift((1, 1), (0, 0))
+        bmp = wx.Bitmap(10, 10)
+        dc = wx.MemoryDC(bmp)
+        spline.draw(dc, 1)
+        del dc
+
 
 class lib_plot_Tests(wtc.WidgetTestCase):
     def test_lib_plot_tempstyle_contextmanager(self):
@@ -21,6 +41,137 @@ class lib_plot_Tests(wtc.WidgetTestCase):
     def test_lib_plot_tempstyle_decorator(self):
         pass
 
+class lib_plot_PolyPoints_Tests(unittest.TestCase):
+
+    def test_lib_plot_polypoints_cached(self):
+        line = wxplot.PolyLine([(1, 2), (3, -4), (5, 6)])
+        pts = line.points
+        self.assertTrue(pts is line.points)
+        self.assertFalse(pts.flags.writeable)
+
+    def test_lib_plot_polypoints_invalidate(self):
+        line = wxplot.PolyLine([(1, 2), (3, -4), (5, 6)])
+        pts = line.points
+        line.absScale = (False, True)
+        self.assertTrue(pts is not line.points)
+        self.assertEqual(line.points[1, 1], 4)
+        line.points = [(0, 1), (2, 3)]
+        minXY, maxXY = line.boundingBox()
+        self.assertEqual(list(minXY), [0, 1])
+        self.assertEqual(list(maxXY), [2, 3])
+
+    def test_lib_plot_polypoints_boundingbox_copy(self):
+        line = wxplot.PolyLine([(1, 2), (3, 4)])
+        minXY, maxXY = line.boundingBox()
+        minXY[0] = 99
+        self.assertEqual(line.boundingBox()[0][0], 1)
+
+class lib_plot_Decimate_Tests(unittest.TestCase):
+
+    def test_lib_plot_minmax_decimate(self):
+        import numpy as np
+        from wx.lib.plot.utils import minmax_decimate
+        x = np.linspace(0, 100, 10001)
+        points = np.column_stack((x, np.sin(x)))
+        index = minmax_decimate(points, 10, 20)
+        self.assertTrue(len(index) <= 4 * 12)
+        self.assertTrue(np.all(np.diff(index) > 0))
+        self.assertTrue(points[index[0], 0] < 10)
+        self.assertTrue(points[index[-1], 0] > 20)
+
+    def test_lib_plot_pixel_decimate(self):
+        import numpy as np
+        from wx.lib.plot.utils import pixel_decimate
+        points = np.array([[1.1, 1.1], [0.9, 1.2], [5, 5], [50, 50]])
+        index = pixel_decimate(points, (0, 0, 10, 10))
+        self.assertEqual(list(index), [0, 2])
+
+class lib_plot_PolyStream_Tests(unittest.TestCase):
+
+    def test_lib_plot_polystream_append(self):
+        stream = wxplot.PolyStream(5)
+        stream.append([(0, 1), (1, 2), (2, 3)])
+        self.assertEqual(len(stream.points), 3)
+        stream.append([(3, -1), (4, 7), (5, 0)])
+        self.assertEqual(stream.points.tolist(),
+                         [[1, 2], [2, 3], [3, -1], [4, 7], [5, 0]])
+        minXY, maxXY = stream.boundingBox()
+        self.assertEqual(list(minXY), [1, -1])
+        self.assertEqual(list(maxXY), [5, 7])
+
+    def test_lib_plot_polystream_incremental_scale(self):
+        stream = wxplot.PolyStream(4)
+        stream.append([(0, 0), (1, 1)])
+        stream.scaleAndShift((2, 2), (1, 1))
+        stream.append([(2, 2), (3, 3), (4, 4)])
+        stream.scaleAndShift((2, 2), (1, 1))
+        self.assertEqual(stream.scaled.tolist(),
+                         [[3, 3], [5, 5], [7, 7], [9, 9]])
+
+    def test_lib_plot_polystream_window(self):
+        stream = wxplot.PolyStream(100, window=10.0, step=0.5)
+        stream.append([(x, x) for x in range(12)])
+        minXY, maxXY = stream.boundingBox()
+        self.assertEqual((minXY[0], maxXY[0]), (5, 15))
+
+class lib_plot_PointIndex_Tests(unittest.TestCase):
+
+    def _brute(self, points, pnt):
+        import numpy as np
+        d = np.sqrt(np.add.reduce((points - pnt) ** 2, 1))
+        return np.argmin(d)
+
+    def test_lib_plot_pointindex_scatter(self):
+        import numpy as np
+        from wx.lib.plot.utils import PointIndex
+        points = np.random.random_sample((5000, 2)) * [100, 1]
+        index = PointIndex(points)
+        for pnt in np.random.random_sample((50, 2)) * [120, 1.2] - 0.1:
+            self.assertEqual(index.nearest(pnt)[0], self._brute(points, pnt))
+
+    def test_lib_plot_pointindex_clustered(self):
+        import numpy as np
+        from wx.lib.plot.utils import PointIndex
+        centers = np.random.random_sample((5, 2)) * 1000
+        points = centers[np.random.randint(0, 5, 20000)]
+        points += np.random.normal(0, 0.5, points.shape)
+        points[:20] = np.random.random_sample((20, 2)) * 1000
+        index = PointIndex(points)
+        for pnt in np.random.random_sample((50, 2)) * 1000:
+            self.assertEqual(index.nearest(pnt)[0], self._brute(points, pnt))
+
+    def test_lib_plot_pointindex_sorted(self):
+        import numpy as np
+        from wx.lib.plot.utils import PointIndex
+        x = np.linspace(0, 10, 5000)
+        points = np.column_stack((x, np.sin(x)))
+        index = PointIndex(points)
+        for pnt in np.random.random_sample((50, 2)) * [10, 2] - [0, 1]:
+            self.assertEqual(index.nearest(pnt)[0], self._brute(points, pnt))
+
+class lib_plot_Markers_Tests(unittest.TestCase):
+
+    def test_lib_plot_marker_rects(self):
+        import numpy as np
+        rects = wxplot.PolyMarker._rects(np.array([[10.0, 20.0]]), 2)
+        self.assertEqual(rects.tolist(), [[5, 15, 10, 10]])
+
+    def test_lib_plot_stamp_sprite(self):
+        import numpy as np
+        from wx.lib.plot.utils import stamp_sprite
+        sprite = np.zeros((3, 3, 4), np.uint8)
+        sprite[:, :] = (255, 0, 0, 255)     # outline
+        sprite[1, 1] = (0, 0, 255, 255)     # fill
+        sprite[0, 0, 3] = 0                 # transparent corner
+        image = stamp_sprite(sprite, np.array([[1.0, 1.0], [2.0, 1.0]]),
+                             (5, 4))
+        # the second marker is drawn on top of the first one
+        self.assertEqual(image[1, 1].tolist(), [255, 0, 0, 255])
+        self.assertEqual(image[1, 2].tolist(), [0, 0, 255, 255])
+        self.assertEqual(image[0, 0, 3], 0)
+        self.assertEqual(image[0, 1, 3], 255)
+        self.assertEqual(image[3, 0, 3], 0)
+
 #---------------------------------------------------------------------------
 
 if __name__ == '__main__':
@@ -4167,6 +4167,18 @@ class AuiManager(wx.EvtHandler):
         self._docks = []
         self._uiparts = []
 
+        # positions of the panes in self._panes, by name and by window id
+        self._paneNames = {}
+        self._paneWindows = {}
+
+        self._batchCount = 0
+        self._updatePending = False
+
+        # a grid of the UI parts, to find them quickly under the mouse
+        self._hitIndex = None
+        self._hitParts = None
+        self._hitCount = 0
+
         self._guides = []
         self._notebooks = []
 
@@ -4274,11 +4286,16 @@ class AuiManager(wx.EvtHandler):
         :see: :meth:`~AuiManager.GetPane`
         """
 
-        for p in self._panes:
-            if p.window == window:
-                return p
+        panes = self._panes
+        indx = self._paneWindows.get(id(window))
 
-        return NonePaneInfo
+        if indx is None or indx >= len(panes) or panes[indx].window is not window:
+            self.IndexPanes()
+            indx = self._paneWindows.get(id(window))
+            if indx is None:
+                return NonePaneInfo
+
+        return panes[indx]
 
 
     def GetPaneByName(self, name):
@@ -4290,11 +4307,38 @@ class AuiManager(wx.EvtHandler):
         :see: :meth:`GetPane`
         """
 
-        for p in self._panes:
-            if p.name == name:
-                return p
+        panes = self._panes
+        indx = self._paneNames.get(name)
+
+        if indx is None or indx >= len(panes) or panes[indx].name != name:
+            self.IndexPanes()
+            indx = self._paneNames.get(name)
+            if indx is None:
+                return NonePaneInfo
+
+        return panes[indx]
 
-        return NonePaneInfo
+
+    def IndexPanes(self):
+        """
+        Rebuilds the index used by :meth:`GetPaneByName` and :meth:`GetPaneByWidget`.
+
+        The index is checked on every lookup and rebuilt when it doesn't match the
+        panes any longer, so there is usually no need to call this method.
+        """
+
+        names = {}
+        windows = {}
+
+        # when two panes have the same name, the first one is found
+        panes = self._panes
+        for indx in range(len(panes)-1, -1, -1):
+            p = panes[indx]
+            names[p.name] = indx
+            windows[id(p.window)] = indx
+
+        self._paneNames = names
+        self._paneWindows = windows
 
 
     def GetPane(self, item):
@@ -4361,27 +4405,93 @@ class AuiManager(wx.EvtHandler):
 
         result = None
 
-        for item in self._uiparts:
-            # we are not interested in typeDock, because this space
-            # isn't used to draw anything, just for measurements
-            # besides, the entire dock area is covered with other
-            # rectangles, which we are interested in.
-            if item.type == AuiDockUIPart.typeDock:
-                continue
-
+        for item in self.GetUIPartsAt(x, y):
             # if we already have a hit on a more specific item, we are not
             # interested in a pane hit.  If, however, we don't already have
             # a hit, returning a pane hit is necessary for some operations
-            if item.type in [AuiDockUIPart.typePane, AuiDockUIPart.typePaneBorder] and result:
+            if result and (item.type == AuiDockUIPart.typePane or item.type == AuiDockUIPart.typePaneBorder):
                 continue
 
             # if the point is inside the rectangle, we have a hit
-            if item.rect.Contains((x, y)):
+            if item.rect.Contains(x, y):
                 result = item
 
         return result
 
 
+    def GetUIPartsAt(self, x, y):
+        """
+        This is an internal function which returns the UI items that may be
+        over the specified coordinates, in their drawing order. Dock items are
+        never returned.
+
+        :param integer `x`: specifies a x position in client coordinates;
+        :param integer `y`: specifies a y position in client coordinates.
+        """
+
+        if self._hitIndex is None or self._hitParts is not self._uiparts or \
+           self._hitCount != len(self._uiparts):
+            self.IndexUIParts()
+
+        left, top, cell, cols, rows, cells = self._hitIndex
+
+        col = (x - left)//cell
+        row = (y - top)//cell
+
+        if col < 0 or row < 0 or col >= cols or row >= rows:
+            return ()
+
+        return cells[row*cols + col] or ()
+
+
+    def IndexUIParts(self):
+        """
+        This is an internal function which sorts the UI items in a grid of square
+        cells, so that :meth:`HitTest` only has to look at the items in one cell.
+
+        The grid is built again the first time it is needed after the frame
+        layout changes.
+        """
+
+        # we are not interested in typeDock, because this space
+        # isn't used to draw anything, just for measurements
+        # besides, the entire dock area is covered with other
+        # rectangles, which we are interested in.
+        parts = [part for part in self._uiparts if part.type != AuiDockUIPart.typeDock and
+                 part.rect.width > 0 and part.rect.height > 0]
+
+        self._hitParts = self._uiparts
+        self._hitCount = len(self._uiparts)
+
+        if not parts:
+            self._hitIndex = (0, 0, 1, 0, 0, [])
+            return
+
+        left = min([part.rect.x for part in parts])
+        top = min([part.rect.y for part in parts])
+        right = max([part.rect.x + part.rect.width for part in parts])
+        bottom = max([part.rect.y + part.rect.height for part in parts])
+
+        # about 4096 cells at most, but not smaller than the sashes are thin
+        cell = max(32, int(((right - left)*(bottom - top)/4096.0)**0.5) + 1)
+        cols = (right - left - 1)//cell + 1
+        rows = (bottom - top - 1)//cell + 1
+        cells = [None]*(cols*rows)
+
+        for part in parts:
+            rect = part.rect
+            col1 = (rect.x - left)//cell
+            col2 = (rect.x + rect.width - 1 - left)//cell
+            for row in range((rect.y - top)//cell, (rect.y + rect.height - 1 - top)//cell + 1):
+                for indx in range(row*cols + col1, row*cols + col2 + 1):
+                    if cells[indx] is None:
+                        cells[indx] = [part]
+                    else:
+                        cells[indx].append(part)
+
+        self._hitIndex = (left, top, cell, cols, rows, cells)
+
+
     def PaneHitTest(self, panes, pt):
         """
         Similar to :meth:`HitTest`, but it checks in which :class:`AuiManager` rectangle the
@@ -4391,6 +4501,16 @@ class AuiManager(wx.EvtHandler):
         :param wx.Point `pt`: the mouse position.
         """
 
+        if panes is self._panes and self._uiparts:
+            # the panes of the current layout are found with the UI items
+            for part in self.GetUIPartsAt(pt.x, pt.y):
+                paneInfo = part.pane
+                if part.type == AuiDockUIPart.typePane and paneInfo.IsDocked() and \
+                   paneInfo.IsShown() and paneInfo.rect.Contains(pt):
+                    return paneInfo
+
+            return NonePaneInfo
+
         for paneInfo in panes:
             if paneInfo.IsDocked() and paneInfo.IsShown() and paneInfo.rect.Contains(pt):
                 return paneInfo
@@ -6354,7 +6474,47 @@ class AuiManager(wx.EvtHandler):
         return self._dock_constraint_x, self._dock_constraint_y
 
 
+    def BeginBatch(self):
+        """
+        Starts a batch of changes to the panes: :meth:`Update` does nothing until the
+        matching :meth:`EndBatch`, which updates the layout once if it was called.
+
+        Calls to :meth:`BeginBatch` and :meth:`EndBatch` can be nested.
+
+        :see: :class:`AuiUpdateLocker`
+        """
+
+        self._batchCount += 1
+
+
+    def EndBatch(self):
+        """
+        Ends a batch of changes started by :meth:`BeginBatch`, and updates the layout
+        if :meth:`Update` was called during the batch.
+        """
+
+        if self._batchCount <= 0:
+            raise Exception("EndBatch called without a matching BeginBatch")
+
+        self._batchCount -= 1
+
+        if self._batchCount == 0 and self._updatePending:
+            self._updatePending = False
+            self.Update()
+
+
+    def GetBatchCount(self):
+        """ Returns the number of nested :meth:`BeginBatch` calls not ended yet. """
+
+        return self._batchCount
+
+
     def Update(self):
+        if self._batchCount > 0:
+            # the layout is updated once, by EndBatch
+            self._updatePending = True
+            return
+
         if '__WXGTK__' in wx.PlatformInfo:
             wx.CallAfter(self.DoUpdate)
         else:
@@ -6938,6 +7098,9 @@ class AuiManager(wx.EvtHandler):
             if part.type == AuiDockUIPart.typePane:
                 part.pane.rect = part.rect
 
+        # the UI items are sorted again in the grid when needed
+        self._hitIndex = None
+
 
     def GetPanePart(self, wnd):
         """
@@ -10687,6 +10850,39 @@ class AuiManager(wx.EvtHandler):
         self._sliding_pane = None
 
 
+class AuiUpdateLocker(object):
+    """
+    A context manager which calls :meth:`AuiManager.BeginBatch` when it is entered
+    and :meth:`AuiManager.EndBatch` when it is left, so that any number of changes
+    to the panes only update the layout once::
+
+        with AuiUpdateLocker(manager):
+            for name in names:
+                manager.ShowPane(manager.GetPane(name).window, True)
+
+    """
+
+    def __init__(self, manager):
+        """
+        Default class constructor.
+
+        :param `manager`: an instance of :class:`AuiManager`.
+        """
+
+        self._manager = manager
+
+
+    def __enter__(self):
+
+        self._manager.BeginBatch()
+        return self._manager
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self._manager.EndBatch()
+
+
 class AuiManager_DCP(AuiManager):
     """
     A class similar to :class:`AuiManager` but with a Dummy Center Pane (**DCP**).
@@ -10737,6 +10933,10 @@ class AuiManager_DCP(AuiManager):
 
         AuiManager.Update(self)
 
+        if self.GetBatchCount():
+            # everything is checked again by EndBatch
+            return
+
         # check if there's already a center pane (except our dummy pane)
         dummyCenterPane = self.GetPane('dummyCenterPane')
         haveCenterPane = any((pane != dummyCenterPane) and (pane.dock_direction == AUI_DOCK_CENTER) and
@@ -308,6 +308,9 @@ Version 2.6
 # Version Info
 __version__ = "2.6"
 
+import bisect
+from collections import OrderedDict
+
 import wx
 from wx.lib.expando import ExpandoTextCtrl
 
@@ -1542,6 +1545,488 @@ class TreeFindTimer(wx.Timer):
         self._owner._findPrefix = ""
 
 
+# -----------------------------------------------------------------------------
+# Auxiliary Classes: TreeLabelIndex
+# Sorted Index Of The Item Labels Of CustomTreeCtrl, Used To Find Items As The
+# User Types.
+# -----------------------------------------------------------------------------
+
+def FoldCase(text):
+    """
+    Returns a string for case insensitive comparisons.
+
+    :param string `text`: the string to fold.
+    """
+
+    try:
+        return text.casefold()
+    except AttributeError:
+        # Python 2
+        return text.lower()
+
+
+def SortInTreeOrder(items):
+    """
+    Sorts items in the order :meth:`CustomTreeCtrl.GetNext() <customtreectrl.CustomTreeCtrl.GetNext>`
+    walks the tree, the order in which they are shown.
+
+    :param `items`: a list of :class:`GenericTreeItem`.
+
+    :return: A new list with the same items.
+    """
+
+    positions = {}
+
+    def Path(item):
+        path = []
+        parent = item.GetParent()
+        while parent:
+            index = positions.get(id(parent))
+            if index is None:
+                index = positions[id(parent)] = dict([(id(child), n) for n, child in enumerate(parent.GetChildren())])
+            path.append(index[id(item)])
+            item, parent = parent, parent.GetParent()
+
+        path.reverse()
+        return path
+
+    return sorted(items, key=Path)
+
+
+class TreeLabelIndex(object):
+    """
+    A sorted index of the labels of the items of :class:`CustomTreeCtrl`, compared
+    case insensitively, to find the items whose label starts with or contains some
+    text without looking at every item.
+    """
+
+    def __init__(self, items=()):
+        """
+        Default class constructor.
+
+        :param `items`: an iterable of (:class:`GenericTreeItem`, label) pairs to start with.
+        """
+
+        pairs = sorted([(FoldCase(label), item) for item, label in items], key=lambda pair: pair[0])
+
+        self._keys = [key for key, item in pairs]
+        self._items = [item for key, item in pairs]
+        self._itemKeys = dict([(id(item), key) for key, item in pairs])
+
+        # all the keys in one string, for substring searches, made when needed
+        self._text = None
+        self._starts = None
+
+
+    def __len__(self):
+        """ Returns the number of items in the index. """
+
+        return len(self._keys)
+
+
+    def Add(self, item, label):
+        """
+        Adds an item to the index, or changes its label.
+
+        :param `item`: an instance of :class:`GenericTreeItem`;
+        :param string `label`: the item label.
+        """
+
+        self.Remove(item)
+
+        key = FoldCase(label)
+        n = bisect.bisect_right(self._keys, key)
+        self._keys.insert(n, key)
+        self._items.insert(n, item)
+        self._itemKeys[id(item)] = key
+        self._text = None
+
+
+    def Remove(self, item):
+        """
+        Removes an item from the index. Items that are not in the index are ignored.
+
+        :param `item`: an instance of :class:`GenericTreeItem`.
+        """
+
+        key = self._itemKeys.pop(id(item), None)
+        if key is None:
+            return
+
+        n = bisect.bisect_left(self._keys, key)
+        while self._items[n] is not item:
+            n += 1
+
+        del self._keys[n]
+        del self._items[n]
+        self._text = None
+
+
+    def FindPrefix(self, prefix):
+        """
+        Returns the items whose label starts with `prefix`, in no particular order.
+
+        :param string `prefix`: the text to look for.
+        """
+
+        prefix = FoldCase(prefix)
+        keys = self._keys
+
+        start = end = bisect.bisect_left(keys, prefix)
+        while end < len(keys) and keys[end].startswith(prefix):
+            end += 1
+
+        return self._items[start:end]
+
+
+    def FindSubstring(self, text):
+        """
+        Returns the items whose label contains `text`, in no particular order.
+
+        :param string `text`: the text to look for.
+        """
+
+        text = FoldCase(text)
+
+        if self._text is None:
+            self._starts = starts = []
+            pos = 0
+            for key in self._keys:
+                starts.append(pos)
+                pos += len(key) + 1
+
+            self._text = "\0".join(self._keys)
+
+        found = []
+        pos = self._text.find(text)
+
+        while pos >= 0:
+            n = bisect.bisect_right(self._starts, pos) - 1
+            found.append(self._items[n])
+            # go on with the next label
+            pos = self._text.find(text, self._starts[n] + len(self._keys[n]) + 1)
+
+        return found
+
+
+# -----------------------------------------------------------------------------
+# Auxiliary Classes: TreeRows
+# The Items Shown By CustomTreeCtrl, In Blocks Of Rows, Used To Paint And Hit
+# Test Them.
+# -----------------------------------------------------------------------------
+
+class _RowBlock(object):
+    """ A block of consecutive rows of :class:`TreeRows`. """
+
+    def __init__(self, rows, levels, heights):
+
+        self.rows = rows
+        self.levels = levels
+        self.heights = heights
+        self.ys = []        # the y of the rows, relative to the block
+        self.top = 0
+        self.height = 0
+        self.start = 0      # the index of the first row
+        self.index = 0      # the index of the block
+
+
+class TreeRows(object):
+    """
+    The items shown by :class:`CustomTreeCtrl`, in display order, with their levels
+    and vertical positions.
+
+    The rows are kept in blocks of about :attr:`BlockSize` rows, and the items of a
+    block store their `y` position relative to the top of the block, so replacing
+    the rows below an item only places the rows of one block again and moves the
+    blocks after it.
+    """
+
+    BlockSize = 256
+
+    def __init__(self, rows=(), levels=(), heights=(), top=0):
+        """
+        Default class constructor.
+
+        :param `rows`: a list of :class:`GenericTreeItem`, in display order;
+        :param `levels`: the levels of the items in the tree hierarchy;
+        :param `heights`: the heights of the rows, in pixels;
+        :param integer `top`: the `y` position of the first row.
+        """
+
+        self._top = top
+        self._blocks = []
+        self._tops = []
+        self._count = 0
+
+        rows, levels, heights = list(rows), list(levels), list(heights)
+        size = self.BlockSize
+        for n in range(0, len(rows), size):
+            self._blocks.append(self._NewBlock(rows[n:n+size], levels[n:n+size], heights[n:n+size]))
+
+        self._Update(0)
+
+
+    def __len__(self):
+        """ Returns the number of rows. """
+
+        return self._count
+
+
+    def __iter__(self):
+        """ Iterates over the items, in display order. """
+
+        for block in self._blocks:
+            for item in block.rows:
+                yield item
+
+
+    def Detach(self):
+        """ Gives all the items their absolute `y` position back, when the rows are dropped. """
+
+        for block in self._blocks:
+            self._DetachRows(block, block.rows)
+
+        self._blocks, self._tops, self._count = [], [], 0
+
+
+    def GetIndex(self, item):
+        """
+        Returns the row of an item.
+
+        :param `item`: an instance of :class:`GenericTreeItem`.
+
+        :return: The index of the row, or -1 if the item is not shown.
+        """
+
+        block, n = self._Find(item)
+        return (block is None and [-1] or [block.start + n])[0]
+
+
+    def GetLevel(self, item):
+        """
+        Returns the level of the row of an item.
+
+        :param `item`: an instance of :class:`GenericTreeItem`.
+
+        :return: The level, or -1 if the item is not shown.
+        """
+
+        block, n = self._Find(item)
+        return (block is None and [-1] or [block.levels[n]])[0]
+
+
+    def GetRowAt(self, y):
+        """
+        Returns the item of the last row that starts at or above `y`.
+
+        :param integer `y`: the vertical position, in logical coordinates.
+
+        :return: An instance of :class:`GenericTreeItem`, or ``None``.
+        """
+
+        n = bisect.bisect_right(self._tops, y) - 1
+        if n < 0:
+            return None
+
+        block = self._blocks[n]
+        m = bisect.bisect_right(block.ys, y - block.top) - 1
+        return (m >= 0 and [block.rows[m]] or [None])[0]
+
+
+    def GetRowsIn(self, top, bottom):
+        """
+        Returns the rows between two vertical positions.
+
+        :param integer `top`: the top of the range, in logical coordinates;
+        :param integer `bottom`: the bottom of the range, in logical coordinates.
+
+        :return: A list of (item, level, `y`, height) tuples.
+        """
+
+        found = []
+        first = max(bisect.bisect_right(self._tops, top) - 1, 0)
+
+        for block in self._blocks[first:]:
+            m = max(bisect.bisect_right(block.ys, top - block.top) - 1, 0)
+            for n in range(m, len(block.rows)):
+                y = block.top + block.ys[n]
+                if y > bottom:
+                    return found
+                found.append((block.rows[n], block.levels[n], y, block.heights[n]))
+
+        return found
+
+
+    def GetChildRows(self, item):
+        """
+        Returns the rows after an item that are deeper than it, i.e. its descendants
+        that are shown.
+
+        :param `item`: an instance of :class:`GenericTreeItem`.
+
+        :return: A list of :class:`GenericTreeItem`, empty if the item is not shown.
+        """
+
+        return [row for block, start, end in self._ChildSpans(item) for row in block.rows[start:end]]
+
+
+    def ReplaceChildRows(self, item, rows, levels, heights):
+        """
+        Replaces the rows returned by :meth:`~TreeRows.GetChildRows` with new ones.
+
+        :param `item`: an instance of :class:`GenericTreeItem`;
+        :param `rows`: a list of :class:`GenericTreeItem`, in display order;
+        :param `levels`: the levels of the items in the tree hierarchy;
+        :param `heights`: the heights of the rows, in pixels.
+
+        :return: ``False`` if the item is not shown, ``True`` otherwise.
+        """
+
+        block, n = self._Find(item)
+        if block is None:
+            return False
+
+        spans = self._ChildSpans(item)
+        # the descendants in the blocks after the one of the item
+        for other, start, end in reversed(spans[1:]):
+            self._DetachRows(other, other.rows[start:end])
+            if end == len(other.rows):
+                del self._blocks[other.index]
+                continue
+            del other.rows[:end], other.levels[:end], other.heights[:end]
+            self._Layout(other, 0)
+
+        end = spans[0][2]
+        self._DetachRows(block, block.rows[n+1:end])
+        block.rows[n+1:end] = rows
+        block.levels[n+1:end] = levels
+        block.heights[n+1:end] = heights
+
+        size = self.BlockSize
+        following = block.index + 1
+        if len(block.rows) < size//2 and following < len(self._blocks) and \
+           len(block.rows) + len(self._blocks[following].rows) <= 2*size:
+            # merge the next block, so that collapsing does not leave many small ones
+            other = self._blocks.pop(following)
+            block.rows.extend(other.rows)
+            block.levels.extend(other.levels)
+            block.heights.extend(other.heights)
+            self._DetachRows(other, other.rows)
+
+        if len(block.rows) > 2*size:
+            # split the block
+            more = [self._NewBlock(block.rows[m:m+size], block.levels[m:m+size], block.heights[m:m+size])
+                    for m in range(size, len(block.rows), size)]
+            del block.rows[size:], block.levels[size:], block.heights[size:]
+            self._blocks[block.index+1:block.index+1] = more
+
+        self._Layout(block, min(n + 1, len(block.rows)))
+        self._Update(block.index)
+        return True
+
+
+    def _NewBlock(self, rows, levels, heights):
+
+        block = _RowBlock(rows, levels, heights)
+        self._Layout(block, 0)
+        return block
+
+
+    def _Layout(self, block, start):
+        """ Places the rows of a block from `start` on, relative to the block. """
+
+        rows, heights, ys = block.rows, block.heights, block.ys
+
+        if start > 0:
+            y = ys[start-1] + heights[start-1]
+        else:
+            y = 0
+
+        del ys[start:]
+        for n in range(start, len(rows)):
+            item = rows[n]
+            item._rowBlock = block
+            item._y = y
+            ys.append(y)
+            y += heights[n]
+
+        block.height = y
+
+
+    def _Update(self, first):
+        """ Places the blocks from `first` on. """
+
+        blocks = self._blocks
+
+        if first > 0:
+            block = blocks[first-1]
+            top, start = block.top + block.height, block.start + len(block.rows)
+        else:
+            top, start = self._top, 0
+
+        del self._tops[first:]
+        for n in range(first, len(blocks)):
+            block = blocks[n]
+            block.top, block.start, block.index = top, start, n
+            self._tops.append(top)
+            top += block.height
+            start += len(block.rows)
+
+        self._count = start
+
+
+    def _DetachRows(self, block, rows):
+
+        for item in rows:
+            if item._rowBlock is block:
+                item._y += block.top
+                item._rowBlock = None
+
+
+    def _Find(self, item):
+        """ Returns the block of an item and its position in it, or (``None``, -1). """
+
+        block = item._rowBlock
+        if block is None or block.index >= len(self._blocks) or self._blocks[block.index] is not block:
+            return None, -1
+
+        n = bisect.bisect_left(block.ys, item._y)
+        while n < len(block.rows) and block.ys[n] == item._y:
+            # rows without height share their y
+            if block.rows[n] is item:
+                return block, n
+            n += 1
+
+        return None, -1
+
+
+    def _ChildSpans(self, item):
+        """
+        Returns the (block, start, end) ranges of the rows returned by
+        :meth:`~TreeRows.GetChildRows`, the first one in the block of the item.
+        """
+
+        block, n = self._Find(item)
+        if block is None:
+            return []
+
+        level = block.levels[n]
+        spans = []
+        start = n + 1
+
+        for other in self._blocks[block.index:]:
+            levels = other.levels
+            end = start
+            while end < len(levels) and levels[end] > level:
+                end += 1
+            spans.append((other, start, end))
+            if end < len(levels):
+                break
+            start = 0
+
+        return spans
+
+
 # -----------------------------------------------------------------------------
 # GenericTreeItem Implementation.
 # This Class Holds All The Information And Methods For Every Single Item In
@@ -1632,6 +2117,7 @@ class GenericTreeItem(object):
 
         self._x = 0             # (virtual) offset from top
         self._y = 0             # (virtual) offset from left
+        self._rowBlock = None   # the rows block _y is relative to, if any
         self._width = 0         # width of this item
         self._height = 0        # height of this item
 
@@ -1648,6 +2134,7 @@ class GenericTreeItem(object):
         self._enabled = True        # flag to enable/disable an item
         self._hypertext = False     # indicates if the item is hypertext
         self._visited = False       # visited state for an hypertext item
+        self._childrenLoaded = False    # children came from the children provider
 
         if self._type > 0:
             # do not construct the array for normal items
@@ -1854,7 +2341,11 @@ class GenericTreeItem(object):
     def GetY(self):
         """ Returns the `y` position on an item, in logical coordinates. """
 
-        return self._y
+        block = self._rowBlock
+        if block is None:
+            return self._y
+
+        return block.top + self._y
 
 
     def SetX(self, x):
@@ -1875,6 +2366,7 @@ class GenericTreeItem(object):
         """
 
         self._y = y
+        self._rowBlock = None
 
 
     def GetHeight(self):
@@ -2456,7 +2948,7 @@ class GenericTreeItem(object):
          item's width and height.
         """
 
-        bottomY = self._y + theButton.GetLineHeight(self)
+        bottomY = self.GetY() + theButton.GetLineHeight(self)
 
         if y < bottomY:
             y = bottomY
@@ -2489,83 +2981,104 @@ class GenericTreeItem(object):
         if not (level == 0 and theCtrl.HasAGWFlag(TR_HIDE_ROOT)):
 
             # evaluate the item
-            h = theCtrl.GetLineHeight(self)
+            res, flags = self.HitTestRow(point, theCtrl, flags)
+            if res is not None:
+                return res, flags
 
-            pointX, pointY = point[0], point[1]
-            if pointY > self._y and pointY < self._y + h:
+            # if children are expanded, fall through to evaluate them
+            if self._isCollapsed:
+                return None, 0
 
-                y_mid = self._y + h//2
+        # evaluate children
+        for child in self._children:
+            res, flags = child.HitTest(point, theCtrl, flags, level + 1)
+            if res != None:
+                return res, flags
 
-                if pointY < y_mid:
-                    flags |= TREE_HITTEST_ONITEMUPPERPART
-                else:
-                    flags |= TREE_HITTEST_ONITEMLOWERPART
+        return None, 0
 
-                xCross = self._x - theCtrl.GetSpacing()
 
-                if wx.Platform == "__WXMAC__":
-                    # according to the drawing code the triangels are drawn
-                    # at -4 , -4  from the position up to +10/+10 max
-                    if pointX > xCross-4 and pointX < xCross+10 and pointY > y_mid-4 and \
-                       pointY < y_mid+10 and self.HasPlus() and theCtrl.HasButtons():
+    def HitTestRow(self, point, theCtrl, flags=0):
+        """
+        Like :meth:`~GenericTreeItem.HitTest`, but only tests the row of this item,
+        not the ones of its children.
 
-                        flags |= TREE_HITTEST_ONITEMBUTTON
-                        return self, flags
-                else:
-                    # 5 is the size of the plus sign
-                    if pointX > xCross-6 and pointX < xCross+6 and pointY > y_mid-6 and \
-                       pointY < y_mid+6 and self.HasPlus() and theCtrl.HasButtons():
+        :param `point`: the point to test for the hit (an instance of :class:`wx.Point`);
+        :param `theCtrl`: the main :class:`CustomTreeCtrl` tree;
+        :param integer `flags`: a bitlist of hit locations.
+
+        :return: A tuple of (item, flags), the item being ``None`` if the point is
+         not in the row.
+        """
 
-                        flags |= TREE_HITTEST_ONITEMBUTTON
-                        return self, flags
+        h = theCtrl.GetLineHeight(self)
+        y = self.GetY()
 
-                if pointX >= self._x and pointX <= self._x + self._width:
+        pointX, pointY = point[0], point[1]
+        if pointY > y and pointY < y + h:
 
-                    image_w = -1
-                    wcheck = 0
+            y_mid = y + h//2
 
-                    # assuming every image (normal and selected) has the same size!
-                    if self.GetImage() != _NO_IMAGE and theCtrl._imageListNormal:
-                        image_w, image_h = theCtrl._imageListNormal.GetSize(self.GetImage())
+            if pointY < y_mid:
+                flags |= TREE_HITTEST_ONITEMUPPERPART
+            else:
+                flags |= TREE_HITTEST_ONITEMLOWERPART
 
-                    if self.GetCheckedImage() is not None:
-                        wcheck, hcheck = theCtrl._imageListCheck.GetSize(self.GetCheckedImage())
+            xCross = self._x - theCtrl.GetSpacing()
 
-                    if wcheck and pointX <= self._x + wcheck + 1:
-                        flags |= TREE_HITTEST_ONITEMCHECKICON
-                        return self, flags
+            if wx.Platform == "__WXMAC__":
+                # according to the drawing code the triangels are drawn
+                # at -4 , -4  from the position up to +10/+10 max
+                if pointX > xCross-4 and pointX < xCross+10 and pointY > y_mid-4 and \
+                   pointY < y_mid+10 and self.HasPlus() and theCtrl.HasButtons():
 
-                    if image_w != -1 and pointX <= self._x + wcheck + image_w + 1:
-                        flags |= TREE_HITTEST_ONITEMICON
-                    else:
-                        flags |= TREE_HITTEST_ONITEMLABEL
+                    flags |= TREE_HITTEST_ONITEMBUTTON
+                    return self, flags
+            else:
+                # 5 is the size of the plus sign
+                if pointX > xCross-6 and pointX < xCross+6 and pointY > y_mid-6 and \
+                   pointY < y_mid+6 and self.HasPlus() and theCtrl.HasButtons():
 
+                    flags |= TREE_HITTEST_ONITEMBUTTON
                     return self, flags
 
-                if pointX < self._x:
-                    if theCtrl.HasAGWFlag(TR_FULL_ROW_HIGHLIGHT):
-                        flags |= TREE_HITTEST_ONITEM
-                    else:
-                        flags |= TREE_HITTEST_ONITEMINDENT
-                if pointX > self._x + self._width:
-                    if theCtrl.HasAGWFlag(TR_FULL_ROW_HIGHLIGHT):
-                        flags |= TREE_HITTEST_ONITEM
-                    else:
-                        flags |= TREE_HITTEST_ONITEMRIGHT
+            if pointX >= self._x and pointX <= self._x + self._width:
+
+                image_w = -1
+                wcheck = 0
+
+                # assuming every image (normal and selected) has the same size!
+                if self.GetImage() != _NO_IMAGE and theCtrl._imageListNormal:
+                    image_w, image_h = theCtrl._imageListNormal.GetSize(self.GetImage())
+
+                if self.GetCheckedImage() is not None:
+                    wcheck, hcheck = theCtrl._imageListCheck.GetSize(self.GetCheckedImage())
+
+                if wcheck and pointX <= self._x + wcheck + 1:
+                    flags |= TREE_HITTEST_ONITEMCHECKICON
+                    return self, flags
+
+                if image_w != -1 and pointX <= self._x + wcheck + image_w + 1:
+                    flags |= TREE_HITTEST_ONITEMICON
+                else:
+                    flags |= TREE_HITTEST_ONITEMLABEL
 
                 return self, flags
 
-            # if children are expanded, fall through to evaluate them
-            if self._isCollapsed:
-                return None, 0
+            if pointX < self._x:
+                if theCtrl.HasAGWFlag(TR_FULL_ROW_HIGHLIGHT):
+                    flags |= TREE_HITTEST_ONITEM
+                else:
+                    flags |= TREE_HITTEST_ONITEMINDENT
+            if pointX > self._x + self._width:
+                if theCtrl.HasAGWFlag(TR_FULL_ROW_HIGHLIGHT):
+                    flags |= TREE_HITTEST_ONITEM
+                else:
+                    flags |= TREE_HITTEST_ONITEMRIGHT
 
-        # evaluate children
-        for child in self._children:
-            res, flags = child.HitTest(point, theCtrl, flags, level + 1)
-            if res != None:
-                return res, flags
+            return self, flags
 
-        return None, 0
+        return None, flags
 
 
     def GetCurrentImage(self):
@@ -2695,6 +3208,11 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         self._hasFocus = False
         self._dirty = False
 
+        # The items that are shown, in display order, with their levels and
+        # vertical positions (a TreeRows): made by CalculatePositions, and
+        # only valid while the tree is not dirty
+        self._rows = None
+
         # Default line height: it will soon be changed
         self._lineHeight = 10
         # Item indent wrt parent
@@ -2735,6 +3253,9 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         self._findPrefix = ""
         self._findTimer = None
 
+        # the optional index of the item labels, for FindItem
+        self._labelIndex = None
+
         self._dropEffectAboveItem = False
         self._lastOnSame = False
 
@@ -2781,6 +3302,12 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         # To speed up ExpandAll and SelectAll
         self._sendEvent = True
 
+        # Children given on demand, and the collapsed branches that
+        # can be released, least recently collapsed first
+        self._childrenProvider = None
+        self._maxCollapsedItems = None
+        self._collapsedBranches = OrderedDict()
+
         # Connection lines style
         grey = (160,160,160)
         if wx.Platform != "__WXMAC__":
@@ -3687,8 +4214,17 @@ class CustomTreeCtrl(wx.ScrolledWindow):
 
         dc = wx.ClientDC(self)
         item.SetText(text)
+        if self._labelIndex is not None:
+            self._labelIndex.Add(item, text)
+
+        height = self.GetLineHeight(item)
         self.CalculateSize(item, dc)
-        self.RefreshLine(item)
+
+        if self.GetLineHeight(item) != height:
+            # the items below have moved
+            self._dirty = True
+        else:
+            self.RefreshLine(item)
 
 
     def SetItemImage(self, item, image, which=TreeItemIcon_Normal):
@@ -3735,22 +4271,157 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         :param object `data`: can be any Python object.
         """
 
-        item.SetData(data)
+        item.SetData(data)
+
+    SetItemPyData = SetPyData
+    SetItemData = SetPyData
+
+
+    def SetItemHasChildren(self, item, has=True):
+        """
+        Forces the appearance/disappearance of the button next to the item.
+
+        :param `item`: an instance of :class:`GenericTreeItem`;
+        :param bool `has`: ``True`` to have a button next to an item, ``False`` otherwise.
+        """
+
+        item.SetHasPlus(has)
+        self.RefreshLine(item)
+
+
+    def SetChildrenProvider(self, provider):
+        """
+        Sets the callable that gives the children of the items on demand.
+
+        With a children provider, the items only need to be marked with
+        :meth:`~CustomTreeCtrl.SetItemHasChildren`: the first time an item with a
+        button and no children is expanded, `provider` is called with the item and
+        the children it returns are appended to it.
+
+        :param `provider`: a callable taking a :class:`GenericTreeItem` and returning
+         an iterable of children, or ``None`` to stop giving children on demand. Each
+         child is either its label or a tuple ``(text, hasChildren)`` or
+         ``(text, hasChildren, data)``.
+
+        :note: :meth:`~CustomTreeCtrl.ExpandAll` asks the provider for the whole tree.
+
+        :see: :meth:`~CustomTreeCtrl.SetMaxCollapsedItems`.
+        """
+
+        self._childrenProvider = provider
+
+
+    def GetChildrenProvider(self):
+        """
+        Returns the callable that gives the children of the items on demand, or ``None``.
+
+        :see: :meth:`~CustomTreeCtrl.SetChildrenProvider`.
+        """
+
+        return self._childrenProvider
+
+
+    def SetMaxCollapsedItems(self, count):
+        """
+        Sets how many items given by the children provider are kept in collapsed branches.
+
+        When an item whose children came from the provider is collapsed and more than
+        `count` items are left in such collapsed branches, the children of the least
+        recently collapsed branches are deleted, and asked again to the provider when
+        their parent is next expanded.
+
+        :param `count`: the number of items, or ``None`` to keep all the items.
+
+        :see: :meth:`~CustomTreeCtrl.SetChildrenProvider`.
+        """
+
+        self._maxCollapsedItems = count
+        self.ReleaseCollapsedBranches()
+
+
+    def GetMaxCollapsedItems(self):
+        """
+        Returns how many items given by the children provider are kept in collapsed
+        branches, or ``None`` if they are all kept.
+
+        :see: :meth:`~CustomTreeCtrl.SetMaxCollapsedItems`.
+        """
+
+        return self._maxCollapsedItems
+
+
+    def LoadChildren(self, item):
+        """
+        Appends the children given by the children provider to an item.
+
+        :param `item`: an instance of :class:`GenericTreeItem`.
+
+        :see: :meth:`~CustomTreeCtrl.SetChildrenProvider`.
+        """
+
+        children = self._childrenProvider(item)
+        item._childrenLoaded = True
+
+        for child in children or []:
+            if isinstance(child, tuple):
+                text, hasChildren, data = (child + (None,))[:3]
+            else:
+                text, hasChildren, data = child, False, None
+
+            newItem = self.AppendProvidedItem(item, text, data)
+            if hasChildren:
+                self.SetItemHasChildren(newItem)
+
+
+    def AppendProvidedItem(self, parentId, text, data=None):
+        """
+        Appends an item given by the children provider. Used internally.
+
+        :param `parentId`: an instance of :class:`GenericTreeItem` representing the
+         item's parent;
+        :param string `text`: the item text label;
+        :param `data`: the Python object associated with the item.
+
+        :return: An instance of :class:`GenericTreeItem`.
+        """
+
+        return self.AppendItem(parentId, text, data=data)
+
+
+    def ReleaseChildren(self, item):
+        """
+        Deletes the children that the children provider gave to a collapsed item, so
+        that they are asked again to the provider when the item is next expanded.
+
+        :param `item`: an instance of :class:`GenericTreeItem`.
+        """
+
+        self._collapsedBranches.pop(id(item), None)
 
-    SetItemPyData = SetPyData
-    SetItemData = SetPyData
+        if item.IsExpanded() or not item._childrenLoaded:
+            return
 
+        self.DeleteChildren(item)
+        item._childrenLoaded = False
+        item.SetHasPlus()
 
-    def SetItemHasChildren(self, item, has=True):
-        """
-        Forces the appearance/disappearance of the button next to the item.
 
-        :param `item`: an instance of :class:`GenericTreeItem`;
-        :param bool `has`: ``True`` to have a button next to an item, ``False`` otherwise.
+    def ReleaseCollapsedBranches(self):
+        """
+        Releases the children of the least recently collapsed branches, until no more
+        than :meth:`~CustomTreeCtrl.GetMaxCollapsedItems` items given by the children
+        provider are left in collapsed branches.
         """
 
-        item.SetHasPlus(has)
-        self.RefreshLine(item)
+        if self._maxCollapsedItems is None:
+            return
+
+        total = sum([count for item, count in self._collapsedBranches.values()])
+
+        while total > self._maxCollapsedItems and self._collapsedBranches:
+            item, count = next(iter(self._collapsedBranches.values()))
+            total -= count
+            self.ReleaseChildren(item)
 
 
     def SetItemBold(self, item, bold=True):
@@ -4798,6 +5469,76 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         self.AdjustMyScrollbars()
 
 
+    def EnableLabelIndex(self, enable=True):
+        """
+        Enables or disables the index of the item labels, which speeds up
+        :meth:`~CustomTreeCtrl.FindItem` and :meth:`~CustomTreeCtrl.SearchItems` on
+        large trees. The index is kept up to date as items are added, deleted and
+        renamed.
+
+        :param bool `enable`: ``True`` to index the item labels, ``False`` otherwise.
+        """
+
+        if not enable:
+            self._labelIndex = None
+            return
+
+        items = []
+        if self._anchor:
+            stack = [self._anchor]
+            while stack:
+                item = stack.pop()
+                items.append((item, self.GetItemText(item)))
+                stack.extend(item.GetChildren())
+
+        self._labelIndex = TreeLabelIndex(items)
+
+
+    def IsLabelIndexEnabled(self):
+        """
+        Returns whether the item labels are indexed or not.
+
+        :see: :meth:`~CustomTreeCtrl.EnableLabelIndex`.
+        """
+
+        return self._labelIndex is not None
+
+
+    def SearchItems(self, text, substring=False):
+        """
+        Finds all the items whose label starts with or contains the given text. The
+        match is case insensitive.
+
+        :param string `text`: the text to look for;
+        :param bool `substring`: ``True`` to find the labels containing `text`,
+         ``False`` to find the labels starting with it.
+
+        :return: A list of :class:`GenericTreeItem`, in the order they are shown in the tree.
+
+        :see: :meth:`~CustomTreeCtrl.EnableLabelIndex`.
+        """
+
+        if self._labelIndex is not None:
+            if substring:
+                items = self._labelIndex.FindSubstring(text)
+            else:
+                items = self._labelIndex.FindPrefix(text)
+
+            return SortInTreeOrder(items)
+
+        text = FoldCase(text)
+        items = []
+        item = self._anchor
+
+        while item:
+            label = FoldCase(self.GetItemText(item))
+            if (substring and text in label) or (not substring and label.startswith(text)):
+                items.append(item)
+            item = self.GetNext(item)
+
+        return items
+
+
     def FindItem(self, idParent, prefixOrig):
         """
         Finds the first item starting with the given prefix after the given parent.
@@ -4806,8 +5547,14 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         :param string `prefixOrig`: a string containing the item text prefix.
 
         :return: An instance of :class:`GenericTreeItem` or ``None`` if no item has been found.
+
+        :note: Enable the label index with :meth:`~CustomTreeCtrl.EnableLabelIndex` to
+         find items quickly in large trees.
         """
 
+        if self._labelIndex is not None and idParent:
+            return self.FindIndexedItem(idParent, prefixOrig)
+
         # match is case insensitive as this is more convenient to the user: having
         # to press Shift-letter to go to the item starting with a capital letter
         # would be too bothersome
@@ -4846,6 +5593,48 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         return id
 
 
+    def FindIndexedItem(self, idParent, prefix):
+        """
+        Finds the first item starting with the given prefix after the given parent,
+        like :meth:`~CustomTreeCtrl.FindItem` but with the label index.
+
+        :param integer `idParent`: an instance of :class:`GenericTreeItem`;
+        :param string `prefix`: a string containing the item text prefix.
+
+        :return: An instance of :class:`GenericTreeItem` or ``None`` if no item has been found.
+        """
+
+        hiddenRoot = (self.HasAGWFlag(TR_HIDE_ROOT) and [self.GetRootItem()] or [None])[0]
+
+        # put the item we start from among the matches, to know where they are
+        matches = self._labelIndex.FindPrefix(prefix)
+        found = idParent in matches
+        if not found:
+            matches.append(idParent)
+
+        matches = SortInTreeOrder(matches)
+        n = matches.index(idParent)
+
+        # we shouldn't take the current item when the user starts typing (this
+        # allows to switch between two items starting with the same letter just by
+        # pressing it) but we shouldn't jump to the next one if the user is
+        # continuing to type
+        if found and len(prefix) > 1:
+            return idParent
+
+        if n + 1 < len(matches):
+            return matches[n + 1]
+
+        # wrap to the beginning, but the virtual root can't be selected
+        if matches[0] is hiddenRoot:
+            matches.pop(0)
+            if idParent is hiddenRoot:
+                # no tree item selected and idParent is not reachable
+                return self.GetNext(hiddenRoot)
+
+        return matches[0]
+
+
 # -----------------------------------------------------------------------------
 # operations
 # -----------------------------------------------------------------------------
@@ -4917,6 +5706,9 @@ class CustomTreeCtrl(wx.ScrolledWindow):
 
         parent.Insert(item, previous)
 
+        if self._labelIndex is not None:
+            self._labelIndex.Add(item, text)
+
         return item
 
 
@@ -4969,6 +5761,9 @@ class CustomTreeCtrl(wx.ScrolledWindow):
 
         self._anchor = GenericTreeItem(None, text, ct_type, wnd, image, selImage, data)
 
+        if self._labelIndex is not None:
+            self._labelIndex.Add(self._anchor, text)
+
         if wnd is not None:
             self._hasWindows = True
             self._itemWithWindow.append(self._anchor)
@@ -5198,6 +5993,12 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         :param `item`: an instance of :class:`GenericTreeItem`.
         """
 
+        # every deleted item comes here
+        if self._labelIndex is not None:
+            self._labelIndex.Remove(item)
+
+        self._collapsedBranches.pop(id(item), None)
+
         event = TreeEvent(wxEVT_TREE_DELETE_ITEM, self.GetId())
         event._item = item
         event.SetEventObject(self)
@@ -5259,6 +6060,9 @@ class CustomTreeCtrl(wx.ScrolledWindow):
 
         self._dirty = True     # do this first so stuff below doesn't cause flicker
 
+        # the item no longer holds any children given by the provider
+        self._collapsedBranches.pop(id(item), None)
+
         self.ChildrenClosing(item)
         item.DeleteChildren(self)
 
@@ -5336,6 +6140,8 @@ class CustomTreeCtrl(wx.ScrolledWindow):
     def DeleteAllItems(self):
         """ Deletes all items in the :class:`CustomTreeCtrl`. """
 
+        self._collapsedBranches.clear()
+
         if self._anchor:
             self.Delete(self._anchor)
 
@@ -5369,13 +6175,23 @@ class CustomTreeCtrl(wx.ScrolledWindow):
                 # cancelled by program
                 return
 
+        if self._childrenProvider and not item.HasChildren() and not item._childrenLoaded:
+            self.LoadChildren(item)
+
+            if not item.HasChildren():
+                # nothing to expand after all
+                item.SetHasPlus(False)
+                self.RefreshLine(item)
+                return
+
+        self._collapsedBranches.pop(id(item), None)
         item.Expand()
 
         if not self._sendEvent:
             # We are in ExpandAll/ExpandAllChildren
             return
 
-        self.CalculatePositions()
+        self.CalculateRows(item)
         self.RefreshSubtree(item)
 
         if self._hasWindows:
@@ -5457,9 +6273,18 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         self.ChildrenClosing(item)
         item.Collapse()
 
-        self.CalculatePositions()
+        self.CalculateRows(item)
         self.Refresh()
 
+        if item._childrenLoaded and self._maxCollapsedItems is not None:
+            # the collapsed branches inside this one are counted with it
+            for key, (other, count) in list(self._collapsedBranches.items()):
+                if self.IsDescendantOf(item, other):
+                    del self._collapsedBranches[key]
+
+            self._collapsedBranches[id(item)] = (item, item.GetChildrenCount())
+            self.ReleaseCollapsedBranches()
+
         if self._hasWindows:
             self.HideWindows()
 
@@ -6764,6 +7589,229 @@ class CustomTreeCtrl(wx.ScrolledWindow):
 
 
     # Now y stands for the top of the item, whereas it used to stand for middle !
+    def PaintRow(self, item, dc, level, x, y, h, align, left_image_list=0):
+        """
+        Paints an item with its button and its horizontal line.
+
+        :param `item`: an instance of :class:`GenericTreeItem`;
+        :param `dc`: an instance of :class:`wx.DC`;
+        :param integer `level`: the item level in the tree hierarchy;
+        :param integer `x`: the horizontal position of the item button;
+        :param integer `y`: the vertical position of the top of the item;
+        :param integer `h`: the height of the item line;
+        :param integer `align`: an integer specifying the alignment type, as in
+         :meth:`~CustomTreeCtrl.PaintLevel`;
+        :param integer `left_image_list`: the width of the images of the left image list.
+        """
+
+        y_top = y
+        y_mid = y_top + (h>>1)
+        y += h
+
+        if wx.Platform == "__WXMAC__":
+            # don't draw rect outline if we already have the
+            # background colour under Mac
+            pen = ((item.IsSelected() and self._hasFocus) and [self._borderPen] or [wx.TRANSPARENT_PEN])[0]
+        else:
+            pen = self._borderPen
+
+        if item.IsSelected():
+            if (wx.Platform == "__WXMAC__" and self._hasFocus):
+                colText = wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHTTEXT)
+            else:
+                colText = wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHTTEXT)
+
+            if self._vistaselection:
+                colText = wx.BLACK
+                attr = item.GetAttributes()
+
+                if attr and attr.HasTextColour():
+                    colText = attr.GetTextColour()
+
+        else:
+            attr = item.GetAttributes()
+            if attr and attr.HasTextColour():
+                colText = attr.GetTextColour()
+            else:
+                colText = self.GetForegroundColour()
+
+        # prepare to draw
+        dc.SetTextForeground(colText)
+        dc.SetPen(pen)
+        oldpen = pen
+
+        # draw
+        self.PaintItem(item, dc, level, align)
+
+        if self.HasAGWFlag(TR_ROW_LINES):
+
+            # if the background colour is white, choose a
+            # contrasting colour for the lines
+            medium_grey = wx.Pen(wx.Colour(200, 200, 200))
+            dc.SetPen(((self.GetBackgroundColour() == wx.WHITE) and [medium_grey] or [wx.WHITE_PEN])[0])
+            dc.DrawLine(0, y_top, 10000, y_top)
+            dc.DrawLine(0, y, 10000, y)
+
+        # restore DC objects
+        dc.SetBrush(wx.WHITE_BRUSH)
+        dc.SetTextForeground(wx.BLACK)
+
+        if not self.HasAGWFlag(TR_NO_LINES):
+
+            # draw the horizontal line here
+            dc.SetPen(self._dottedPen)
+            x_start = x
+            if x > self._indent+left_image_list:
+                x_start -= self._indent
+            elif self.HasAGWFlag(TR_LINES_AT_ROOT):
+                x_start = 3
+            dc.DrawLine(x_start, y_mid, x + self._spacing, y_mid)
+            dc.SetPen(oldpen)
+
+        # should the item show a button?
+        if item.HasPlus() and self.HasButtons():
+
+            if self._imageListButtons:
+
+                # draw the image button here
+                image_h = 0
+                image_w = 0
+                image = (item.IsExpanded() and [TreeItemIcon_Expanded] or [TreeItemIcon_Normal])[0]
+                if item.IsSelected():
+                    image += TreeItemIcon_Selected - TreeItemIcon_Normal
+
+                image_w, image_h = self._imageListButtons.GetSize(image)
+                xx = x - image_w//2
+                yy = y_mid - image_h//2
+
+                dc.SetClippingRegion(xx, yy, image_w, image_h)
+                self._imageListButtons.Draw(image, dc, xx, yy,
+                                            wx.IMAGELIST_DRAW_TRANSPARENT)
+                dc.DestroyClippingRegion()
+
+            else: # no custom buttons
+
+                if self.HasAGWFlag(TR_TWIST_BUTTONS):
+                    # We draw something like the Mac twist buttons
+
+                    dc.SetPen(wx.BLACK_PEN)
+                    dc.SetBrush(self._hilightBrush)
+                    button = [wx.Point(), wx.Point(), wx.Point()]
+
+                    if item.IsExpanded():
+                        button[0].x = x - 5
+                        button[0].y = y_mid - 3
+                        button[1].x = x + 5
+                        button[1].y = button[0].y
+                        button[2].x = x
+                        button[2].y = button[0].y + 6
+                    else:
+                        button[0].x = x - 3
+                        button[0].y = y_mid - 5
+                        button[1].x = button[0].x
+                        button[1].y = y_mid + 5
+                        button[2].x = button[0].x + 5
+                        button[2].y = y_mid
+
+                    dc.DrawPolygon(button)
+
+                else:
+                    # These are the standard wx.TreeCtrl buttons as wx.RendererNative knows
+
+                    wImage = 11
+                    hImage = 11
+
+                    flag = 0
+
+                    if item.IsExpanded():
+                        flag |= _CONTROL_EXPANDED
+                    if item == self._underMouse:
+                        flag |= _CONTROL_CURRENT
+
+                    self._drawingfunction(self, dc, wx.Rect(x - wImage//2, y_mid - hImage//2, wImage, hImage), flag)
+
+
+    def PaintRows(self, dc, align):
+        """
+        Paints the items in the damaged part of :class:`CustomTreeCtrl`, using the
+        rows made by :meth:`~CustomTreeCtrl.CalculatePositions` instead of walking
+        the whole tree.
+
+        :param `dc`: an instance of :class:`wx.DC`;
+        :param integer `align`: an integer specifying the alignment type, as in
+         :meth:`~CustomTreeCtrl.PaintLevel`.
+        """
+
+        if not self._rows:
+            return
+
+        left_image_list = 0
+        if self._imageListLeft:
+            left_image_list += self._imageListLeft.GetBitmap(0).GetWidth()
+
+        x0 = left_image_list
+        if not self.HasAGWFlag(TR_HIDE_ROOT):
+            x0 += self._indent
+
+        box = self.GetUpdateRegion().GetBox()
+        top = self.CalcUnscrolledPosition(box.x, box.y)[1]
+        bottom = top + box.height
+
+        rows = self._rows.GetRowsIn(top, bottom)
+        if not rows:
+            return
+
+        exposed_x = dc.LogicalToDeviceX(0)
+
+        for item, level, y, h in rows:
+            if self.IsExposed(exposed_x, dc.LogicalToDeviceY(y), 10000, h):  # 10000 = very much
+                self.PaintRow(item, dc, level, x0 + level*self._indent, y, h, align, left_image_list)
+
+        if self.HasAGWFlag(TR_NO_LINES):
+            return
+
+        # the items whose lines down to their last child cross the damaged
+        # part: the ancestors of the first item and the expanded items
+        parents = []
+        item, level = rows[0][0].GetParent(), rows[0][1] - 1
+        while item and (level > 0 or not self.HasAGWFlag(TR_HIDE_ROOT)):
+            parents.append((item, level))
+            item, level = item.GetParent(), level - 1
+
+        for item, level, y, h in rows:
+            if item.IsExpanded() and item.HasChildren():
+                parents.append((item, level))
+
+        # Only draw the portion of the lines that is visible, in case they are huge
+        xOrigin, yOrigin = dc.GetDeviceOrigin()
+        yOrigin = abs(yOrigin)
+        width, height = self.GetClientSize()
+
+        dc.SetPen(self._dottedPen)
+
+        for item, level in parents:
+            x = x0 + level*self._indent
+            y_mid = item.GetY() + (self.GetLineHeight(item)>>1)
+            if self.HasButtons():
+                y_mid += 5
+
+            lastChild = item.GetChildren()[-1]
+            oldY = lastChild.GetY() + (self.GetLineHeight(lastChild)>>1)
+
+            y_mid = max(y_mid, yOrigin)
+            oldY = min(oldY, yOrigin + height)
+            if y_mid < oldY:
+                dc.DrawLine(x, y_mid, x, oldY)
+
+        if self.HasAGWFlag(TR_HIDE_ROOT) and self.HasAGWFlag(TR_LINES_AT_ROOT):
+            # draw line down to last child of the hidden root
+            children = self._anchor.GetChildren()
+            if children:
+                origY = children[0].GetY() + (self.GetLineHeight(children[0])>>1)
+                oldY = children[-1].GetY() + (self.GetLineHeight(children[-1])>>1)
+                dc.DrawLine(3, origY, 3, oldY)
+
+
     def PaintLevel(self, item, dc, level, y, align):
         """
         Paint a level in the hierarchy of :class:`CustomTreeCtrl`.
@@ -6834,127 +7882,7 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         exposed_y = dc.LogicalToDeviceY(y_top)
 
         if self.IsExposed(exposed_x, exposed_y, 10000, h):  # 10000 = very much
-            if wx.Platform == "__WXMAC__":
-                # don't draw rect outline if we already have the
-                # background colour under Mac
-                pen = ((item.IsSelected() and self._hasFocus) and [self._borderPen] or [wx.TRANSPARENT_PEN])[0]
-            else:
-                pen = self._borderPen
-
-            if item.IsSelected():
-                if (wx.Platform == "__WXMAC__" and self._hasFocus):
-                    colText = wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHTTEXT)
-                else:
-                    colText = wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHTTEXT)
-
-                if self._vistaselection:
-                    colText = wx.BLACK
-                    attr = item.GetAttributes()
-
-                    if attr and attr.HasTextColour():
-                        colText = attr.GetTextColour()
-
-            else:
-                attr = item.GetAttributes()
-                if attr and attr.HasTextColour():
-                    colText = attr.GetTextColour()
-                else:
-                    colText = self.GetForegroundColour()
-
-            # prepare to draw
-            dc.SetTextForeground(colText)
-            dc.SetPen(pen)
-            oldpen = pen
-
-            # draw
-            self.PaintItem(item, dc, level, align)
-
-            if self.HasAGWFlag(TR_ROW_LINES):
-
-                # if the background colour is white, choose a
-                # contrasting colour for the lines
-                medium_grey = wx.Pen(wx.Colour(200, 200, 200))
-                dc.SetPen(((self.GetBackgroundColour() == wx.WHITE) and [medium_grey] or [wx.WHITE_PEN])[0])
-                dc.DrawLine(0, y_top, 10000, y_top)
-                dc.DrawLine(0, y, 10000, y)
-
-            # restore DC objects
-            dc.SetBrush(wx.WHITE_BRUSH)
-            dc.SetTextForeground(wx.BLACK)
-
-            if not self.HasAGWFlag(TR_NO_LINES):
-
-                # draw the horizontal line here
-                dc.SetPen(self._dottedPen)
-                x_start = x
-                if x > self._indent+left_image_list:
-                    x_start -= self._indent
-                elif self.HasAGWFlag(TR_LINES_AT_ROOT):
-                    x_start = 3
-                dc.DrawLine(x_start, y_mid, x + self._spacing, y_mid)
-                dc.SetPen(oldpen)
-
-            # should the item show a button?
-            if item.HasPlus() and self.HasButtons():
-
-                if self._imageListButtons:
-
-                    # draw the image button here
-                    image_h = 0
-                    image_w = 0
-                    image = (item.IsExpanded() and [TreeItemIcon_Expanded] or [TreeItemIcon_Normal])[0]
-                    if item.IsSelected():
-                        image += TreeItemIcon_Selected - TreeItemIcon_Normal
-
-                    image_w, image_h = self._imageListButtons.GetSize(image)
-                    xx = x - image_w//2
-                    yy = y_mid - image_h//2
-
-                    dc.SetClippingRegion(xx, yy, image_w, image_h)
-                    self._imageListButtons.Draw(image, dc, xx, yy,
-                                                wx.IMAGELIST_DRAW_TRANSPARENT)
-                    dc.DestroyClippingRegion()
-
-                else: # no custom buttons
-
-                    if self.HasAGWFlag(TR_TWIST_BUTTONS):
-                        # We draw something like the Mac twist buttons
-
-                        dc.SetPen(wx.BLACK_PEN)
-                        dc.SetBrush(self._hilightBrush)
-                        button = [wx.Point(), wx.Point(), wx.Point()]
-
-                        if item.IsExpanded():
-                            button[0].x = x - 5
-                            button[0].y = y_mid - 3
-                            button[1].x = x + 5
-                            button[1].y = button[0].y
-                            button[2].x = x
-                            button[2].y = button[0].y + 6
-                        else:
-                            button[0].x = x - 3
-                            button[0].y = y_mid - 5
-                            button[1].x = button[0].x
-                            button[1].y = y_mid + 5
-                            button[2].x = button[0].x + 5
-                            button[2].y = y_mid
-
-                        dc.DrawPolygon(button)
-
-                    else:
-                        # These are the standard wx.TreeCtrl buttons as wx.RendererNative knows
-
-                        wImage = 11
-                        hImage = 11
-
-                        flag = 0
-
-                        if item.IsExpanded():
-                            flag |= _CONTROL_EXPANDED
-                        if item == self._underMouse:
-                            flag |= _CONTROL_CURRENT
-
-                        self._drawingfunction(self, dc, wx.Rect(x - wImage//2, y_mid - hImage//2, wImage, hImage), flag)
+            self.PaintRow(item, dc, level, x, y_top, h, align, left_image_list)
 
         if item.IsExpanded():
 
@@ -7025,6 +7953,10 @@ class CustomTreeCtrl(wx.ScrolledWindow):
         elif self.HasAGWFlag(TR_ALIGN_WINDOWS_RIGHT):
             align = 2
 
+        if self._rows is not None and not self._dirty:
+            self.PaintRows(dc, align)
+            return
+
         y = 2
         self.PaintLevel(self._anchor, dc, 0, y, align)
 
@@ -7477,7 +8409,15 @@ class CustomTreeCtrl(wx.ScrolledWindow):
             return None, flags
 
         point = self.CalcUnscrolledPosition(*point)
-        hit, flags = self._anchor.HitTest(point, self, flags, 0)
+
+        if self._rows is not None and not self._dirty:
+            # only the item in the row under the point can be hit
+            hit = None
+            item = self._rows.GetRowAt(point[1])
+            if item is not None:
+                hit, flags = item.HitTestRow(point, self, flags)
+        else:
+            hit, flags = self._anchor.HitTest(point, self, flags, 0)
 
         if hit == None:
             flags = TREE_HITTEST_NOWHERE
@@ -8168,7 +9108,18 @@ class CustomTreeCtrl(wx.ScrolledWindow):
 
 
     def CalculatePositions(self):
-        """ Calculates all the positions of the visible items. """
+        """
+        Calculates all the positions of the visible items.
+
+        The items that are shown are kept as a :class:`TreeRows`, which is used to
+        paint and hit test them, and which :meth:`~CustomTreeCtrl.CalculateRows`
+        updates when an item is expanded or collapsed.
+        """
+
+        if self._rows is not None:
+            # the items get back their absolute positions
+            self._rows.Detach()
+            self._rows = None
 
         if not self._anchor:
             return
@@ -8180,13 +9131,140 @@ class CustomTreeCtrl(wx.ScrolledWindow):
 
         dc.SetFont(self._normalFont)
         dc.SetPen(self._dottedPen)
-        y = 2
-        y = self.CalculateLevel(self._anchor, dc, 0, y) # start recursion
 
-        if self.HasAGWFlag(TR_ALIGN_WINDOWS) or self.HasAGWFlag(TR_ALIGN_WINDOWS_RIGHT):
-            align = (self.HasAGWFlag(TR_ALIGN_WINDOWS) and [1] or [2])[0]
-            y = 2
-            y = self.CalculateLevel(self._anchor, dc, 0, y, align) # start recursion
+        if self.HasAGWFlag(TR_HIDE_ROOT):
+            # a hidden root is not evaluated, but its
+            # children are always calculated
+            rows, levels = self.CollectRows(self._anchor, 0)
+        else:
+            rows, levels = [self._anchor], [0]
+            if self._anchor.IsExpanded():
+                more, moreLevels = self.CollectRows(self._anchor, 0)
+                rows.extend(more)
+                levels.extend(moreLevels)
+
+        # the sizes are the same with all the window alignments, so
+        # a single pass is enough
+        for item, level in zip(rows, levels):
+            self.CalculateSize(item, dc, level)
+
+        heights = self.LayoutRows(rows, levels)
+        self._rows = TreeRows(rows, levels, heights, 2)
+
+
+    def CollectRows(self, item, level):
+        """
+        Returns the descendants of an item that are shown when the item is expanded,
+        in display order.
+
+        :param `item`: an instance of :class:`GenericTreeItem`;
+        :param integer `level`: the item level in the tree hierarchy.
+
+        :return: A tuple with the list of items and the list of their levels.
+        """
+
+        rows, levels = [], []
+        stack = [(child, level + 1) for child in reversed(item.GetChildren())]
+
+        while stack:
+            item, level = stack.pop()
+            rows.append(item)
+            levels.append(level)
+            if item.IsExpanded():
+                children = item.GetChildren()
+                stack.extend([(child, level + 1) for child in reversed(children)])
+
+        return rows, levels
+
+
+    def LayoutRows(self, rows, levels):
+        """
+        Sets the horizontal positions of some rows, from their levels.
+
+        :param `rows`: a list of :class:`GenericTreeItem`;
+        :param `levels`: the levels of the items in the tree hierarchy.
+
+        :return: The list of the heights of the rows, in pixels.
+        """
+
+        x0 = self._spacing
+        if self._imageListLeft:
+            x0 += self._imageListLeft.GetBitmap(0).GetWidth()
+        if not self.HasAGWFlag(TR_HIDE_ROOT):
+            x0 += self._indent
+
+        indent = self._indent
+        heights = []
+
+        for item, level in zip(rows, levels):
+            item.SetX(x0 + level*indent)
+            heights.append(self.GetLineHeight(item))
+
+        return heights
+
+
+    def GetRowIndex(self, item):
+        """
+        Returns the row of an item in the rows made by :meth:`~CustomTreeCtrl.CalculatePositions`.
+
+        :param `item`: an instance of :class:`GenericTreeItem`.
+
+        :return: The index of the row, or -1 if the item is not shown.
+        """
+
+        if self._rows is None:
+            return -1
+
+        return self._rows.GetIndex(item)
+
+
+    def CalculateRows(self, item):
+        """
+        Updates the positions of the items after `item` has been expanded or
+        collapsed, replacing only the rows of its descendants.
+
+        Falls back to :meth:`~CustomTreeCtrl.CalculatePositions` if the rows are
+        out of date.
+
+        :param `item`: an instance of :class:`GenericTreeItem`.
+        """
+
+        if self._rows is None or self._dirty:
+            self.CalculatePositions()
+            return
+
+        level = self._rows.GetLevel(item)
+        if level < 0:
+            self.CalculatePositions()
+            return
+
+        for child in self._rows.GetChildRows(item):
+            if child.GetWindow():
+                # the alignment of the windows may change
+                self.CalculatePositions()
+                return
+
+        if item.IsExpanded():
+            newRows, newLevels = self.CollectRows(item, level)
+        else:
+            newRows, newLevels = [], []
+
+        lineHeight = self._lineHeight
+
+        dc = wx.ClientDC(self)
+        self.PrepareDC(dc)
+        dc.SetFont(self._normalFont)
+
+        for child, childLevel in zip(newRows, newLevels):
+            self.CalculateSize(child, dc, childLevel)
+
+        if lineHeight != self._lineHeight and not self.HasAGWFlag(TR_HAS_VARIABLE_ROW_HEIGHT):
+            # all the lines are higher
+            self.CalculatePositions()
+            return
+
+        heights = self.LayoutRows(newRows, newLevels)
+        self._rows.ReplaceChildRows(item, newRows, newLevels, heights)
 
 
     def RefreshSubtree(self, item):
@@ -2405,6 +2405,9 @@ class TreeListMainWindow(CustomTreeCtrl):
 
         parent.Insert(item, previous)
 
+        if self._labelIndex is not None:
+            self._labelIndex.Add(item, text)
+
         return item
 
 
@@ -2446,6 +2449,9 @@ class TreeListMainWindow(CustomTreeCtrl):
         arr[self._main_column] = text
         self._anchor = TreeListItem(self, None, arr, ct_type, wnd, image, selImage, data)
 
+        if self._labelIndex is not None:
+            self._labelIndex.Add(self._anchor, text)
+
         if wnd is not None:
             self._hasWindows = True
             self._itemWithWindow.append(self._anchor)
@@ -2636,6 +2642,10 @@ class TreeListMainWindow(CustomTreeCtrl):
         if column >= 0 and column < self.GetColumnCount():
             self._main_column = column
 
+            if self._labelIndex is not None:
+                # index the labels of the new main column
+                self.EnableLabelIndex()
+
 
     def GetMainColumn(self):
         """
@@ -3928,6 +3938,31 @@ class TreeListMainWindow(CustomTreeCtrl):
         self.CalculateLevel(self._anchor, dc, 0, y, x_colstart) # start recursion
 
 
+    def AppendProvidedItem(self, parentId, text, data=None):
+        """
+        Appends an item given by the children provider. Used internally.
+
+        :param `parentId`: an instance of :class:`TreeListItem` representing the
+         item's parent;
+        :param `text`: the item text label, or a list with the text of every column;
+        :param `data`: the Python object associated with the item.
+
+        :return: An instance of :class:`TreeListItem`.
+
+        :see: :meth:`CustomTreeCtrl.SetChildrenProvider() <lib.agw.customtreectrl.CustomTreeCtrl.SetChildrenProvider>`.
+        """
+
+        if isinstance(text, six.string_types):
+            return self.AppendItem(parentId, text, data=data)
+
+        item = self.AppendItem(parentId, text[self._main_column], data=data)
+        for column, label in enumerate(text):
+            if column != self._main_column:
+                item.SetText(column, label)
+
+        return item
+
+
     def SetItemText(self, item, text, column=None):
         """
         Sets the item text label.
@@ -3940,6 +3975,9 @@ class TreeListMainWindow(CustomTreeCtrl):
 
         dc = wx.ClientDC(self)
         item.SetText(column, text)
+        if self._labelIndex is not None and column in (None, self._main_column):
+            self._labelIndex.Add(item, text)
+
         self.CalculateSize(item, dc)
         self.RefreshLine(item)
 
@@ -4107,7 +4145,9 @@ _methods = ["GetIndent", "SetIndent", "GetSpacing", "SetSpacing", "GetImageList"
             "IsDescendantOf", "SetItemHyperText", "IsItemHyperText", "SetItemBold", "SetItemDropHighlight", "SetItemItalic",
             "GetEditControl", "ShouldInheritColours", "GetItemWindow", "SetItemWindow", "SetItemTextColour", "HideItem",
             "DeleteAllItems", "ItemHasChildren", "ToggleItemSelection", "SetItemType", "GetCurrentItem",
-            "SetItem3State", "SetItem3StateValue", "GetItem3StateValue", "IsItem3State", "GetPrev"]
+            "SetItem3State", "SetItem3StateValue", "GetItem3StateValue", "IsItem3State", "GetPrev",
+            "SetChildrenProvider", "GetChildrenProvider", "SetMaxCollapsedItems", "GetMaxCollapsedItems",
+            "ReleaseChildren", "EnableLabelIndex", "IsLabelIndexEnabled", "SearchItems"]
 
 
 class HyperTreeList(wx.Control):
@@ -117,6 +117,8 @@ With :class:`ThumbnailCtrl` you can:
   working directory information and it has history entries;
 - possibility to show tooltips on thumbnails, which display file information
   (like file name, size, last modification date and thumbnail size).
+- Load the thumbnails in a pool of threads, the visible ones first, and keep
+  them in a folder so that they are only made once (see :meth:`~ScrolledThumbnail.SetCacheDir`).
 
 
 :note: Using highlight thumbnails on mouse hovering may be slow on slower
@@ -163,19 +165,22 @@ Version 0.9
 
 import wx
 import os
+import io
 import time
 import zlib
+import bisect
+import struct
+import hashlib
+import tempfile
+import threading
+import multiprocessing
 
 import six
 from math import pi
+from collections import OrderedDict
 
 from wx.lib.embeddedimage import PyEmbeddedImage
 
-if six.PY3:
-    import _thread as thread
-else:
-    import thread
-
 #----------------------------------------------------------------------
 # Get Default Icon/Data
 #----------------------------------------------------------------------
@@ -414,6 +419,9 @@ TN_USE_PIL = 0
 TIME_FMT = '%d %b %Y, %H:%M:%S'
 """ Time format string for the :class:`Thumb` representation on screen. """
 
+BITMAP_CACHE_SIZE = 64*1024*1024
+""" Default memory budget, in bytes, of the scaled thumbnail bitmaps kept by :class:`ThumbnailCtrl`. """
+
 
 def KeyThumb(item):
     """
@@ -558,6 +566,404 @@ class NativeImageHandler(object):
 
 
 
+# ---------------------------------------------------------------------------- #
+# Class ThumbnailCache, keeps the thumbnails in files to load them faster
+# ---------------------------------------------------------------------------- #
+
+class ThumbnailCache(object):
+    """
+    This class keeps the thumbnails in a folder, so that they only have to be
+    made once.
+
+    The thumbnails are found by a hash of the file contents, so renaming or
+    moving the images doesn't lose them, and changing an image makes a new
+    thumbnail. Only the size of the file and its first and last 64 Kb are
+    hashed, so that the images don't have to be read in full.
+    """
+
+    _magic = b"TNC1"
+    _header = struct.Struct("<4sIIB")
+    _chunk = 65536
+
+    def __init__(self, folder):
+        """
+        Default class constructor.
+
+        :param `folder`: the folder to keep the thumbnails in. It is created if
+         it doesn't exist.
+        """
+
+        self._folder = folder
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+
+    def GetFolder(self):
+        """ Returns the folder the thumbnails are kept in. """
+
+        return self._folder
+
+
+    def GetKey(self, filename, thumbnailsize):
+        """
+        Returns the key of the thumbnail of an image.
+
+        :param `filename`: a file containing an image;
+        :param `thumbnailsize`: the size of the thumbnail.
+
+        :raise: `IOError` or `OSError` if the file can not be read.
+        """
+
+        digest = hashlib.sha1()
+        with open(filename, "rb") as fid:
+            fid.seek(0, os.SEEK_END)
+            size = fid.tell()
+            digest.update(struct.pack("<QII", size, thumbnailsize[0], thumbnailsize[1]))
+            fid.seek(0)
+            digest.update(fid.read(self._chunk))
+            if size > self._chunk:
+                fid.seek(max(self._chunk, size - self._chunk))
+                digest.update(fid.read(self._chunk))
+
+        return digest.hexdigest()
+
+
+    def GetPath(self, key):
+        """
+        Returns the file a thumbnail is kept in.
+
+        :param `key`: the key of the thumbnail, as returned by :meth:`~ThumbnailCache.GetKey`.
+        """
+
+        return os.path.join(self._folder, key[:2], key[2:] + ".thumb")
+
+
+    def Load(self, key):
+        """
+        Loads a thumbnail, as saved by :meth:`~ThumbnailCache.Save`.
+
+        :param `key`: the key of the thumbnail, as returned by :meth:`~ThumbnailCache.GetKey`.
+
+        :return: a tuple of the thumbnail image, the original size of the image and
+         whether the thumbnail has an alpha channel, or ``None`` if the thumbnail is
+         not in the cache or can not be read.
+        """
+
+        try:
+            with open(self.GetPath(key), "rb") as fid:
+                data = fid.read()
+        except (IOError, OSError):
+            return None
+
+        size = self._header.size
+        if len(data) <= size:
+            return None
+
+        magic, width, height, alpha = self._header.unpack(data[:size])
+        if magic != self._magic:
+            return None
+
+        img = wx.Image(io.BytesIO(data[size:]), wx.BITMAP_TYPE_ANY)
+        if not img.IsOk():
+            return None
+
+        return img, (width, height), bool(alpha)
+
+
+    def Save(self, key, img, originalsize, alpha):
+        """
+        Saves a thumbnail. Images with an alpha channel are saved as PNG, the
+        other ones as JPEG.
+
+        :param `key`: the key of the thumbnail, as returned by :meth:`~ThumbnailCache.GetKey`;
+        :param `img`: the thumbnail, an instance of :class:`wx.Image`;
+        :param `originalsize`: the size of the original image;
+        :param `alpha`: whether the thumbnail has an alpha channel.
+        """
+
+        stream = io.BytesIO()
+        stream.write(self._header.pack(self._magic, originalsize[0], originalsize[1], bool(alpha)))
+        if not img.SaveFile(stream, (alpha and [wx.BITMAP_TYPE_PNG] or [wx.BITMAP_TYPE_JPEG])[0]):
+            return
+
+        path = self.GetPath(key)
+        folder = os.path.dirname(path)
+
+        try:
+            if not os.path.isdir(folder):
+                os.makedirs(folder)
+            fd, tmpname = tempfile.mkstemp(dir=folder)
+            with os.fdopen(fd, "wb") as fid:
+                fid.write(stream.getvalue())
+            # the thumbnail only appears when it is complete
+            if hasattr(os, "replace"):
+                os.replace(tmpname, path)
+            else:
+                if os.path.exists(path):
+                    os.remove(path)
+                os.rename(tmpname, path)
+        except (IOError, OSError):
+            # another thread or process got there first, or the disk is full
+            pass
+
+
+    def Clear(self):
+        """ Removes all the thumbnails from the cache. """
+
+        for folder in os.listdir(self._folder):
+            folder = os.path.join(self._folder, folder)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                if name.endswith(".thumb"):
+                    try:
+                        os.remove(os.path.join(folder, name))
+                    except OSError:
+                        pass
+
+
+# ---------------------------------------------------------------------------- #
+# Class ThumbnailLoader, loads the thumbnails in worker threads
+# ---------------------------------------------------------------------------- #
+
+class ThumbnailLoader(object):
+    """
+    This class loads thumbnails in a pool of worker threads.
+
+    The thumbnails that are on screen are loaded first, then the ones after
+    them and last the ones before them: :meth:`~ThumbnailLoader.SetFirstVisible`
+    changes this order at any time, for example when the window is scrolled.
+    Starting again or cancelling drops the thumbnails that are not loaded yet,
+    and the ones that are being loaded are not sent to the callback.
+
+    The callback is called in the main thread, with the data of the job and a
+    tuple of the thumbnail image, the original image size and whether the
+    thumbnail has an alpha channel.
+    """
+
+    def __init__(self, imagehandler, callback, workers=None, cache=None,
+                 thumbnailsize=(300, 240)):
+        """
+        Default class constructor.
+
+        :param `imagehandler`: the image handler used to load the thumbnails, an instance
+         of :class:`PILImageHandler` or :class:`NativeImageHandler`;
+        :param `callback`: the function called with each loaded thumbnail;
+        :param `workers`: the number of worker threads, ``None`` to use one for every
+         processor, up to four;
+        :param `cache`: an instance of :class:`ThumbnailCache`, or ``None`` not to keep
+         the thumbnails on disk;
+        :param `thumbnailsize`: the size of the loaded thumbnails.
+        """
+
+        if workers is None:
+            try:
+                workers = min(multiprocessing.cpu_count(), 4)
+            except NotImplementedError:
+                workers = 2
+
+        self._imageHandler = imagehandler
+        self._callback = callback
+        self._cache = cache
+        self._thumbnailsize = thumbnailsize
+        self._numworkers = max(1, workers)
+
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._jobs = []
+        self._pending = []
+        self._loading = 0
+        self._first = 0
+        self._pool = None
+        self._broken = None
+
+
+    def SetCache(self, cache):
+        """
+        Sets the cache of the thumbnails.
+
+        :param `cache`: an instance of :class:`ThumbnailCache`, or ``None`` not to keep
+         the thumbnails on disk.
+        """
+
+        self._cache = cache
+
+
+    def GetCache(self):
+        """ Returns the cache of the thumbnails, or ``None``. """
+
+        return self._cache
+
+
+    def Start(self, jobs):
+        """
+        Starts loading thumbnails, cancelling the ones that are not loaded yet.
+
+        :param `jobs`: a list of (filename, data) tuples, the data is passed back to
+         the callback.
+        """
+
+        with self._condition:
+            self._generation += 1
+            self._jobs = list(jobs)
+            self._pending = list(range(len(self._jobs)))
+            self._loading = 0
+            self._first = 0
+
+            if self._pool is None and self._jobs:
+                self._pool = pool = object()
+                for ii in range(self._numworkers):
+                    worker = threading.Thread(target=self._Work, args=(pool,))
+                    worker.daemon = True
+                    worker.start()
+
+            self._condition.notify_all()
+
+
+    def Cancel(self):
+        """ Cancels the thumbnails that are not loaded yet. """
+
+        with self._condition:
+            self._generation += 1
+            self._jobs = []
+            self._pending = []
+            self._loading = 0
+
+
+    def Stop(self):
+        """ Cancels the thumbnails that are not loaded yet and stops the worker threads. """
+
+        with self._condition:
+            self._generation += 1
+            self._jobs = []
+            self._pending = []
+            self._loading = 0
+            self._pool = None
+            self._condition.notify_all()
+
+
+    def IsRunning(self):
+        """ Returns whether some thumbnails are not loaded or not sent to the callback yet. """
+
+        with self._condition:
+            return bool(self._pending) or self._loading > 0
+
+
+    def SetFirstVisible(self, index):
+        """
+        Loads the thumbnails starting from the one at `index` first.
+
+        :param `index`: the index of the first visible thumbnail in the jobs list.
+        """
+
+        self._first = index
+
+
+    def _Work(self, pool):
+        """
+        The worker threads loop. Used internally.
+
+        :param `pool`: the workers are stopped when this is no longer the current pool.
+        """
+
+        while True:
+            with self._condition:
+                while self._pool is pool and not self._pending:
+                    self._condition.wait()
+
+                if self._pool is not pool:
+                    return
+
+                # the first pending job at or after the first visible one, if
+                # any, otherwise the nearest one before it
+                pending = self._pending
+                indx = bisect.bisect_left(pending, self._first)
+                if indx == len(pending):
+                    indx -= 1
+
+                filename, data = self._jobs[pending.pop(indx)]
+                generation = self._generation
+                self._loading += 1
+
+            result = self.LoadThumbnail(filename)
+
+            # the job is counted as loading until it is delivered
+            if generation == self._generation:
+                wx.CallAfter(self._Deliver, generation, data, result)
+
+
+    def _Deliver(self, generation, data, result):
+        """
+        Calls the callback in the main thread, unless the job was cancelled. Used internally.
+
+        :param `generation`: the generation of the job;
+        :param `data`: the data of the job;
+        :param `result`: the loaded thumbnail.
+        """
+
+        with self._condition:
+            if generation != self._generation:
+                return
+            self._loading -= 1
+
+        self._callback(data, result)
+
+
+    def LoadThumbnail(self, filename):
+        """
+        Loads a thumbnail from the cache or from the image file.
+
+        :param `filename`: a file containing an image.
+
+        :return: a tuple of the thumbnail image, the original size of the image and
+         whether the thumbnail has an alpha channel.
+        """
+
+        cache = self._cache
+        key = None
+
+        if cache is not None:
+            try:
+                key = cache.GetKey(filename, self._thumbnailsize)
+            except (IOError, OSError):
+                pass
+            else:
+                result = cache.Load(key)
+                if result is not None:
+                    return result
+
+        try:
+            result = self._imageHandler.LoadThumbnail(filename, self._thumbnailsize)
+        except Exception:
+            # Don't stop when a corrupt file is to be loaded
+            img = file_broken.GetImage()
+            return img, (img.GetWidth(), img.GetHeight()), img.HasAlpha()
+
+        # don't keep the placeholder of a corrupt file, which may be fixed later
+        if key is not None and not self._IsBroken(result[0]):
+            cache.Save(key, *result)
+
+        return result
+
+
+    def _IsBroken(self, img):
+        """
+        Returns whether an image is the placeholder shown for the files that can't
+        be loaded, as :class:`NativeImageHandler` returns it. Used internally.
+
+        :param `img`: an instance of :class:`wx.Image`.
+        """
+
+        broken = self._broken
+        if broken is None:
+            self._broken = broken = file_broken.GetImage()
+
+        if img.GetWidth() != broken.GetWidth() or img.GetHeight() != broken.GetHeight():
+            return False
+
+        return bytes(img.GetData()) == bytes(broken.GetData())
+
+
 # ---------------------------------------------------------------------------- #
 # Class ThumbnailEvent
 # ---------------------------------------------------------------------------- #
@@ -615,6 +1021,7 @@ class Thumb(object):
         self._bitmap = wx.Bitmap(1, 1)
         self._image = wx.Image(1, 1)
         self._rotation = 0
+        self._rotatedimage = None
         self._alpha = None
 
 
@@ -699,11 +1106,38 @@ class Thumb(object):
 
 
     def GetRotatedImage(self):
-        """ Returns a rotated image. """
+        """
+        Returns a rotated image.
+
+        :note: If no rotated image was set, it is made from the loaded image the
+         first time it is needed.
+        """
+
+        if self._rotatedimage is None:
+            if not hasattr(self, "_threadedimage"):
+                return GetMondrianImage()
+
+            img = self._threadedimage
+            self._rotatedimage = img.Rotate(self._rotation, (img.GetWidth()/2, img.GetHeight()/2), True)
 
         return self._rotatedimage
 
 
+    def GetSourceImage(self):
+        """
+        Returns the image the bitmap of the thumbnail is made from, or ``None`` if
+        the image is not loaded yet.
+        """
+
+        if not hasattr(self, "_threadedimage"):
+            return None
+
+        if self.GetRotation() % (2*pi) < 1e-6:
+            return self._threadedimage
+
+        return self.GetRotatedImage()
+
+
     def GetBitmap(self, width, height):
         """
         Returns the associated bitmap.
@@ -965,7 +1399,9 @@ class ThumbnailCtrl(wx.Panel):
                    "GetShowDir", "SetSelection", "GetSelection", "SetZoomFactor",
                    "GetZoomFactor", "SetCaptionFont", "GetCaptionFont", "GetItemIndex",
                    "InsertItem", "RemoveItemAt", "IsSelected", "Rotate", "ZoomIn", "ZoomOut",
-                   "EnableToolTips", "GetThumbInfo", "GetOriginalImage", "SetDropShadow", "GetDropShadow"]
+                   "EnableToolTips", "GetThumbInfo", "GetOriginalImage", "SetDropShadow", "GetDropShadow",
+                   "SetCacheDir", "GetCacheDir", "IsLoading", "SetBitmapCacheSize",
+                   "GetBitmapCacheSize"]
 
         for method in methods:
             setattr(self, method, getattr(self._scrolled, method))
@@ -1105,6 +1541,11 @@ class ScrolledThumbnail(wx.ScrolledWindow):
         self._tOutline = thumboutline
         self._filter = thumbfilter
         self._imageHandler = imagehandler()
+        self._loader = ThumbnailLoader(self._imageHandler, self.OnThumbLoaded)
+        self._bitmaps = OrderedDict()
+        self._bitmapbytes = 0
+        self._bitmapcachesize = BITMAP_CACHE_SIZE
+        self._visible = (0, -1)
         self._selected = -1
         self._pointed = -1
         self._labelcontrol = None
@@ -1155,6 +1596,7 @@ class ScrolledThumbnail(wx.ScrolledWindow):
         self.Bind(wx.EVT_SIZE, self.OnResize)
         self.Bind(wx.EVT_ERASE_BACKGROUND, lambda x: None)
         self.Bind(wx.EVT_PAINT, self.OnPaint)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.OnDestroy)
 
 
     def GetSelectedItem(self, index):
@@ -1459,6 +1901,8 @@ class ScrolledThumbnail(wx.ScrolledWindow):
     def Clear(self):
         """ Clears :class:`ThumbnailCtrl`. """
 
+        self._loader.Cancel()
+        self.ClearBitmapCache()
         self._items = []
         self._selected = -1
         self._selectedarray = []
@@ -1478,54 +1922,124 @@ class ScrolledThumbnail(wx.ScrolledWindow):
         return [f for f in os.listdir(directory) if lSplitExt(f)[1].lower() in fileExtList]
 
 
-    def ThreadImage(self, filenames):
+    def SetCacheDir(self, folder):
         """
-        Threaded method to load images. Used internally.
+        Sets the folder to keep the thumbnails in, so that they are only made once.
 
-        :param `filenames`: a Python list of file names containing images.
+        :param `folder`: the folder for the thumbnails, for example in
+         ``wx.StandardPaths.Get().GetUserLocalDataDir()``, or ``None`` not to keep
+         the thumbnails on disk.
+
+        :note: The cache is not shared between :class:`ThumbnailCtrl` instances
+         that use different image handlers.
         """
 
-        count = 0
+        if folder is None:
+            self._loader.SetCache(None)
+        else:
+            self._loader.SetCache(ThumbnailCache(folder))
 
-        while count < len(filenames):
 
-            if not self._isrunning:
-                self._isrunning = False
-                thread.exit()
-                return
+    def GetCacheDir(self):
+        """ Returns the folder the thumbnails are kept in, or ``None``. """
 
-            self.LoadImages(filenames[count], count)
-            if count < 4:
-                self.Refresh()
-            elif count%4 == 0:
-                self.Refresh()
+        cache = self._loader.GetCache()
+        return (cache is not None and [cache.GetFolder()] or [None])[0]
 
-            count = count + 1
 
-        self._isrunning = False
-        thread.exit()
+    def IsLoading(self):
+        """ Returns whether some thumbnails are still being loaded. """
 
+        return self._loader.IsRunning()
 
-    def LoadImages(self, newfile, imagecount):
+
+    def SetBitmapCacheSize(self, size):
         """
-        Threaded method to load images. Used internally.
+        Sets the memory budget of the scaled thumbnail bitmaps kept for painting.
 
-        :param `newfile`: a file name containing an image to thumbnail;
-        :param `imagecount`: the number of images loaded until now.
+        :param `size`: the budget in bytes, the least recently drawn bitmaps are
+         dropped first when it is exceeded. ``0`` disables the cache.
         """
 
-        if not self._isrunning:
-            thread.exit()
-            return
+        self._bitmapcachesize = size
+        self.TrimBitmapCache()
 
-        img, originalsize, alpha = self._imageHandler.LoadThumbnail(newfile, (300, 240))
-        try:
-            self._items[imagecount]._threadedimage = img
-            self._items[imagecount]._originalsize = originalsize
-            self._items[imagecount]._bitmap = img
-            self._items[imagecount]._alpha = alpha
-        except:
-            return
+
+    def GetBitmapCacheSize(self):
+        """ Returns the memory budget of the scaled thumbnail bitmaps, in bytes. """
+
+        return self._bitmapcachesize
+
+
+    def ClearBitmapCache(self):
+        """ Drops all the scaled thumbnail bitmaps kept for painting. """
+
+        self._bitmaps.clear()
+        self._bitmapbytes = 0
+
+
+    def TrimBitmapCache(self):
+        """ Drops the least recently drawn thumbnail bitmaps until they fit in the budget. """
+
+        while self._bitmaps and self._bitmapbytes > self._bitmapcachesize:
+            self._bitmapbytes -= self._bitmaps.popitem(last=False)[1][2]
+
+
+    def GetThumbBitmap(self, thumb, highlight=False):
+        """
+        Returns the bitmap of a thumbnail at the current thumbnail size.
+
+        The bitmaps are kept for every thumbnail, size, rotation and highlight, and
+        are made again only when the image of the thumbnail changes.
+
+        :param `thumb`: an instance of :class:`Thumb`;
+        :param `highlight`: ``True`` to get the highlighted bitmap.
+        """
+
+        source = thumb.GetSourceImage()
+        key = (thumb, self._tWidth, self._tHeight, thumb.GetRotation(), highlight)
+
+        entry = self._bitmaps.pop(key, None)
+        if entry is not None:
+            self._bitmapbytes -= entry[2]
+            if entry[0] is not source:
+                entry = None
+
+        if entry is None:
+            if highlight:
+                img = self.GetThumbBitmap(thumb).ConvertToImage()
+                bmp = self._imageHandler.HighlightImage(img, 1.5).ConvertToBitmap()
+            else:
+                bmp = thumb.GetBitmap(self._tWidth, self._tHeight)
+
+            entry = (source, bmp, bmp.GetWidth()*bmp.GetHeight()*4)
+
+        self._bitmaps[key] = entry
+        self._bitmapbytes += entry[2]
+        self.TrimBitmapCache()
+
+        return entry[1]
+
+
+    def OnThumbLoaded(self, thumb, result):
+        """
+        Stores a thumbnail loaded by the :class:`ThumbnailLoader`. Used internally.
+
+        :param `thumb`: the :class:`Thumb` the image was loaded for;
+        :param `result`: a tuple of the thumbnail image, the original size of the image
+         and whether the thumbnail has an alpha channel.
+        """
+
+        img, originalsize, alpha = result
+        thumb._threadedimage = img
+        thumb._originalsize = originalsize
+        thumb._bitmap = img
+        thumb._alpha = alpha
+        thumb._rotatedimage = None
+
+        first, last = self._visible
+        if thumb in self._items[first:last+1]:
+            self.Refresh()
 
 
     def ShowThumbs(self, thumbs, caption):
@@ -1538,20 +2052,13 @@ class ScrolledThumbnail(wx.ScrolledWindow):
 
         self.SetCaption(caption)
 
-        self._isrunning = False
-
         # update items
+        self.ClearBitmapCache()
         self._items = thumbs
-        myfiles = [thumb.GetFullFileName() for thumb in thumbs]
-
-        items = self._items[:]
         self._items.sort(key=KeyThumb)
 
-        newfiles = SortFiles(items, self._items, myfiles)
-        self._isrunning = True
-
-        thread.start_new_thread(self.ThreadImage, (newfiles,))
-        wx.MilliSleep(20)
+        # the thumbnails of the previous folder, if any, are cancelled
+        self._loader.Start([(thumb.GetFullFileName(), thumb) for thumb in self._items])
 
         self._selectedarray = []
         self.UpdateProp()
@@ -2004,14 +2511,11 @@ class ScrolledThumbnail(wx.ScrolledWindow):
         dc.DrawRectangle(0, 0, bmp.GetWidth(), bmp.GetHeight())
 
         # image
-        img = thumb.GetBitmap(self._tWidth, self._tHeight)
+        highlight = index == self.GetPointed() and self.GetHighlightPointed()
+        img = self.GetThumbBitmap(thumb, highlight)
         ww = img.GetWidth()
         hh = img.GetHeight()
 
-        if index == self.GetPointed() and self.GetHighlightPointed():
-            factor = 1.5
-            img = self._imageHandler.HighlightImage(img.ConvertToImage(), factor).ConvertToBitmap()
-
         imgRect = wx.Rect(x + (self._tWidth - img.GetWidth())/2,
                           y + (self._tHeight - img.GetHeight())/2,
                           img.GetWidth(), img.GetHeight())
@@ -2125,6 +2629,7 @@ class ScrolledThumbnail(wx.ScrolledWindow):
         # items
         row = -1
         xwhite = self._tBorder
+        first = last = None
 
         for ii in range(len(self._items)):
 
@@ -2143,10 +2648,19 @@ class ScrolledThumbnail(wx.ScrolledWindow):
             if not paintRect.Intersects(wx.Rect(tx, ty, tw, th)):
                 continue
 
+            if first is None:
+                first = ii
+            last = ii
+
             thmb = wx.Bitmap(tw, th)
             self.DrawThumbnail(thmb, self._items[ii], ii)
             dc.DrawBitmap(thmb, tx, ty)
 
+        # load the visible thumbnails first
+        if first is not None:
+            self._visible = (first, last)
+            self._loader.SetFirstVisible(first)
+
         rect = wx.Rect(xwhite, self._tBorder/2,
                        self._cols*(self._tWidth + self._tBorder),
                        self._rows*(self._tHeight + self._tBorder) + \
@@ -2168,6 +2682,19 @@ class ScrolledThumbnail(wx.ScrolledWindow):
             dc.DrawRectangle(rect)
 
 
+    def OnDestroy(self, event):
+        """
+        Handles the ``wx.EVT_WINDOW_DESTROY`` event for :class:`ThumbnailCtrl`.
+
+        :param `event`: a :class:`WindowDestroyEvent` event to be processed.
+        """
+
+        if event.GetEventObject() is self:
+            self._loader.Stop()
+
+        event.Skip()
+
+
     def OnResize(self, event):
         """
         Handles the ``wx.EVT_SIZE`` event for :class:`ThumbnailCtrl`.
@@ -2460,10 +2987,10 @@ class ScrolledThumbnail(wx.ScrolledWindow):
                 img.SetData(pil.convert('RGB').tostring())
                 thumb.SetRotation(newangle*pi/180)
             else:
-                img = thumb._threadedimage
                 newangle = thumb.GetRotation() + angle*pi/180
                 thumb.SetRotation(newangle)
-                img = img.Rotate(newangle, (img.GetWidth()/2, img.GetHeight()/2), True)
+                # the rotated image is made when the thumbnail is drawn
+                img = None
 
             thumb.SetRotatedImage(img)
             dlg.Update(count)
@@ -236,6 +236,7 @@ import wx
 import math
 import bisect
 import zlib
+from collections import OrderedDict
 from functools import cmp_to_key
 
 import six
@@ -519,6 +520,9 @@ WIDTH_COL_MIN = 10
 # the space between the image and the text in the report mode
 IMAGE_MARGIN_IN_REPORT_MODE = 5
 
+# how many rows of a virtual list control are kept by default
+ROW_CACHE_SIZE = 1000
+
 # the space between the image and the text in the report mode in header
 HEADER_IMAGE_MARGIN_IN_REPORT_MODE = 2
 
@@ -1144,6 +1148,168 @@ class SelectionStore(object):
         self._count = count
 
 
+# ----------------------------------------------------------------------------
+# RowHeightTree: the row heights of a list with variable row heights
+# ----------------------------------------------------------------------------
+
+class RowHeightTree(object):
+    """
+    RowHeightTree keeps the row heights of a :class:`UltimateListCtrl` with the
+    ``ULC_HAS_VARIABLE_ROW_HEIGHT`` style in a Fenwick (binary indexed) tree, so
+    that the `y` position of a row, the row at a `y` position and changing the
+    height of a row all take O(log n) time, instead of summing the heights of
+    all the rows above.
+
+    Inserting or deleting rows shifts the indices of the rows after them, so the
+    tree is built again from the known heights the next time it is used, once
+    for any number of insertions and deletions.
+    """
+
+    def __init__(self, heights=()):
+        """
+        Default class constructor.
+
+        :param `heights`: a sequence of non-negative row heights.
+        """
+
+        self._heights = list(heights)
+        self._Build()
+
+
+    def _Build(self):
+        """ Builds the tree from the row heights. Used internally. """
+
+        count = len(self._heights)
+
+        # build the tree in O(n): every node adds itself to its parent
+        self._tree = [0] + self._heights
+        for i in range(1, count + 1):
+            parent = i + (i & -i)
+            if parent <= count:
+                self._tree[parent] += self._tree[i]
+
+        self._step = 1
+        while self._step*2 <= count:
+            self._step *= 2
+
+
+    def __len__(self):
+        """ Returns the number of rows. """
+
+        return len(self._heights)
+
+
+    def GetHeight(self, row):
+        """
+        Returns the height of a row.
+
+        :param `row`: the row index.
+        """
+
+        return self._heights[row]
+
+
+    def InsertRow(self, row, height=0):
+        """
+        Inserts a row.
+
+        :param `row`: the index of the new row;
+        :param `height`: the (non-negative) height of the new row.
+        """
+
+        self._heights.insert(row, height)
+        self._tree = None
+
+
+    def DeleteRow(self, row):
+        """
+        Deletes a row.
+
+        :param `row`: the row index.
+        """
+
+        del self._heights[row]
+        self._tree = None
+
+
+    def SetHeight(self, row, height):
+        """
+        Sets the height of a row.
+
+        :param `row`: the row index;
+        :param `height`: the new (non-negative) row height.
+        """
+
+        delta = height - self._heights[row]
+        if not delta:
+            return
+
+        self._heights[row] = height
+        if self._tree is None:
+            return
+
+        count = len(self._heights)
+        i = row + 1
+        while i <= count:
+            self._tree[i] += delta
+            i += i & -i
+
+
+    def GetY(self, row):
+        """
+        Returns the total height of the rows before `row`.
+
+        :param `row`: the row index, it can be equal to the number of rows to get
+         the total height.
+        """
+
+        if self._tree is None:
+            self._Build()
+
+        y = 0
+        i = row
+        while i > 0:
+            y += self._tree[i]
+            i -= i & -i
+
+        return y
+
+
+    def GetTotalHeight(self):
+        """ Returns the total height of all the rows. """
+
+        return self.GetY(len(self._heights))
+
+
+    def FindRow(self, y):
+        """
+        Returns the index of the row at position `y`.
+
+        :param `y`: a position, measured from the top of the first row.
+
+        :return: -1 if `y` is negative, the number of rows if `y` is below the
+         last row.
+        """
+
+        if y < 0:
+            return -1
+
+        if self._tree is None:
+            self._Build()
+
+        row = 0
+        step = self._step
+        count = len(self._heights)
+
+        while step:
+            if row + step <= count and self._tree[row + step] <= y:
+                row += step
+                y -= self._tree[row]
+            step //= 2
+
+        return row
+
+
 # ----------------------------------------------------------------------------
 # UltimateListItemAttr: a structure containing the visual attributes of an item
 # ----------------------------------------------------------------------------
@@ -6076,6 +6242,14 @@ class UltimateListMainWindow(wx.ScrolledWindow):
         self._lineHeight = 0
         self._userLineHeight = None
 
+        # the row heights with ULC_HAS_VARIABLE_ROW_HEIGHT, rebuilt when needed
+        self._rowHeights = None
+        self._dirtyRows = set()
+
+        # the rows of a virtual list control, most recently used last
+        self._rowCache = OrderedDict()
+        self._rowCacheSize = ROW_CACHE_SIZE
+
         self._small_image_list = None
         self._normal_image_list = None
 
@@ -6404,6 +6578,8 @@ class UltimateListMainWindow(wx.ScrolledWindow):
                 line = self.GetLine(l)
                 line.ResetDimensions()
 
+            self._rowHeights = None
+
     # these are for UltimateListLineData usage only
     # get the backpointer to the list ctrl
     def GetListCtrl(self):
@@ -6529,21 +6705,175 @@ class UltimateListMainWindow(wx.ScrolledWindow):
          style set.
         """
 
-        listctrl = self.GetListCtrl()
         ld = self.GetDummyLine()
 
-        countCol = self.GetColumnCount()
-        for col in range(countCol):
-            ld.SetText(col, listctrl.OnGetItemText(line, col))
-            ld.SetToolTip(col, listctrl.OnGetItemToolTip(line, col))
-            ld.SetColour(col, listctrl.OnGetItemTextColour(line, col))
-            ld.SetImage(col, listctrl.OnGetItemColumnImage(line, col))
-            kind = listctrl.OnGetItemColumnKind(line, col)
+        row = self._rowCache.pop(line, None)
+        if row is None or len(row[0]) != self.GetColumnCount():
+            self.CacheRows(line, line)
+            row = self._rowCache.pop(line, None)
+            if row is None:
+                # the cache is off
+                row = self.FetchRows(line, line)[0]
+
+        if self._rowCacheSize > 0:
+            self._rowCache[line] = row
+
+        columns, attr = row
+        for col, (text, tooltip, colour, image, kind, checked) in enumerate(columns):
+            ld.SetText(col, text)
+            ld.SetToolTip(col, tooltip)
+            ld.SetColour(col, colour)
+            ld.SetImage(col, image)
             ld.SetKind(col, kind)
             if kind > 0:
-                ld.Check(col, listctrl.OnGetItemColumnCheck(line, col))
+                ld.Check(col, checked)
+
+        ld.SetAttr(attr)
+
+
+    def CacheRows(self, lineFrom, lineTo):
+        """
+        Makes sure the rows from `lineFrom` to `lineTo` are in the row cache.
+
+        If some of them are missing, :meth:`UltimateListCtrl.OnCacheHint() <UltimateListCtrl.OnCacheHint>`
+        is called and the rows from the first to the last missing one are fetched
+        with :meth:`~UltimateListMainWindow.FetchRows`.
+
+        :param `lineFrom`: the first line;
+        :param `lineTo`: the last line.
+
+        :note: This method is used only if the :class:`UltimateListCtrl` has the ``ULC_VIRTUAL``
+         style set.
+        """
+
+        if self._rowCacheSize <= 0 or lineTo < lineFrom:
+            return
+
+        countCol = self.GetColumnCount()
+        cache = self._rowCache
+        missing = [line for line in range(lineFrom, lineTo+1)
+                   if line not in cache or len(cache[line][0]) != countCol]
+        if not missing:
+            return
+
+        lineFrom, lineTo = missing[0], missing[-1]
+        self.GetListCtrl().OnCacheHint(lineFrom, lineTo)
+
+        for line, row in zip(range(lineFrom, lineTo+1), self.FetchRows(lineFrom, lineTo)):
+            cache.pop(line, None)
+            cache[line] = row
+
+        # keep the requested rows even if they are more than the cache size
+        size = max(self._rowCacheSize, lineTo - lineFrom + 1)
+        while len(cache) > size:
+            cache.popitem(last=False)
+
+
+    def FetchRows(self, lineFrom, lineTo):
+        """
+        Gets the data of the rows from `lineFrom` to `lineTo` from the virtual
+        callbacks of :class:`UltimateListCtrl`.
+
+        The rows are taken from :meth:`UltimateListCtrl.OnGetRows() <UltimateListCtrl.OnGetRows>`
+        if it is overridden, or else from the item callbacks such as
+        :meth:`UltimateListCtrl.OnGetItemText() <UltimateListCtrl.OnGetItemText>`.
+
+        :param `lineFrom`: the first line;
+        :param `lineTo`: the last line.
+
+        :return: a list of ``(columns, attr)`` tuples, one per line, where `columns` has
+         a ``(text, tooltip, colour, image, kind, checked)`` tuple per column.
+        """
+
+        listctrl = self.GetListCtrl()
+        countCol = self.GetColumnCount()
 
-        ld.SetAttr(listctrl.OnGetItemAttr(line))
+        block = listctrl.OnGetRows(lineFrom, lineTo)
+        if block is None:
+            rows = []
+            for line in range(lineFrom, lineTo+1):
+                columns = []
+                for col in range(countCol):
+                    text = listctrl.OnGetItemText(line, col)
+                    tooltip = listctrl.OnGetItemToolTip(line, col)
+                    colour = listctrl.OnGetItemTextColour(line, col)
+                    image = listctrl.OnGetItemColumnImage(line, col)
+                    kind = listctrl.OnGetItemColumnKind(line, col)
+                    checked = (kind > 0 and [listctrl.OnGetItemColumnCheck(line, col)] or [False])[0]
+                    columns.append((text, tooltip, colour, image, kind, checked))
+
+                rows.append((columns, listctrl.OnGetItemAttr(line)))
+
+            return rows
+
+        if len(block) != lineTo - lineFrom + 1:
+            raise Exception("OnGetRows() should return %d rows"%(lineTo - lineFrom + 1))
+
+        rows = []
+        for items in block:
+            columns = []
+            attr = None
+            for col in range(countCol):
+                item = (col < len(items) and [items[col]] or [""])[0]
+                if isinstance(item, UltimateListItem):
+                    columns.append((item.GetText(), item.GetToolTip(), item.GetTextColour(),
+                                    item.GetImage(), item.GetKind(), item.IsChecked()))
+                    if col == 0 and item.HasAttributes():
+                        attr = item.GetAttributes()
+                else:
+                    if not isinstance(item, six.string_types):
+                        item = six.text_type(item)
+                    columns.append((item, "", None, [], 0, False))
+
+            rows.append((columns, attr))
+
+        return rows
+
+
+    def GetRowCacheSize(self):
+        """ Returns the number of rows of a virtual :class:`UltimateListCtrl` kept in the row cache. """
+
+        return self._rowCacheSize
+
+
+    def SetRowCacheSize(self, size):
+        """
+        Sets the number of rows of a virtual :class:`UltimateListCtrl` kept in the row cache.
+
+        :param `size`: the number of rows, 0 to not cache the rows at all. The rows
+         on screen are always kept.
+        """
+
+        self._rowCacheSize = size
+        if size <= 0:
+            self._rowCache.clear()
+
+        while len(self._rowCache) > size:
+            self._rowCache.popitem(last=False)
+
+
+    def ResetRowCache(self, lineFrom=None, lineTo=None):
+        """
+        Drops rows of a virtual :class:`UltimateListCtrl` from the row cache, so that
+        they are fetched again the next time they are drawn.
+
+        :param `lineFrom`: the first line to drop, or ``None`` to drop all the rows;
+        :param `lineTo`: the last line to drop, or ``None`` for just `lineFrom`.
+        """
+
+        if lineFrom is None:
+            self._rowCache.clear()
+            return
+
+        if lineTo is None:
+            lineTo = lineFrom
+
+        if lineTo - lineFrom + 1 > len(self._rowCache):
+            for line in [line for line in self._rowCache if lineFrom <= line <= lineTo]:
+                del self._rowCache[line]
+        else:
+            for line in range(lineFrom, lineTo+1):
+                self._rowCache.pop(line, None)
 
 
     def GetDummyLine(self):
@@ -6646,6 +6976,76 @@ class UltimateListMainWindow(wx.ScrolledWindow):
             return allTextY
 
 
+    def GetRowHeights(self):
+        """
+        Returns the :class:`RowHeightTree` with the heights of all the lines, for
+        a :class:`UltimateListCtrl` with the ``ULC_HAS_VARIABLE_ROW_HEIGHT`` style.
+
+        The tree is built the first time it is needed after the lines were
+        sorted, and the lines that were inserted or whose height was reset are
+        measured again.
+        """
+
+        count = self.GetItemCount()
+
+        if self._rowHeights is None or len(self._rowHeights) != count:
+            self._rowHeights = RowHeightTree([self.GetLineHeight(l) for l in range(count)])
+
+        elif self._dirtyRows:
+            for l in self._dirtyRows:
+                if l < count:
+                    self._rowHeights.SetHeight(l, self.GetLineHeight(l))
+
+        self._dirtyRows = set()
+        return self._rowHeights
+
+
+    def ResetRowHeights(self, line=None):
+        """
+        Tells the control that line heights or positions have changed.
+
+        :param `line`: the index of the line whose height has changed, or ``None``
+         if lines were inserted, deleted or moved.
+        """
+
+        if line is None:
+            self._rowHeights = None
+            self._dirtyRows = set()
+        elif self._rowHeights is not None:
+            self._dirtyRows.add(line)
+
+
+    def InsertRowHeight(self, line):
+        """
+        Tells the control that a line was inserted, keeping the heights of the
+        other lines.
+
+        :param `line`: the index of the new line.
+        """
+
+        if self._rowHeights is None:
+            return
+
+        self._rowHeights.InsertRow(line)
+        self._dirtyRows = set([l + (l >= line) for l in self._dirtyRows])
+        self._dirtyRows.add(line)
+
+
+    def DeleteRowHeight(self, line):
+        """
+        Tells the control that a line was deleted, keeping the heights of the
+        other lines.
+
+        :param `line`: the index of the deleted line.
+        """
+
+        if self._rowHeights is None:
+            return
+
+        self._rowHeights.DeleteRow(line)
+        self._dirtyRows = set([l - (l > line) for l in self._dirtyRows if l != line])
+
+
     def GetLineY(self, line):
         """
         Returns the line `y` position.
@@ -6653,20 +7053,10 @@ class UltimateListMainWindow(wx.ScrolledWindow):
         :param `line`: an instance of :class:`UltimateListLineData`.
         """
 
-        if self.IsVirtual():
+        if self.IsVirtual() or not self.HasAGWFlag(ULC_HAS_VARIABLE_ROW_HEIGHT):
             return LINE_SPACING + line*self.GetLineHeight()
 
-        lineItem = self.GetLine(line)
-        lineY = lineItem.GetY()
-        if lineY != -1:
-            return lineY
-
-        lineY = 0
-        for l in range(line):
-            lineY += self.GetLineHeight(l)
-
-        lineItem.SetY(LINE_SPACING + lineY)
-        return LINE_SPACING + lineY
+        return LINE_SPACING + self.GetRowHeights().GetY(line)
 
 
     def GetLineRect(self, line):
@@ -6941,6 +7331,10 @@ class UltimateListMainWindow(wx.ScrolledWindow):
         :param `line`: an instance of :class:`UltimateListLineData`.
         """
 
+        if self.IsVirtual():
+            # the line is redrawn because its data changed
+            self.ResetRowCache(line)
+
         if self.InReportView():
 
             visibleFrom, visibleTo = self.GetVisibleLinesRange()
@@ -6960,6 +7354,9 @@ class UltimateListMainWindow(wx.ScrolledWindow):
         :param `lineTo`: an integer representing the last line to refresh.
         """
 
+        if self.IsVirtual():
+            self.ResetRowCache(lineFrom, lineTo)
+
         if self.InReportView():
 
             visibleFrom, visibleTo = self.GetVisibleLinesRange()
@@ -7109,6 +7506,9 @@ class UltimateListMainWindow(wx.ScrolledWindow):
                 evCache.m_itemIndex = visibleTo
                 self.GetParent().GetEventHandler().ProcessEvent(evCache)
 
+                # fetch the rows that are not in the cache in one go
+                self.CacheRows(visibleFrom, visibleTo)
+
             no_highlight = self.HasAGWFlag(ULC_NO_HIGHLIGHT)
 
             for line in range(visibleFrom, visibleTo+1):
@@ -8769,8 +9169,12 @@ class UltimateListMainWindow(wx.ScrolledWindow):
                     self._aColWidths[item._col]._nMaxWidth = width
                     self._aColWidths[item._col]._bNeedsUpdate = True
 
+        else:
+            self.ResetRowCache(id)
+
         if self.HasAGWFlag(ULC_HAS_VARIABLE_ROW_HEIGHT):
             line.ResetDimensions()
+            self.ResetRowHeights(id)
 
         # update the item on screen
         if self.InReportView():
@@ -9434,6 +9838,7 @@ class UltimateListMainWindow(wx.ScrolledWindow):
 
         self._selStore.SetItemCount(count)
         self._countVirt = count
+        self._rowCache.clear()
 
         self.ResetVisibleLinesRange()
 
@@ -9940,11 +10345,15 @@ class UltimateListMainWindow(wx.ScrolledWindow):
 
         else:
             self._lines.pop(lindex)
+            self.DeleteRowHeight(lindex)
 
         # we need to refresh the (vert) scrollbar as the number of items changed
         self._dirty = True
         self._lineHeight = 0
-        self.ResetLineDimensions(True)
+        if not self.HasAGWFlag(ULC_HAS_VARIABLE_ROW_HEIGHT):
+            # with variable row heights, the heights of the other lines are
+            # still valid
+            self.ResetLineDimensions(True)
         self.RecalculatePositions()
         self.RefreshAfter(lindex)
 
@@ -9993,6 +10402,7 @@ class UltimateListMainWindow(wx.ScrolledWindow):
         if self.IsVirtual():
             self._countVirt = 0
             self._selStore.Clear()
+            self._rowCache.clear()
 
         if self.InReportView():
             self.ResetVisibleLinesRange(True)
@@ -10006,6 +10416,7 @@ class UltimateListMainWindow(wx.ScrolledWindow):
         self._lines = []
         self._itemWithWindow = []
         self._hasWindows = False
+        self.ResetRowHeights()
 
 
     def DeleteAllItems(self):
@@ -10155,7 +10566,8 @@ class UltimateListMainWindow(wx.ScrolledWindow):
                     if flags:
                         return current, flags
             else:
-                for current in range(self._lineFrom, count):
+                current = self.GetRowHeights().FindRow(y - LINE_SPACING)
+                if 0 <= current < count:
                     newItem, flags = self.HitTestLine(current, x, y)
                     if flags:
                         return current, flags
@@ -10213,6 +10625,7 @@ class UltimateListMainWindow(wx.ScrolledWindow):
 
         self._lines.insert(id, line)
         self._dirty = True
+        self.InsertRowHeight(id)
 
         # If an item is selected at or below the point of insertion, we need to
         # increment the member variables because the current row's index has gone
@@ -10410,6 +10823,7 @@ class UltimateListMainWindow(wx.ScrolledWindow):
             self.__func = func
 
         self._lines.sort(key=cmp_to_key(self.OnCompareItems))
+        self.ResetRowHeights()
 
         if self.IsShownOnScreen():
             self._dirty = True
@@ -10492,23 +10906,14 @@ class UltimateListMainWindow(wx.ScrolledWindow):
                     view_x, view_y = self.GetViewStart()
                     view_y *= SCROLL_UNIT_Y
 
-                    for i in range(0, count):
-                        rc = self.GetLineY(i)
-                        if rc > view_y:
-                            self._lineFrom = i - 1
-                            break
+                    rowHeights = self.GetRowHeights()
 
-                    if self._lineFrom < 0:
-                        self._lineFrom = 0
+                    # the line at the top of the window
+                    self._lineFrom = min(max(rowHeights.FindRow(view_y - LINE_SPACING), 0), count - 1)
 
-                    self._lineTo = self._lineFrom
+                    # the number of lines that end above the bottom of the window
                     clientWidth, clientHeight = self.GetClientSize()
-
-                    for i in range(self._lineFrom, count):
-                        rc = self.GetLineY(i) + self.GetLineHeight(i)
-                        if rc > view_y + clientHeight - 5:
-                            break
-                        self._lineTo += 1
+                    self._lineTo = max(self._lineFrom, rowHeights.FindRow(view_y + clientHeight - 5 - LINE_SPACING))
 
                 else:
 
@@ -12723,6 +13128,76 @@ class UltimateListCtrl(wx.Control):
         return 0
 
 
+    def OnGetRows(self, itemFrom, itemTo):
+        """
+        This function may be overloaded in the derived class for a control with
+        ``ULC_VIRTUAL`` style, to return the data of a block of items at once instead
+        of through the item callbacks such as :meth:`~UltimateListCtrl.OnGetItemText`.
+
+        It should return a Python list with one entry per item from `itemFrom` to
+        `itemTo` (both included). Each entry is a sequence with one value per column,
+        which is either the text of the column (anything else than a string is
+        converted to one) or an instance of :class:`UltimateListItem` with the text,
+        tooltip, text colour, images, kind and checked state of the column. The
+        attributes of the :class:`UltimateListItem` of the first column, if any, are
+        used for the whole item.
+
+        :param `itemFrom`: the first item;
+        :param `itemTo`: the last item.
+
+        :note: The base class version returns ``None``, so the item callbacks are used.
+        """
+
+        return None
+
+
+    def OnCacheHint(self, itemFrom, itemTo):
+        """
+        This function may be overloaded in the derived class for a control with
+        ``ULC_VIRTUAL`` style. It is called before the data of the items from `itemFrom`
+        to `itemTo` (both included) is requested, because they are about to be shown
+        and they are not in the row cache, so that the data can be fetched in one go.
+
+        :param `itemFrom`: the first item;
+        :param `itemTo`: the last item.
+
+        :note: The base class version does nothing.
+
+        :see: :meth:`~UltimateListCtrl.SetRowCacheSize`.
+        """
+
+        pass
+
+
+    def GetRowCacheSize(self):
+        """
+        Returns the number of items of a virtual :class:`UltimateListCtrl` kept in the
+        row cache.
+
+        :see: :meth:`~UltimateListCtrl.SetRowCacheSize`.
+        """
+
+        return self._mainWin.GetRowCacheSize()
+
+
+    def SetRowCacheSize(self, size):
+        """
+        Sets the number of items of a virtual :class:`UltimateListCtrl` kept in the
+        row cache.
+
+        The data of the items that were shown recently is kept, so that scrolling back
+        and forth doesn't request it again. The cached items are requested again after
+        :meth:`~UltimateListCtrl.RefreshItem`, :meth:`~UltimateListCtrl.RefreshItems`,
+        :meth:`~UltimateListCtrl.SetItemCount` and a :meth:`~UltimateListCtrl.Refresh`
+        of the whole control.
+
+        :param `size`: the number of items, 0 to request the data of the items every
+         time they are drawn.
+        """
+
+        self._mainWin.SetRowCacheSize(size)
+
+
     def SetItemCount(self, count):
         """
         Sets the total number of items we handle.
@@ -12794,6 +13269,8 @@ class UltimateListCtrl(wx.Control):
                 self._headerWin.Refresh(eraseBackground)
 
             if self._mainWin:
+                # the data of a virtual control may have changed
+                self._mainWin.ResetRowCache()
                 self._mainWin.Refresh(eraseBackground)
 
         else:
@@ -0,0 +1,424 @@
+#---------------------------------------------------------------------------
+#  File:         asyncloop.py
+#  Description:  An asyncio event loop that runs together with the wx
+#                event loop, and awaitable helpers for wx events and dialogs.
+#
+#  Tags:         phoenix-port, unittest, documented, py3-port
+#---------------------------------------------------------------------------
+
+"""
+An :mod:`asyncio` event loop that runs together with the wx event loop, so
+that coroutines can be used for I/O bound UI code without any threads.
+
+The loop runs in the main thread. Whenever :mod:`asyncio` has nothing to
+do it runs the wx event loop instead, until a timer is due, a file or
+socket becomes ready, or a wx event handler schedules some work for the
+loop. The loop is never polled: a helper thread only waits for the files
+and sockets of the loop to become ready, it doesn't run any callbacks.
+So coroutines, callbacks and wx event handlers all run in the main thread
+and can use the GUI freely.
+
+Use :func:`MainLoop` instead of :meth:`wx.App.MainLoop`, and start
+coroutines with :func:`asyncio.ensure_future`, for example from event
+handlers::
+
+    import asyncio
+    import wx
+    from wx.lib import asyncloop
+
+    class MyFrame(wx.Frame):
+        def __init__(self):
+            wx.Frame.__init__(self, None, title='Download')
+            button = wx.Button(self, label='Get')
+            button.Bind(wx.EVT_BUTTON, self.OnGet)
+
+        def OnGet(self, event):
+            asyncio.ensure_future(self.Download())
+
+        async def Download(self):
+            reader, writer = await asyncio.open_connection('example.com', 80)
+            ...
+            dlg = wx.MessageDialog(self, 'Done!')
+            await asyncloop.ShowDialog(dlg)
+
+    app = wx.App()
+    MyFrame().Show()
+    asyncloop.MainLoop()
+
+The helpers :func:`AwaitEvent` and :func:`ShowDialog` wait for wx events
+and dialogs without blocking the loop, and :func:`RunInExecutor` awaits
+jobs of a :class:`wx.lib.delayedresult.Executor` for the work that can't
+be done without a thread.
+
+While a nested wx event loop is running, such as the one of
+:meth:`wx.Dialog.ShowModal`, the asyncio loop can't run, so prefer
+:func:`ShowDialog` to show dialogs from coroutines.
+
+This module needs Python 3.
+"""
+
+import math
+import socket
+import threading
+
+try:
+    import asyncio
+    import selectors
+except ImportError:
+    raise ImportError('wx.lib.asyncloop needs Python 3')
+
+import wx
+
+__all__ = ('WxEventLoop', 'MainLoop', 'Run', 'AwaitEvent', 'ShowDialog',
+           'RunInExecutor')
+
+#---------------------------------------------------------------------------
+
+# the data of the socket used to interrupt the helper thread
+_INTERRUPT = object()
+
+# the last WxEventLoop that was made and not closed yet
+_currentLoop = None
+
+
+class _WakeTimer(wx.Timer):
+    """Stops waiting for wx events when the next asyncio timer is due."""
+
+    def __init__(self, selector):
+        wx.Timer.__init__(self)
+        self._selector = selector
+
+    def Notify(self):
+        self._selector.Wake()
+
+
+class _WxSelector(selectors.BaseSelector):
+    """
+    A selector that runs the wx event loop while it waits.
+
+    The files are registered with a real selector, on which a helper thread
+    waits while the main thread runs the wx event loop. The main thread only
+    selects them without a timeout.
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._rsock, self._wsock = socket.socketpair()
+        self._rsock.setblocking(False)
+        self._wsock.setblocking(False)
+        self._selector.register(self._rsock, selectors.EVENT_READ, _INTERRUPT)
+
+        self._evtloop = wx.GUIEventLoop()
+        self._timer = _WakeTimer(self)
+        self._mainThread = threading.current_thread()
+        self._waiting = False
+        self._closed = False
+
+        self._armed = threading.Event()
+        self._watching = False
+        self._thread = None
+
+    def register(self, fileobj, events, data=None):
+        key = self._selector.register(fileobj, events, data)
+        self._Interrupt()
+        return key
+
+    def unregister(self, fileobj):
+        key = self._selector.unregister(fileobj)
+        self._Interrupt()
+        return key
+
+    def modify(self, fileobj, events, data=None):
+        key = self._selector.modify(fileobj, events, data)
+        self._Interrupt()
+        return key
+
+    def get_map(self):
+        return self._selector.get_map()
+
+    def select(self, timeout=None):
+        events = self._Poll()
+        if events or (timeout is not None and timeout <= 0):
+            return events
+        self._Wait(timeout)
+        return self._Poll()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._timer.Stop()
+        self._armed.set()
+        self._Interrupt()
+        if self._thread is not None:
+            self._thread.join(1.0)
+        self._selector.close()
+        self._rsock.close()
+        self._wsock.close()
+
+    def Wake(self):
+        """Stop running the wx event loop, if it is waiting in :meth:`select`."""
+        if self._waiting and threading.current_thread() is self._mainThread:
+            self._waiting = False
+            if self._evtloop.IsRunning():
+                self._evtloop.Exit()
+
+    def _Poll(self):
+        """The ready files, without waiting."""
+        events = []
+        for key, mask in self._selector.select(0):
+            if key.data is _INTERRUPT:
+                self._Drain()
+            else:
+                events.append((key, mask))
+        return events
+
+    def _Drain(self):
+        try:
+            while self._rsock.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _Interrupt(self):
+        """Make the helper thread wait again, with the files registered now."""
+        if self._watching:
+            try:
+                self._wsock.send(b'\0')
+            except OSError:
+                pass
+
+    def _Wait(self, timeout):
+        """Run the wx event loop until something is ready or the timeout."""
+        if timeout is not None:
+            self._timer.StartOnce(max(1, int(math.ceil(timeout * 1000))))
+        self._Arm()
+        self._waiting = True
+        try:
+            self._evtloop.Run()
+        finally:
+            self._waiting = False
+            self._timer.Stop()
+
+    def _Arm(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._Watch,
+                                            name='wx.lib.asyncloop')
+            self._thread.daemon = True
+            self._thread.start()
+        if not self._watching:
+            self._watching = True
+            self._armed.set()
+
+    def _Watch(self):
+        """The helper thread: wait for the files, and wake the main thread."""
+        while True:
+            self._armed.wait()
+            self._armed.clear()
+            if self._closed:
+                return
+            try:
+                self._selector.select()
+            except (OSError, ValueError):
+                # closed while waiting
+                if self._closed:
+                    return
+            self._watching = False
+            wx.CallAfter(self.Wake)
+
+
+class WxEventLoop(asyncio.SelectorEventLoop):
+    """
+    An :mod:`asyncio` event loop which runs the wx event loop while it has
+    nothing else to do.
+
+    The :class:`wx.App` must be created before the loop, and the loop must
+    be run in the main thread.
+    """
+
+    def __init__(self):
+        if wx.GetApp() is None:
+            raise RuntimeError('the wx.App must be created before the WxEventLoop')
+        self._wxSelector = _WxSelector()
+        super(WxEventLoop, self).__init__(self._wxSelector)
+        global _currentLoop
+        _currentLoop = self
+
+    def close(self):
+        super(WxEventLoop, self).close()
+        global _currentLoop
+        if _currentLoop is self:
+            _currentLoop = None
+
+    def call_soon(self, callback, *args, **kwargs):
+        handle = super(WxEventLoop, self).call_soon(callback, *args, **kwargs)
+        # called from a wx event handler, the loop has some work to do now
+        self._wxSelector.Wake()
+        return handle
+
+    def call_at(self, when, callback, *args, **kwargs):
+        handle = super(WxEventLoop, self).call_at(when, callback, *args, **kwargs)
+        # the next timer may be sooner than the one being waited for
+        self._wxSelector.Wake()
+        return handle
+
+
+def _GetLoop(loop):
+    """The given loop, or else the running one, or else the current WxEventLoop."""
+    if loop is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = _currentLoop
+    if loop is None:
+        raise RuntimeError('there is no running event loop and no WxEventLoop')
+    return loop
+
+
+def MainLoop(loop=None):
+    """
+    Run the wx and asyncio event loops, until the last top level window is
+    closed. This is used instead of :meth:`wx.App.MainLoop`.
+
+    :param `loop`: the :class:`WxEventLoop` to run, by default the last one
+     that was made and not closed yet, or a new one that is made the current
+     event loop.
+    """
+    app = wx.GetApp()
+    if loop is None:
+        loop = _currentLoop
+        if loop is None:
+            loop = WxEventLoop()
+            asyncio.set_event_loop(loop)
+
+    done = loop.create_future()
+
+    def OnIdle(event):
+        event.Skip()
+        if (not done.done() and not wx.GetTopLevelWindows()
+                and app.GetExitOnFrameDelete()):
+            done.set_result(None)
+
+    app.Bind(wx.EVT_IDLE, OnIdle)
+    try:
+        loop.run_until_complete(done)
+    finally:
+        app.Unbind(wx.EVT_IDLE, handler=OnIdle)
+
+
+def Run(main):
+    """
+    Run a coroutine in a new :class:`WxEventLoop` and return its result,
+    like :func:`asyncio.run`. The loop is closed afterwards.
+
+    :param `main`: the coroutine
+    """
+    loop = WxEventLoop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+#---------------------------------------------------------------------------
+
+def AwaitEvent(source, binder, id=wx.ID_ANY, skip=True, loop=None):
+    """
+    Wait for the next wx event.
+
+    :param `source`: the :class:`wx.EvtHandler` to bind the event to
+    :param `binder`: the event binder, such as ``wx.EVT_BUTTON``
+    :param integer `id`: the id of the event source
+    :param bool `skip`: whether the event is skipped, so that it is also
+     handled as usual
+    :param `loop`: the event loop, by default the current one
+    :returns: an :class:`asyncio.Future` whose result is a copy of the event.
+     Cancelling it unbinds the event.
+    """
+    loop = _GetLoop(loop)
+    future = loop.create_future()
+
+    def OnEvent(event):
+        if skip:
+            event.Skip()
+        source.Unbind(binder, id=id, handler=OnEvent)
+        if not future.done():
+            # the event itself is deleted after it has been handled
+            future.set_result(event.Clone())
+
+    def OnDone(future):
+        if future.cancelled():
+            try:
+                source.Unbind(binder, id=id, handler=OnEvent)
+            except RuntimeError:
+                # the source was destroyed
+                pass
+
+    source.Bind(binder, OnEvent, id=id)
+    future.add_done_callback(OnDone)
+    return future
+
+
+def ShowDialog(dialog, loop=None):
+    """
+    Show a dialog as if it was modal, without blocking the event loop.
+
+    The dialog is shown modeless while all other top level windows are
+    disabled, until it is hidden by one of its standard buttons, or by
+    :meth:`wx.Dialog.EndDialog` or :meth:`wx.Window.Hide`. Don't use
+    :meth:`wx.Dialog.EndModal`, the dialog isn't modal. This only works with
+    dialogs which are not native, the native dialogs can only be shown with
+    :meth:`wx.Dialog.ShowModal`.
+
+    :param `dialog`: the :class:`wx.Dialog`. It isn't destroyed.
+    :param `loop`: the event loop, by default the current one
+    :returns: an :class:`asyncio.Future` whose result is the return code of
+     the dialog, or ``wx.ID_CANCEL`` if it was destroyed.
+    """
+    loop = _GetLoop(loop)
+    future = loop.create_future()
+    disabler = [wx.WindowDisabler(dialog)]
+
+    def Finish(result):
+        del disabler[:]
+        dialog.Unbind(wx.EVT_SHOW, handler=OnShow)
+        dialog.Unbind(wx.EVT_WINDOW_DESTROY, handler=OnDestroy)
+        if not future.done():
+            future.set_result(result)
+
+    def OnShow(event):
+        event.Skip()
+        if not event.IsShown():
+            Finish(dialog.GetReturnCode())
+
+    def OnDestroy(event):
+        event.Skip()
+        if event.GetEventObject() is dialog:
+            Finish(wx.ID_CANCEL)
+
+    dialog.Bind(wx.EVT_SHOW, OnShow)
+    dialog.Bind(wx.EVT_WINDOW_DESTROY, OnDestroy)
+    dialog.Show()
+    return future
+
+
+def RunInExecutor(executor, workerFn, args=(), kwargs={}, priority=0,
+                  jobID=None, loop=None):
+    """
+    Run a function in a worker thread and await its result.
+
+    :param `executor`: a :class:`wx.lib.delayedresult.Executor`
+    :param `workerFn`: the function, called as ``workerFn(*args, **kwargs)``
+    :param integer `priority`: jobs with a higher priority are started first
+    :param `jobID`: the job id, see
+     :meth:`wx.lib.delayedresult.Executor.cancelJobs`
+    :param `loop`: the event loop, by default the current one
+    :returns: an :class:`asyncio.Future` for the result. Cancelling it
+     cancels the job if it hasn't started yet.
+    """
+    future = executor.schedule(workerFn, args, kwargs, priority, jobID)
+    return asyncio.wrap_future(future, loop=_GetLoop(loop))
@@ -26,6 +26,13 @@ More advanced uses:
   (see PreProcessChain)
 - Derive from Sender to use your own way of making result hop over the
   "thread boundary" (from non-main thread to main thread), e.g. using Queue
+- Use an Executor to run many short jobs in a bounded pool of threads, with
+  priorities, cancellation of the queued jobs, and futures whose callbacks
+  are called in the main thread::
+
+    executor = Executor(maxWorkers=4)
+    future = executor.schedule(workerFn, args=(row,), priority=1)
+    future.add_done_callback(lambda future: grid.SetRow(row, future.result()))
 
 Thanks to Josiah Carlson for critical feedback/ideas that helped me
 improve this module.
@@ -40,12 +47,22 @@ __author__  = 'Oliver Schoenborn at utoronto dot ca'
 __version__ = '1.0'
 
 __all__ = ('Sender', 'SenderNoWx', 'SenderWxEvent', 'SenderCallAfter',
-    'Handler', 'DelayedResult', 'Producer', 'startWorker', 'PreProcessChain')
+    'Handler', 'DelayedResult', 'Producer', 'startWorker', 'PreProcessChain',
+    'Executor', 'DelayedFuture')
 
 
 import wx
+import heapq
+import itertools
 import threading
 import traceback
+import multiprocessing
+
+try:
+    from concurrent.futures import Future
+except ImportError:
+    # Python 2 without the 'futures' backport: no Executor
+    Future = object
 
 
 class Struct:
@@ -418,3 +435,251 @@ class PreProcessChain:
         handler = self.__chain[0]
         handler( chainTrav )
 
+
+class DelayedFuture(Future):
+    """
+    A concurrent.futures.Future for a job run by an Executor. The only
+    difference is that the callbacks given to add_done_callback() are
+    always called in the main thread, batched with the other results
+    of the executor. Everything else, like result() or
+    concurrent.futures.wait(), works from any thread, but note that
+    waiting in the main thread blocks the GUI.
+    """
+
+    def __init__(self, executor, jobID=None, priority=0):
+        """You should never have to call this yourself. A DelayedFuture
+        is created by Executor.schedule() for you."""
+        Future.__init__(self)
+        self.__executor = executor
+        self.__jobID = jobID
+        self.__priority = priority
+        self.originalTraceback = None
+
+    def getJobID(self):
+        """Return the jobID given when the job was scheduled."""
+        return self.__jobID
+
+    def getPriority(self):
+        """Return the priority given when the job was scheduled."""
+        return self.__priority
+
+    def add_done_callback(self, fn):
+        """Call `fn(future)` in the main thread when the job is done or
+        cancelled (right away, if it already is)."""
+        callAfter = self.__executor.callAfter
+        Future.add_done_callback(self, lambda future: callAfter(fn, future))
+
+
+class Executor:
+    """
+    Run jobs in a bounded pool of worker threads, instead of starting a
+    thread per job like startWorker() does. The threads are started
+    when there are jobs for them, up to maxWorkers, and then kept.
+
+    The queued jobs with the highest priority are started first, and
+    jobs of equal priority in the order they were scheduled. Queued
+    jobs can be cancelled with their future or with cancelJobs(); a
+    job that is already running can't be stopped, but it can check an
+    AbortEvent and raise AbortedException.
+
+    The results are handed to the main thread with a single wx.CallAfter
+    for all the results that are ready at the same time.
+
+    The submit(), map() and shutdown() methods, and the context manager,
+    are the same as those of concurrent.futures.Executor.
+    """
+
+    def __init__(self, maxWorkers=None, name=None, daemon=True):
+        """At most *maxWorkers* threads are used (default: 4 more than
+        the number of processors, at most 32). The threads are named
+        after *name*, and they are daemon threads unless *daemon* is
+        False, so they don't keep the application alive."""
+        if Future is object:
+            raise ImportError('Executor needs concurrent.futures '
+                              '(the "futures" package on Python 2)')
+        if maxWorkers is None:
+            try:
+                maxWorkers = min(32, multiprocessing.cpu_count() + 4)
+            except NotImplementedError:
+                maxWorkers = 4
+        if maxWorkers <= 0:
+            raise ValueError('maxWorkers must be greater than 0')
+
+        self.__maxWorkers = maxWorkers
+        self.__name = name or 'Executor-%d' % id(self)
+        self.__daemon = daemon
+
+        self.__cond = threading.Condition()
+        self.__queue = []
+        self.__counter = itertools.count()
+        self.__threads = []
+        self.__idle = 0
+        self.__shutdown = False
+
+        self.__callsLock = threading.Lock()
+        self.__calls = []
+
+    def schedule(self, workerFn, args=(), kwargs={}, priority=0, jobID=None):
+        """Queue `workerFn(*args, **kwargs)` to run in a worker thread,
+        and return its DelayedFuture. Jobs with a higher *priority* are
+        started first. The *jobID* can be anything, see cancelJobs()."""
+        future = DelayedFuture(self, jobID, priority)
+
+        with self.__cond:
+            if self.__shutdown:
+                raise RuntimeError('cannot schedule new futures after shutdown')
+
+            heapq.heappush(self.__queue,
+                (-priority, next(self.__counter), future, workerFn, args, kwargs))
+
+            if self.__idle:
+                # the woken worker is no longer idle, even before it runs
+                self.__idle -= 1
+                self.__cond.notify()
+            elif len(self.__threads) < self.__maxWorkers:
+                thread = threading.Thread(target=self.__work,
+                    name='%s_%d' % (self.__name, len(self.__threads)))
+                thread.daemon = self.__daemon
+                self.__threads.append(thread)
+                thread.start()
+
+        return future
+
+    def submit(self, fn, *args, **kwargs):
+        """Same as concurrent.futures.Executor.submit(): schedule
+        `fn(*args, **kwargs)` with the default priority."""
+        return self.schedule(fn, args, kwargs)
+
+    def map(self, fn, *iterables, **kwargs):
+        """Same as concurrent.futures.Executor.map(): return an iterator
+        over `fn(*args)` for the arguments taken from *iterables*, with
+        an optional *timeout* keyword argument."""
+        timeout = kwargs.pop('timeout', None)
+        if kwargs:
+            raise TypeError('unexpected keyword arguments %s' % list(kwargs))
+        futures = [self.schedule(fn, args) for args in zip(*iterables)]
+
+        def results():
+            try:
+                for future in futures:
+                    yield future.result(timeout)
+            finally:
+                for future in futures:
+                    future.cancel()
+
+        return results()
+
+    def startWorker(self, consumer, workerFn, cargs=(), ckwargs={},
+                    wargs=(), wkwargs={}, jobID=None, priority=0):
+        """Same as the module's startWorker() for a callable *consumer*,
+        but the worker function runs in the pool, and its future is
+        returned instead of a thread. The consumer is not called if
+        the job is cancelled or raises AbortedException."""
+        if cargs or ckwargs:
+            consumer = Handler(consumer, *cargs, **ckwargs)
+
+        def deliver(future):
+            if future.cancelled():
+                return
+            exception = future.exception()
+            if exception is None:
+                consumer(DelayedResult(future.result(), jobID=jobID))
+            elif not isinstance(exception, AbortedException):
+                consumer(DelayedResult(None, jobID=jobID, exception=exception,
+                                       originalTb=future.originalTraceback))
+
+        future = self.schedule(workerFn, wargs, wkwargs, priority, jobID)
+        future.add_done_callback(deliver)
+        return future
+
+    def cancelJobs(self, jobID=None):
+        """Cancel the queued jobs, or only those scheduled with *jobID*
+        if it is not None. Return the number of jobs cancelled."""
+        count = 0
+        with self.__cond:
+            queue = []
+            for entry in self.__queue:
+                future = entry[2]
+                if jobID is None or future.getJobID() == jobID:
+                    if future.cancel():
+                        count += 1
+                        continue
+                queue.append(entry)
+            heapq.heapify(queue)
+            self.__queue = queue
+        return count
+
+    def getQueueSize(self):
+        """Return the number of jobs waiting for a worker thread."""
+        return len(self.__queue)
+
+    def getMaxWorkers(self):
+        """Return the maximum number of worker threads."""
+        return self.__maxWorkers
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """Same as concurrent.futures.Executor.shutdown(): no new jobs
+        are accepted, the queued ones still run unless *cancel_futures*
+        is True, and if *wait* is True, wait for the threads to end."""
+        with self.__cond:
+            self.__shutdown = True
+            self.__idle = 0
+            self.__cond.notify_all()
+        if cancel_futures:
+            self.cancelJobs()
+        if wait:
+            for thread in self.__threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        self.shutdown(wait=True)
+        return False
+
+    def callAfter(self, func, *args):
+        """Call `func(*args)` in the main thread. All the calls made
+        before the main thread gets to them are made by a single
+        wx.CallAfter. Exceptions are printed, as for CallAfter."""
+        with self.__callsLock:
+            self.__calls.append((func, args))
+            if len(self.__calls) > 1:
+                return
+        wx.CallAfter(self.__flush)
+
+    def __flush(self):
+        with self.__callsLock:
+            calls = self.__calls
+            self.__calls = []
+        for func, args in calls:
+            try:
+                func(*args)
+            except Exception:
+                traceback.print_exc()
+
+    def __work(self):
+        cond = self.__cond
+        while True:
+            with cond:
+                while not self.__queue:
+                    if self.__shutdown:
+                        return
+                    self.__idle += 1
+                    cond.wait()
+                entry = heapq.heappop(self.__queue)
+
+            future, workerFn, args, kwargs = entry[2:]
+            del entry
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = workerFn(*args, **kwargs)
+            except BaseException as exc:
+                future.originalTraceback = traceback.format_exc()
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+            del future, workerFn, args, kwargs
@@ -15,6 +15,8 @@ This is where FloatCanvas defines its drawings objects.
 """
 
 import sys
+from collections import OrderedDict
+from math import floor, log
 
 import wx
 import six
@@ -22,6 +24,7 @@ import six
 import numpy as N
 
 from .Utilities import BBox
+from .Utilities.ImagePyramid import ImagePyramid
 from wx.lib.floatcanvas.Utilities import Colors
 
 mac = sys.platform.startswith("darwin")
@@ -51,43 +54,92 @@ def ComputeFontScale():
 ## fixme: This should probably be re-factored into a class
 _testBitmap = None
 
-def _cycleidxs(indexcount, maxvalue, step):
+## The values of each color channel that survive a trip through a bitmap,
+## for each bitmap depth.
+_channelValues = {}
 
+def _hitChannelValues():
     """
-    Utility function used by _colorGenerator
+    Return the values of the red, green and blue channels that come back
+    from a bitmap unchanged, on displays with fewer than 8 bits per channel
+    some values are lost.
+
+    All 256 values of the three channels are drawn into one bitmap and read
+    back, which only needs to be done once for each bitmap depth.
     """
-    def colormatch(color):
-        """Return True if the color comes back from the bitmap identically."""
-        if len(color) < 3:
-            return True
-        global _testBitmap
+    global _testBitmap
+    if not _testBitmap:
+        _testBitmap = wx.Bitmap(1, 1)
+    depth = _testBitmap.GetDepth()
+    if depth not in _channelValues:
+        bitmap = wx.Bitmap(256, 3)
         dc = wx.MemoryDC()
-        if not _testBitmap:
-            _testBitmap = wx.Bitmap(1, 1)
-        dc.SelectObject(_testBitmap)
+        dc.SelectObject(bitmap)
         dc.SetBackground(wx.BLACK_BRUSH)
         dc.Clear()
-        dc.SetPen(wx.Pen(wx.Colour(*color), 4))
-        dc.DrawPoint(0,0)
-        if mac: # NOTE: can the Mac not just use the DC?
-            del dc # Mac can't work with bitmap when selected into a DC.
-            pdata = wx.AlphaPixelData(_testBitmap)
-            pacc = pdata.GetPixels()
-            pacc.MoveTo(pdata, 0, 0)
-            outcolor = pacc.Get()[:3]
-        else:
-            outcolor = dc.GetPixel(0,0)
-        return outcolor == color
+        for channel in range(3):
+            for value in range(256):
+                color = [0, 0, 0]
+                color[channel] = value
+                dc.SetPen(wx.Pen(wx.Colour(*color)))
+                dc.DrawPoint(value, channel)
+        dc.SelectObject(wx.NullBitmap) # Mac can't read a bitmap selected into a DC.
+        data = N.empty((3, 256, 3), N.uint8)
+        bitmap.CopyToBuffer(data, wx.BitmapBufferFormat_RGB)
+        values = N.arange(256)
+        channels = []
+        for channel in range(3):
+            expected = N.zeros((256, 3), N.intp)
+            expected[:, channel] = values
+            good = (data[channel] == expected).all(axis=1)
+            channels.append(values[good].tolist())
+        _channelValues[depth] = channels
+    return _channelValues[depth]
+
+
+class _HitColorGenerator(object):
+    """
+    Generates a series of unique colors used to do hit-tests with the Hit
+    Test bitmap.
 
-    if indexcount == 0:
-        yield ()
-    else:
-        for idx in range(0, maxvalue, step):
-            for tail in _cycleidxs(indexcount - 1, maxvalue, step):
-                color = (idx, ) + tail
-                if not colormatch(color):
-                    continue
-                yield color
+    The colors are all the combinations of the channel values that survive
+    the bitmap, in order, so handing out a color is just some index
+    arithmetic.
+    """
+    def __init__(self):
+        self.Red, self.Green, self.Blue = _hitChannelValues()
+        self.Size = len(self.Red) * len(self.Green) * len(self.Blue)
+        self.Count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        i = self.Count
+        if i >= self.Size:
+            raise StopIteration
+        self.Count += 1
+        Green, Blue = len(self.Green), len(self.Blue)
+        return (self.Red[i // (Green * Blue)],
+                self.Green[(i // Blue) % Green],
+                self.Blue[i % Blue])
+
+    next = __next__ # for Python 2
+
+    def Take(self, count):
+        """
+        Return the next colors as a list of (r, g, b) tuples.
+
+        :param integer `count`: how many colors, fewer are returned when the
+         colors run out
+
+        """
+        i = N.arange(self.Count, min(self.Count + count, self.Size))
+        self.Count += len(i)
+        Green, Blue = len(self.Green), len(self.Blue)
+        return list(zip(N.take(self.Red, i // (Green * Blue)).tolist(),
+                        N.take(self.Green, (i // Blue) % Green).tolist(),
+                        N.take(self.Blue, i % Blue).tolist()))
 
 
 def _colorGenerator():
@@ -96,10 +148,58 @@ def _colorGenerator():
     Generates a series of unique colors used to do hit-tests with the Hit
     Test bitmap
     """
-    return _cycleidxs(indexcount=3, maxvalue=256, step=1)
+    return _HitColorGenerator()
 
 
-class DrawObject:
+class _LRUCache(object):
+    """
+    A mapping that only keeps the most recently used items, up to a total
+    size. Getting or setting an item makes it the most recently used one.
+    """
+
+    def __init__(self, MaxSize, SizeOf=None):
+        """
+        Default class constructor.
+
+        :param `MaxSize`: the largest total size of the items
+        :param `SizeOf`: a function that returns the size of an item, or
+         ``None`` for every item to have size 1
+
+        """
+        self.MaxSize = MaxSize
+        self.SizeOf = SizeOf
+        self.clear()
+
+    def clear(self):
+        self._Items = OrderedDict()
+        self.Size = 0
+
+    def __len__(self):
+        return len(self._Items)
+
+    def __contains__(self, key):
+        return key in self._Items
+
+    def get(self, key, default=None):
+        item = self._Items.pop(key, None)
+        if item is None:
+            return default
+        self._Items[key] = item
+        return item
+
+    def __setitem__(self, key, item):
+        if key in self._Items:
+            self.Size -= self._SizeOf(self._Items.pop(key))
+        self._Items[key] = item
+        self.Size += self._SizeOf(item)
+        while self.Size > self.MaxSize and len(self._Items) > 1:
+            self.Size -= self._SizeOf(self._Items.popitem(last=False)[1])
+
+    def _SizeOf(self, item):
+        return 1 if self.SizeOf is None else self.SizeOf(item)
+
+
+class DrawObject(object):
     """
     This is the base class for all the objects that can be drawn.
 
@@ -145,6 +245,19 @@ class DrawObject:
 
         self.Visible = IsVisible
 
+    @property
+    def BoundingBox(self):
+        """
+        The bounding box of the object, setting it lets the Canvas know
+        that the object has moved or changed size.
+        """
+        return self._BoundingBox
+
+    @BoundingBox.setter
+    def BoundingBox(self, BB):
+        self._BoundingBox = BB
+        self._BoundingBoxChanged()
+
     # I pre-define all these as class variables to provide an easier
     # interface, and perhaps speed things up by caching all the Pens
     # and Brushes, although that may not help, as I think wx now
@@ -239,6 +352,9 @@ class DrawObject:
             self.SetHitPen(self.HitColor,self.HitLineWidth)
             self.SetHitBrush(self.HitColor)
         # put the object in the hit dict, indexed by it's color
+        if not self.InForeground:
+            # the hit test tiles need to be drawn with the new color
+            self._Canvas._InvalidateBB(self.BoundingBox)
         if not self._Canvas.HitDict:
             self._Canvas.MakeHitDict()
         self._Canvas.HitDict[Event][self.HitColor] = (self) # put the object in the hit dict, indexed by its color
@@ -418,11 +534,28 @@ class DrawObject:
         """
         pass
 
+    def _BoundingBoxChanged(self):
+        """
+        Let the Canvas know that the bounding box has changed. Setting
+        :attr:`BoundingBox` calls this, it only needs to be called after
+        changing the bounding box in place, e.g. with ``Merge``.
+        """
+        if getattr(self, "_Canvas", None):
+            self._Canvas._UpdateObjectBB(self)
+
+    def _SetHit(self, Color):
+        """
+        Called with the hit-test color before a hit callback, objects that
+        draw more than one hit-test color use it to find what was hit.
+        """
+        pass
+
     def PutInBackground(self):
         """Put the object in the background."""
         if self._Canvas and self.InForeground:
             self._Canvas._ForeDrawList.remove(self)
             self._Canvas._DrawList.append(self)
+            self._Canvas._InvalidateBB(self.BoundingBox)
             self._Canvas._BackgroundDirty = True
             self.InForeground = False
 
@@ -431,6 +564,7 @@ class DrawObject:
         if self._Canvas and (not self.InForeground):
             self._Canvas._ForeDrawList.append(self)
             self._Canvas._DrawList.remove(self)
+            self._Canvas._InvalidateBB(self.BoundingBox)
             self._Canvas._BackgroundDirty = True
             self.InForeground = True
 
@@ -570,9 +704,6 @@ class XYObjectMixin:
         self.XY += Delta
         self.BoundingBox += Delta
 
-        if self._Canvas:
-            self._Canvas.BoundingBoxDirty = True
-
     def CalcBoundingBox(self):
         """Calculate the bounding box."""
         ## This may get overwritten in some subclasses
@@ -585,9 +716,6 @@ class XYObjectMixin:
         self.XY = xy
         self.CalcBoundingBox()
 
-        if self._Canvas:
-            self._Canvas.BoundingBoxDirty = True
-
 class PointsObjectMixin:
     """
     A mixin class that provides some methods suitable for use
@@ -607,14 +735,10 @@ class PointsObjectMixin:
         Delta.shape = (2,)
         self.Points += Delta
         self.BoundingBox += Delta
-        if self._Canvas:
-            self._Canvas.BoundingBoxDirty = True
 
     def CalcBoundingBox(self):
         """Calculate the bounding box."""
         self.BoundingBox = BBox.fromPoints(self.Points)
-        if self._Canvas:
-            self._Canvas.BoundingBoxDirty = True
 
     def SetPoints(self, Points, copy=True):
         """
@@ -1273,8 +1397,6 @@ class RectEllipse(XYObjectMixin, LineAndFillMixin, DrawObject):
         # you need this in case Width or Height are negative
         corners = N.array((self.XY, (self.XY + self.WH) ), N.float)
         self.BoundingBox = BBox.fromPoints(corners)
-        if self._Canvas:
-            self._Canvas.BoundingBoxDirty = True
 
 
 class Rectangle(RectEllipse):
@@ -1361,8 +1483,6 @@ class Circle(XYObjectMixin, LineAndFillMixin, DrawObject):
         """Calculate the bounding box of the object."""
         # you need this in case Width or Height are negative
         self.BoundingBox = BBox.fromPoints( (self.XY+self.WH, self.XY-self.WH) )
-        if self._Canvas:
-            self._Canvas.BoundingBoxDirty = True
 
     def _Draw(self, dc , WorldToPixel, ScaleWorldToPixel, HTdc=None):
         ( XY, WH ) = self.SetUpDraw(dc,
@@ -1377,6 +1497,436 @@ class Circle(XYObjectMixin, LineAndFillMixin, DrawObject):
                 HTdc.DrawCircle(XY, WH[0])
 
 
+class ShapeSetMixin:
+    """
+    A mixin class for objects that draw a whole set of shapes, with the
+    coordinates and sizes of all the shapes in `NumPy <http://www.numpy.org/>`_
+    arrays.
+
+    Each shape uses one of a list of styles, selected by its entry in the
+    ``StyleIndex`` array. The shapes are drawn one style at a time with the
+    ``Draw*List`` methods of the DC, so even a set of many thousands of
+    shapes takes only a few DC calls. Shapes with a lower style index are
+    drawn first, shapes with the same style are drawn in order.
+
+    Unlike :class:`PointSet`, each shape gets its own hit-test color, so
+    the callbacks can tell which shape was hit: the index of the shape is
+    in the ``HitIndex`` attribute of the set when the callback is called.
+    The enter and leave object events are still sent for the set as a
+    whole.
+
+    """
+    #: the style entries a set uses, subclasses without a fill drop the last two
+    StyleKeys = ("LineColor", "LineStyle", "LineWidth", "FillColor", "FillStyle")
+
+    #: the name of the DC method used to draw the shapes
+    DrawListMethod = None
+
+    def _InitSet(self, Styles, StyleIndex, **Default):
+        self.HitColors = []
+        self.HitIndex = None
+        self._HitIndex = {}
+        self._HitPens = None
+        self._HitBrushes = None
+        self._DefaultStyle = Default
+        self.SetStyles(Styles, StyleIndex)
+
+    def SetStyles(self, Styles=None, StyleIndex=None):
+        """
+        Set the styles of the shapes.
+
+        :param `Styles`: a list of dicts, each with any of the keys in
+         :attr:`StyleKeys`. Missing entries are taken from the arguments the
+         set was created with; ``None`` is a single default style.
+        :param `StyleIndex`: a sequence of integers, the index in `Styles`
+         of the style of each shape. ``None`` uses the first style for all
+         shapes.
+
+        """
+        if Styles is None:
+            Styles = [{}]
+        self.Styles = []
+        for Style in Styles:
+            Full = dict(self._DefaultStyle)
+            Full.update(Style)
+            self.Styles.append(Full)
+        self.SetStyleIndex(StyleIndex)
+
+    def SetStyleIndex(self, StyleIndex=None):
+        """
+        Set the style of each shape.
+
+        :param `StyleIndex`: a sequence of integers, the index in
+         :attr:`Styles` of the style of each shape, or ``None`` to use the
+         first style for all shapes.
+
+        """
+        Count = self._ShapeCount()
+        if StyleIndex is None:
+            StyleIndex = N.zeros((Count,), N.intp)
+        else:
+            StyleIndex = N.array(StyleIndex, N.intp).reshape(-1)
+            if len(StyleIndex) != Count:
+                raise ValueError("StyleIndex has %i entries for %i shapes"
+                                 % (len(StyleIndex), Count))
+            if Count and (StyleIndex.min() < 0 or
+                          StyleIndex.max() >= len(self.Styles)):
+                raise ValueError("StyleIndex refers to a style that does not exist")
+        self.StyleIndex = StyleIndex
+        self._Groups = None
+
+    def _StyleGroups(self):
+        """A list of (Pen, Brush, indices of the shapes) for each style in use."""
+        if self._Groups is None:
+            Order = N.argsort(self.StyleIndex, kind='mergesort')
+            Used = N.unique(self.StyleIndex)
+            Bounds = N.searchsorted(self.StyleIndex[Order],
+                                    N.append(Used, len(self.Styles)))
+            self._Groups = []
+            for i, Style in enumerate(Used):
+                Style = self.Styles[Style]
+                self.SetPen(Style["LineColor"], Style["LineStyle"], Style["LineWidth"])
+                if "FillColor" in self.StyleKeys:
+                    self.SetBrush(Style["FillColor"], Style["FillStyle"])
+                    Brush = self.Brush
+                else:
+                    Brush = None
+                self._Groups.append((self.Pen, Brush, Order[Bounds[i]:Bounds[i + 1]]))
+            self._MaxLineWidth = max([Style["LineWidth"] or 0 for Style in self.Styles])
+        return self._Groups
+
+    def _ShapesChanged(self):
+        """Book keeping when the number or position of the shapes changed."""
+        if len(self.StyleIndex) != self._ShapeCount():
+            self.SetStyleIndex(None)
+        self.CalcBoundingBox()
+        if self.HitAble:
+            self._SetHitColors()
+
+    def Bind(self, Event, CallBackFun):
+        """
+        Bind an event to the set, see :meth:`DrawObject.Bind`.
+
+        Every shape is put in the hit dict of the canvas with its own color.
+
+        """
+        DrawObject.Bind(self, Event, CallBackFun)
+        self._SetHitColors()
+
+    def UnBindAll(self):
+        """Unbind all events"""
+        if self._Canvas.HitDict:
+            for Event in self._Canvas.HitDict.values():
+                for Color in self.HitColors:
+                    if Event.get(Color) is self:
+                        del Event[Color]
+        self.HitAble = False
+
+    def _SetHitColors(self):
+        """Give every shape a hit-test color, and put them in the hit dict."""
+        Count = self._ShapeCount()
+        if not self.HitColors:
+            self.HitColors = [self.HitColor]
+        if len(self.HitColors) < Count:
+            self.HitColors.extend(self._Canvas.HitColorGenerator.Take(
+                Count - len(self.HitColors)))
+        self._HitIndex = dict((Color, i) for i, Color in enumerate(self.HitColors))
+        HitColors = self.HitColors[:Count]
+        if self.HitLine:
+            self._HitPens = [wx.Pen(Color, self.HitLineWidth) for Color in HitColors]
+        else:
+            self._HitPens = [wx.TRANSPARENT_PEN] * Count
+        if self.HitFill and "FillColor" in self.StyleKeys:
+            self._HitBrushes = [wx.Brush(Color) for Color in HitColors]
+        else:
+            self._HitBrushes = None
+        for Event in self.CallBackFuncs:
+            HitDict = self._Canvas.HitDict[Event]
+            HitDict.update(dict.fromkeys(HitColors, self))
+            # the colors of shapes that were removed stay reserved for the set
+            for Color in self.HitColors[Count:]:
+                if HitDict.get(Color) is self:
+                    del HitDict[Color]
+        if not self.InForeground:
+            self._Canvas._InvalidateBB(self.BoundingBox)
+
+    def _SetHit(self, Color):
+        self.HitIndex = self._HitIndex.get(tuple(Color))
+
+    def _Draw(self, dc, WorldToPixel, ScaleWorldToPixel, HTdc=None):
+        Shapes, Boxes = self._PixelShapes(WorldToPixel, ScaleWorldToPixel)
+        Groups = self._StyleGroups()
+        # only draw the shapes that are on the dc
+        w, h = dc.GetSize()
+        m = self._MaxLineWidth + 1
+        Visible = ((Boxes[:, 2] >= -m) & (Boxes[:, 0] <= w + m) &
+                   (Boxes[:, 3] >= -m) & (Boxes[:, 1] <= h + m))
+        DrawList = getattr(dc, self.DrawListMethod)
+        for Pen, Brush, Index in Groups:
+            Index = Index[Visible[Index]]
+            if len(Index):
+                dc.SetPen(Pen)
+                if Brush is not None:
+                    dc.SetBrush(Brush)
+                DrawList(Shapes[Index])
+        if HTdc and self.HitAble and self._HitPens is not None:
+            Index = N.nonzero(Visible)[0]
+            if len(Index):
+                Pens = [self._HitPens[i] for i in Index]
+                if self._HitBrushes is None:
+                    getattr(HTdc, self.DrawListMethod)(Shapes[Index], Pens)
+                else:
+                    Brushes = [self._HitBrushes[i] for i in Index]
+                    getattr(HTdc, self.DrawListMethod)(Shapes[Index], Pens, Brushes)
+
+
+class CircleSet(ShapeSetMixin, XYObjectMixin, LineAndFillMixin, DrawObject):
+    """
+    Draws a set of circles
+
+    The centers and diameters are in world coordinates. Each circle can use
+    its own style, see :class:`ShapeSetMixin`.
+
+    """
+    DrawListMethod = "DrawEllipseList"
+
+    def __init__(self, XY, Diameters,
+                 LineColor = "Black",
+                 LineStyle = "Solid",
+                 LineWidth    = 1,
+                 FillColor    = None,
+                 FillStyle    = "Solid",
+                 Styles = None,
+                 StyleIndex = None,
+                 InForeground = False):
+        """
+        Default class constructor.
+
+        :param `XY`: the (x, y) coordinates of the centers of the circles, a
+         NX2 `NumPy <http://www.numpy.org/>`_ array or a sequence of 2-tuples
+        :param `Diameters`: the diameters of the circles, a sequence of N
+         numbers or a single number for all of them
+        :param `LineColor`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetColor`
+        :param `LineStyle`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetLineStyle`
+        :param `LineWidth`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetLineWidth`
+        :param `FillColor`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetColor`
+        :param `FillStyle`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetFillStyle`
+        :param `Styles`: see :meth:`ShapeSetMixin.SetStyles`
+        :param `StyleIndex`: see :meth:`ShapeSetMixin.SetStyles`
+        :param boolean `InForeground`: should object be in foreground
+
+        """
+        DrawObject.__init__(self, InForeground)
+
+        self.SetCircles(XY, Diameters, StyleIndex=None)
+        self.HitLineWidth = max(LineWidth, self.MinHitLineWidth)
+        self._InitSet(Styles, StyleIndex,
+                      LineColor=LineColor, LineStyle=LineStyle, LineWidth=LineWidth,
+                      FillColor=FillColor, FillStyle=FillStyle)
+
+    def _ShapeCount(self):
+        return len(self.XY)
+
+    def SetCircles(self, XY, Diameters, StyleIndex=None):
+        """
+        Set the circles of the set.
+
+        :param `XY`: the (x, y) coordinates of the centers of the circles
+        :param `Diameters`: the diameters of the circles
+        :param `StyleIndex`: the style of each circle, if the number of
+         circles changes and this is ``None`` all circles get the first style
+
+        """
+        self.XY = N.array(XY, N.float64).reshape(-1, 2)
+        self.Diameters = N.empty((len(self.XY),), N.float64)
+        self.Diameters[:] = Diameters
+        if hasattr(self, "StyleIndex"):
+            if StyleIndex is not None:
+                self.SetStyleIndex(StyleIndex)
+            self._ShapesChanged()
+        else:
+            self.CalcBoundingBox()
+
+    def CalcBoundingBox(self):
+        """Calculate the bounding box of the object."""
+        R = N.abs(self.Diameters)[:, None] / 2
+        self.BoundingBox = BBox.fromPoints(N.concatenate((self.XY - R, self.XY + R)))
+
+    def _PixelShapes(self, WorldToPixel, ScaleWorldToPixel):
+        XY = WorldToPixel(self.XY)
+        R = N.abs(ScaleWorldToPixel(N.column_stack((self.Diameters / 2,
+                                                    self.Diameters / 2))))[:, 0]
+        R = N.maximum(R, 1)[:, None]
+        Boxes = N.concatenate((XY - R, XY + R), 1)
+        return N.concatenate((XY - R, 2 * R, 2 * R), 1), Boxes
+
+
+class RectangleSet(ShapeSetMixin, XYObjectMixin, LineAndFillMixin, DrawObject):
+    """
+    Draws a set of rectangles
+
+    The corners and sizes are in world coordinates. Each rectangle can use
+    its own style, see :class:`ShapeSetMixin`.
+
+    """
+    DrawListMethod = "DrawRectangleList"
+
+    def __init__(self, XY, WH,
+                 LineColor = "Black",
+                 LineStyle = "Solid",
+                 LineWidth    = 1,
+                 FillColor    = None,
+                 FillStyle    = "Solid",
+                 Styles = None,
+                 StyleIndex = None,
+                 InForeground = False):
+        """
+        Default class constructor.
+
+        :param `XY`: the (x, y) coordinates of a corner of each rectangle, a
+         NX2 `NumPy <http://www.numpy.org/>`_ array or a sequence of 2-tuples
+        :param `WH`: the (width, height) of each rectangle, a NX2 array or a
+         single (width, height) for all of them
+        :param `LineColor`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetColor`
+        :param `LineStyle`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetLineStyle`
+        :param `LineWidth`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetLineWidth`
+        :param `FillColor`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetColor`
+        :param `FillStyle`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetFillStyle`
+        :param `Styles`: see :meth:`ShapeSetMixin.SetStyles`
+        :param `StyleIndex`: see :meth:`ShapeSetMixin.SetStyles`
+        :param boolean `InForeground`: should object be in foreground
+
+        """
+        DrawObject.__init__(self, InForeground)
+
+        self.SetRectangles(XY, WH, StyleIndex=None)
+        self.HitLineWidth = max(LineWidth, self.MinHitLineWidth)
+        self._InitSet(Styles, StyleIndex,
+                      LineColor=LineColor, LineStyle=LineStyle, LineWidth=LineWidth,
+                      FillColor=FillColor, FillStyle=FillStyle)
+
+    def _ShapeCount(self):
+        return len(self.XY)
+
+    def SetRectangles(self, XY, WH, StyleIndex=None):
+        """
+        Set the rectangles of the set.
+
+        :param `XY`: the (x, y) coordinates of a corner of each rectangle
+        :param `WH`: the (width, height) of each rectangle
+        :param `StyleIndex`: the style of each rectangle, if the number of
+         rectangles changes and this is ``None`` all rectangles get the first
+         style
+
+        """
+        self.XY = N.array(XY, N.float64).reshape(-1, 2)
+        self.WH = N.empty(self.XY.shape, N.float64)
+        self.WH[:] = WH
+        if hasattr(self, "StyleIndex"):
+            if StyleIndex is not None:
+                self.SetStyleIndex(StyleIndex)
+            self._ShapesChanged()
+        else:
+            self.CalcBoundingBox()
+
+    def CalcBoundingBox(self):
+        """Calculate the bounding box of the object."""
+        # you need both corners in case Width or Height are negative
+        self.BoundingBox = BBox.fromPoints(N.concatenate((self.XY, self.XY + self.WH)))
+
+    def _PixelShapes(self, WorldToPixel, ScaleWorldToPixel):
+        XY = WorldToPixel(self.XY)
+        WH = ScaleWorldToPixel(self.WH)
+        # the height is usually negative, wx wants the top left corner
+        XY = N.minimum(XY, XY + WH)
+        WH = N.maximum(N.abs(WH), 1)
+        return N.concatenate((XY, WH), 1), N.concatenate((XY, XY + WH), 1)
+
+
+class LineSet(ShapeSetMixin, LineOnlyMixin, DrawObject):
+    """
+    Draws a set of line segments
+
+    The end points are in world coordinates. Each segment can use its own
+    style, see :class:`ShapeSetMixin`.
+
+    """
+    StyleKeys = ("LineColor", "LineStyle", "LineWidth")
+    DrawListMethod = "DrawLineList"
+
+    def __init__(self, Lines,
+                 LineColor = "Black",
+                 LineStyle = "Solid",
+                 LineWidth    = 1,
+                 Styles = None,
+                 StyleIndex = None,
+                 InForeground = False):
+        """
+        Default class constructor.
+
+        :param `Lines`: the end points of the segments, a NX4
+         `NumPy <http://www.numpy.org/>`_ array of (x1, y1, x2, y2) or a NX2X2
+         array of ((x1, y1), (x2, y2))
+        :param `LineColor`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetColor`
+        :param `LineStyle`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetLineStyle`
+        :param `LineWidth`: see :meth:`~lib.floatcanvas.FloatCanvas.DrawObject.SetLineWidth`
+        :param `Styles`: see :meth:`ShapeSetMixin.SetStyles`
+        :param `StyleIndex`: see :meth:`ShapeSetMixin.SetStyles`
+        :param boolean `InForeground`: should object be in foreground
+
+        """
+        DrawObject.__init__(self, InForeground)
+
+        self.SetLines(Lines, StyleIndex=None)
+        self.HitLineWidth = max(LineWidth, self.MinHitLineWidth)
+        self._InitSet(Styles, StyleIndex,
+                      LineColor=LineColor, LineStyle=LineStyle, LineWidth=LineWidth)
+
+    def _ShapeCount(self):
+        return len(self.Points)
+
+    def SetLines(self, Lines, StyleIndex=None):
+        """
+        Set the segments of the set.
+
+        :param `Lines`: the end points of the segments
+        :param `StyleIndex`: the style of each segment, if the number of
+         segments changes and this is ``None`` all segments get the first
+         style
+
+        """
+        self.Points = N.array(Lines, N.float64).reshape(-1, 2, 2)
+        if hasattr(self, "StyleIndex"):
+            if StyleIndex is not None:
+                self.SetStyleIndex(StyleIndex)
+            self._ShapesChanged()
+        else:
+            self.CalcBoundingBox()
+
+    def Move(self, Delta):
+        """
+        Moves the object by delta, where delta is a (dx, dy) pair.
+
+        :param `Delta`: is a (dx, dy) pair ideally a `NumPy <http://www.numpy.org/>`_
+         array of shape (2, )
+
+        """
+        Delta = N.asarray(Delta, N.float64)
+        Delta.shape = (2,)
+        self.Points += Delta
+        self.BoundingBox += Delta
+
+    def CalcBoundingBox(self):
+        """Calculate the bounding box."""
+        self.BoundingBox = BBox.fromPoints(self.Points.reshape(-1, 2))
+
+    def _PixelShapes(self, WorldToPixel, ScaleWorldToPixel):
+        Lines = WorldToPixel(self.Points.reshape(-1, 2)).reshape(-1, 4)
+        Boxes = N.concatenate((N.minimum(Lines[:, :2], Lines[:, 2:]),
+                               N.maximum(Lines[:, :2], Lines[:, 2:])), 1)
+        return Lines, Boxes
+
+
 class TextObjectMixin(XYObjectMixin):
     """
     A mix in class that holds attributes and methods that are needed by
@@ -1385,27 +1935,117 @@ class TextObjectMixin(XYObjectMixin):
     """
 
     ## I'm caching fonts, because on GTK, getting a new font can take a
-    ## while. However, it gets cleared after every full draw as hanging
-    ## on to a bunch of large fonts takes a massive amount of memory.
+    ## while. Hanging on to a bunch of large fonts takes a massive amount
+    ## of memory, so only the most recently used ones are kept.
+
+    FontList = _LRUCache(64)
 
-    FontList = {}
+    ## The rendered text of the scaled text objects, limited to this many
+    ## bytes. Text that would take more than MaxTextBitmapSize bytes is
+    ## drawn directly.
+    TextBitmapList = _LRUCache(32 * 1024 * 1024,
+                               lambda bitmap: 4 * bitmap.GetWidth() * bitmap.GetHeight())
+    MaxTextBitmapSize = 4 * 1024 * 1024
 
     LayoutFontSize = 16 # font size used for calculating layout
 
+    ## Scaled text sizes above ExactFontSize pixels are rounded to
+    ## FontSizeSteps steps for every doubling of the size, so that zooming
+    ## only needs a few fonts and text bitmaps.
+    ExactFontSize = 16
+    FontSizeSteps = 16
+
     def SetFont(self, Size, Family, Style, Weight, Underlined, FaceName):
-        self.Font = self.FontList.setdefault( (Size,
-                                               Family,
-                                               Style,
-                                               Weight,
-                                               Underlined,
-                                               FaceName),
-                                               #wx.FontFromPixelSize((0.45*Size,Size), # this seemed to give a decent height/width ratio on Windows
-                                               wx.Font(Size,
-                                                       Family,
-                                                       Style,
-                                                       Weight,
-                                                       Underlined,
-                                                       FaceName) )
+        key = (Size, Family, Style, Weight, Underlined, FaceName)
+        Font = self.FontList.get(key)
+        if Font is None:
+            #wx.FontFromPixelSize((0.45*Size,Size), # this seemed to give a decent height/width ratio on Windows
+            Font = wx.Font(Size,
+                           Family,
+                           Style,
+                           Weight,
+                           Underlined,
+                           FaceName)
+            self.FontList[key] = Font
+        self.Font = Font
+
+    def QuantizeFontSize(self, Size, Floor=False):
+        """
+        Round a font size to one of the sizes used for scaled text.
+
+        :param `Size`: the font size in pixels
+        :param boolean `Floor`: round down to the size at or below `Size`
+         rather than to the nearest one, so that text laid out at `Size`
+         never gets bigger
+
+        """
+        if Size <= self.ExactFontSize:
+            if Floor:
+                return int(floor(Size))
+            return int(round(Size))
+        Steps = self.FontSizeSteps * log(float(Size) / self.ExactFontSize, 2)
+        if Floor:
+            # the small offset keeps the sizes that are right on a step
+            Steps = floor(Steps + 1e-9)
+            return int(floor(self.ExactFontSize * 2 ** (Steps / float(self.FontSizeSteps)) + 1e-9))
+        Steps = round(Steps)
+        return int(round(self.ExactFontSize * 2 ** (Steps / float(self.FontSizeSteps))))
+
+    def GetTextBitmap(self, String, Size):
+        """
+        Get the text rendered in the font and colors of the object.
+
+        The bitmaps are kept in :attr:`TextBitmapList`, so text that was
+        drawn before at the same size is not rendered again.
+
+        :param string `String`: the text
+        :param integer `Size`: the font size
+        :returns: a :class:`wx.Bitmap` with an alpha channel, or ``None`` if
+         the text is too big to be worth keeping
+
+        """
+        key = (String, Size, self.Family, self.Style, self.Weight,
+               self.Underlined, self.FaceName, self.Color, self.BackgroundColor)
+        bitmap = self.TextBitmapList.get(key)
+        if bitmap is None:
+            bitmap = self._RenderText(String, Size)
+            if bitmap is not None:
+                self.TextBitmapList[key] = bitmap
+        return bitmap
+
+    def _RenderText(self, String, Size):
+        """Render the text as white on black, and use that as the alpha."""
+        self.SetFont(Size, self.Family, self.Style, self.Weight, self.Underlined, self.FaceName)
+        dc = wx.MemoryDC()
+        dc.SelectObject(wx.Bitmap(1, 1)) #wxMac needs a Bitmap selected for GetTextExtent to work.
+        dc.SetFont(self.Font)
+        w, h = dc.GetTextExtent(String)
+        if w < 1 or h < 1 or 4 * w * h > self.MaxTextBitmapSize:
+            return None
+        bitmap = wx.Bitmap(w, h, 24)
+        dc.SelectObject(bitmap)
+        dc.SetBackground(wx.BLACK_BRUSH)
+        dc.Clear()
+        dc.SetTextForeground(wx.WHITE)
+        dc.SetBackgroundMode(wx.TRANSPARENT)
+        dc.DrawText(String, 0, 0)
+        dc.SelectObject(wx.NullBitmap)
+
+        rgb = N.empty((h, w, 3), N.uint8)
+        bitmap.CopyToBuffer(rgb, wx.BitmapBufferFormat_RGB)
+        alpha = rgb.max(axis=2)
+        rgba = N.empty((h, w, 4), N.uint8)
+        Color = wx.Colour(self.Color).Get(False)
+        if self.BackgroundColor:
+            Background = N.array(wx.Colour(self.BackgroundColor).Get(False), N.uint16)
+            a = alpha[:, :, None].astype(N.uint16)
+            rgba[:, :, :3] = (N.array(Color, N.uint16) * a +
+                              Background * (255 - a) + 127) // 255
+            rgba[:, :, 3] = 255
+        else:
+            rgba[:, :, :3] = Color
+            rgba[:, :, 3] = alpha
+        return wx.Bitmap.FromBufferRGBA(w, h, rgba)
 
     def SetColor(self, Color):
         self.Color = Color
@@ -1701,20 +2341,27 @@ class ScaledText(TextObjectMixin, DrawObject):
 
         # Draw the Text
         if not( self.DisappearWhenSmall and Size <=  self.MinFontSize) : # don't try to draw a zero sized font!
-            self.SetFont(Size, self.Family, self.Style, self.Weight, self.Underlined, self.FaceName)
-            dc.SetFont(self.Font)
-            dc.SetTextForeground(self.Color)
-            if self.BackgroundColor:
-                dc.SetBackgroundMode(wx.SOLID)
-                dc.SetTextBackground(self.BackgroundColor)
+            Size = self.QuantizeFontSize(Size)
+            bitmap = self.GetTextBitmap(self.String, Size)
+            if bitmap is not None:
+                (w,h) = bitmap.GetSize()
+                xy = self.ShiftFun(X, Y, w, h)
+                dc.DrawBitmap(bitmap, xy, True)
             else:
-                dc.SetBackgroundMode(wx.TRANSPARENT)
-            (w,h) = dc.GetTextExtent(self.String)
-            # compute the shift, and adjust the coordinates, if neccesary
-            # This had to be put in here, because it changes with Zoom, as
-            # fonts don't scale exactly.
-            xy = self.ShiftFun(X, Y, w, h)
-            dc.DrawText(self.String, xy)
+                self.SetFont(Size, self.Family, self.Style, self.Weight, self.Underlined, self.FaceName)
+                dc.SetFont(self.Font)
+                dc.SetTextForeground(self.Color)
+                if self.BackgroundColor:
+                    dc.SetBackgroundMode(wx.SOLID)
+                    dc.SetTextBackground(self.BackgroundColor)
+                else:
+                    dc.SetBackgroundMode(wx.TRANSPARENT)
+                (w,h) = dc.GetTextExtent(self.String)
+                # compute the shift, and adjust the coordinates, if neccesary
+                # This had to be put in here, because it changes with Zoom, as
+                # fonts don't scale exactly.
+                xy = self.ShiftFun(X, Y, w, h)
+                dc.DrawText(self.String, xy)
 
             if HTdc and self.HitAble:
                 HTdc.SetPen(self.HitPen)
@@ -2009,6 +2656,9 @@ class ScaledTextBox(TextObjectMixin, DrawObject):
 
         # Draw the Text
         if not( self.DisappearWhenSmall and Size <=  self.MinFontSize) : # don't try to draw a zero sized font!
+            # the words are laid out for the exact size: a bigger font would
+            # spill out of the box
+            Size = self.QuantizeFontSize(Size, Floor=True)
             self.SetFont(Size, self.Family, self.Style, self.Weight, self.Underlined, self.FaceName)
             dc.SetFont(self.Font)
             dc.SetTextForeground(self.Color)
@@ -2089,7 +2739,8 @@ class ScaledBitmap(TextObjectMixin, DrawObject):
     """
     Draws a scaled bitmap
 
-    The size scales with the drawing
+    The size scales with the drawing. The whole bitmap is scaled whenever
+    the scale changes, use :class:`ScaledBitmapPyramid` for large images.
 
     """
 
@@ -2371,6 +3022,76 @@ class ScaledBitmap2(TextObjectMixin, DrawObject, ):
             #print("Not Drawing -- no part of image is showing")
             pass
 
+class ScaledBitmapPyramid(TextObjectMixin, DrawObject):
+    """
+    Draws a scaled bitmap from an image pyramid
+
+    The size scales with the drawing. Unlike :class:`ScaledBitmap`, the
+    image is never scaled as a whole: it is split in tiles, and copies of
+    it halved in size, again and again, are made when first needed. Only
+    the tiles that are on the screen are drawn, from the copy closest to
+    the current scale, so this works for very large images, like base maps.
+    See :class:`~lib.floatcanvas.Utilities.ImagePyramid.ImagePyramid`.
+
+    """
+
+    def __init__(self,
+                 Bitmap,
+                 XY,
+                 Height,
+                 Position = 'tl',
+                 TileSize = 256,
+                 CacheDir = None,
+                 InForeground = False):
+        """
+        Default class constructor.
+
+        :param `Bitmap`: the :class:`wx.Bitmap` or :class:`wx.Image` to be drawn
+        :param `XY`: the (x, y) coordinate of the corner of the scaled bitmap,
+         or a 2-tuple, or a (2,) `NumPy <http://www.numpy.org/>`_ array
+        :param `Height`: height to be used, width is calculated from the aspect ratio of the bitmap
+        :param string `Position`: a two character string indicating where in relation to the coordinates
+         the bitmap should be oriented, see :class:`ScaledBitmap`
+        :param integer `TileSize`: the size in pixels of the tiles of the image
+        :param string `CacheDir`: a directory to keep the smaller copies of
+         the image in, rather than in memory
+        :param boolean `InForeground`: should object be in foreground
+
+        """
+
+        DrawObject.__init__(self,InForeground)
+
+        if type(Bitmap) == wx.Bitmap:
+            Image = Bitmap.ConvertToImage()
+        elif type(Bitmap) == wx.Image:
+            Image = Bitmap
+        self.Pyramid = ImagePyramid(Image, TileSize, CacheDir)
+
+        self.XY = N.array(XY, N.float64)
+        self.Height = Height
+        (self.bmpWidth, self.bmpHeight) = float(self.Pyramid.Width), float(self.Pyramid.Height)
+        self.Width = self.bmpWidth / self.bmpHeight * Height
+        self.ShiftFun = self.ShiftFunDict[Position]
+        self.CalcBoundingBox()
+
+    def CalcBoundingBox(self):
+        """Calculate the bounding box."""
+        w, h = self.Width, self.Height
+        x, y = self.ShiftFun(self.XY[0], self.XY[1], w, h, world = 1)
+        self.BoundingBox = BBox.asBBox( ( (x, y-h ), (x + w, y) ) )
+
+    def _Draw(self, dc , WorldToPixel, ScaleWorldToPixel, HTdc=None):
+        BB = self.BoundingBox
+        XY = WorldToPixel((BB[0, 0], BB[1, 1]))
+        WH = WorldToPixel((BB[1, 0], BB[0, 1])) - XY
+        w, h = dc.GetSize()
+        for bitmap, xy in self.Pyramid.GetTiles(XY, WH, (0, 0, w, h)):
+            dc.DrawBitmap(bitmap, xy, True)
+        if HTdc and self.HitAble:
+            HTdc.SetPen(self.HitPen)
+            HTdc.SetBrush(self.HitBrush)
+            HTdc.DrawRectangle(XY, WH)
+
 class DotGrid:
     """
     An example of a Grid Object -- it is set on the FloatCanvas with one of::
@@ -2537,9 +3258,6 @@ class Arc(XYObjectMixin, LineAndFillMixin, DrawObject):
         self.EndXY += Delta
         self.BoundingBox += Delta
 
-        if self._Canvas:
-            self._Canvas.BoundingBoxDirty = True
-
     def _Draw(self, dc , WorldToPixel, ScaleWorldToPixel, HTdc=None):
         self.SetUpDraw(dc , WorldToPixel, ScaleWorldToPixel, HTdc)
         StartXY = WorldToPixel(self.StartXY)
@@ -2554,8 +3272,6 @@ class Arc(XYObjectMixin, LineAndFillMixin, DrawObject):
         """Calculate the bounding box."""
         self.BoundingBox = BBox.asBBox( N.array((self.XY, (self.XY + self.WH) ),
                                                 N.float) )
-        if self._Canvas:
-            self._Canvas.BoundingBoxDirty = True
 
 
 class PieChart(XYObjectMixin, LineOnlyMixin, DrawObject):
@@ -2673,8 +3389,6 @@ class PieChart(XYObjectMixin, LineOnlyMixin, DrawObject):
             self.BoundingBox = BBox.asBBox( ((self.XY-self.Diameter),(self.XY+self.Diameter)) )
         else:
             self.BoundingBox = BBox.asBBox((self.XY, self.XY))
-        if self._Canvas:
-            self._Canvas.BoundingBoxDirty = True
 
     def _Draw(self, dc , WorldToPixel, ScaleWorldToPixel, HTdc=None):
         CenterXY = WorldToPixel(self.XY)
@@ -2754,6 +3468,7 @@ class Group(DrawObject):
         """
         self.ObjectList.append(obj)
         self.BoundingBox.Merge(obj.BoundingBox)
+        self._BoundingBoxChanged()
 
     def AddObjects(self, Objects):
         """
@@ -2899,6 +3614,9 @@ class Group(DrawObject):
                 self.HitColor = next(self._Canvas.HitColorGenerator)
         self._ChangeChildrenHitColor(self.ObjectList)
         # put the object in the hit dict, indexed by it's color
+        if not self.InForeground:
+            # the hit test tiles need to be drawn with the new color
+            self._Canvas._InvalidateBB(self.BoundingBox)
         if not self._Canvas.HitDict:
             self._Canvas.MakeHitDict()
         self._Canvas.HitDict[Event][self.HitColor] = (self)
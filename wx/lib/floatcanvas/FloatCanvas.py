@@ -47,6 +47,8 @@ from __future__ import division
 import sys
 mac = sys.platform.startswith("darwin")
 
+from collections import OrderedDict
+
 import numpy as N
 from time import clock
 import wx
@@ -55,6 +57,7 @@ import six
 from .FCObjects import *
 
 from .Utilities import BBox
+from .Utilities.SpatialIndex import SpatialIndex
 from . import GUIMode
 
 
@@ -103,6 +106,51 @@ class _MouseEvent(wx.PyCommandEvent):
         return getattr(self._NativeEvent, name)
 
 
+class _TileCache(object):
+    """
+    The rendered tiles of the background objects, at one scale.
+
+    The tiles are laid out on a grid of pixels that is fixed to the world
+    at the ``Anchor`` point, so as long as the image is only moved by whole
+    pixels, tiles that have been drawn before can be reused. The tiles are
+    kept in least recently used order, so the oldest ones can be dropped.
+    """
+
+    def __init__(self, TileSize, Key, Anchor):
+        self.TileSize = TileSize
+        self.Key = Key
+        self.Anchor = Anchor
+        self.Tiles = OrderedDict()
+
+    def Get(self, ij):
+        """Return the (Bitmap, HitTestBitmap) of a tile, or None."""
+        tile = self.Tiles.pop(ij, None)
+        if tile is not None:
+            self.Tiles[ij] = tile
+        return tile
+
+    def Set(self, ij, tile):
+        self.Tiles[ij] = tile
+
+    def Discard(self, i0, j0, i1, j1):
+        """Drop the tiles in the range of tile indices (inclusive)."""
+        Tiles = self.Tiles
+        if (i1 - i0 + 1) * (j1 - j0 + 1) <= len(Tiles):
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    Tiles.pop((i, j), None)
+        else:
+            for i, j in list(Tiles):
+                if i0 <= i <= i1 and j0 <= j <= j1:
+                    del Tiles[(i, j)]
+
+    def Trim(self, MaxTiles):
+        """Drop the least recently used tiles, down to MaxTiles."""
+        Tiles = self.Tiles
+        while len(Tiles) > MaxTiles:
+            Tiles.popitem(last=False)
+
+
 #---------------------------------------------------------------------------
 class FloatCanvas(wx.Panel):
     """
@@ -192,15 +240,24 @@ class FloatCanvas(wx.Panel):
 
         self.HitColorGenerator = None
         self.UseHitTest = False
+        self._HitTestArray = None
 
         self.NumBetweenBlits = 500
 
+        ## Set TileSize to a number of pixels (256 is good) to render the
+        ## background in tiles that are kept while panning. See Draw().
+        self.TileSize = None
+        self.TileMargin = 32 # pixels an object can be drawn outside its BB
+        self.MaxTiles = 128
+        self._Tiles = None
+
         ## create the Hit Test Dicts:
         self.HitDict = None
         self._HTdc = None
 
-        self._DrawList = []
-        self._ForeDrawList = []
+        # the draw lists are spatial indexes, that keep the objects in order
+        self._DrawList = SpatialIndex()
+        self._ForeDrawList = SpatialIndex()
         self.InitializePanel()
         self.MakeNewBuffers()
         self.BoundingBox = BBox.NullBBox()
@@ -307,17 +364,27 @@ class FloatCanvas(wx.Panel):
             """
             Get the hit test colour
 
+            The hit test bitmap is copied to a NumPy array the first time
+            it is needed after a draw, so the mouse over tests are just an
+            array lookup.
+
             :param `xy`: the position to get the hit test colour for
             """
-            if self._ForegroundHTBitmap:
-                pdata = wx.AlphaPixelData(self._ForegroundHTBitmap)
-            else:
-                pdata = wx.AlphaPixelData(self._HTBitmap)
-            if not pdata:
-                raise RuntimeError("Trouble Accessing Hit Test bitmap")
-            pacc = pdata.GetPixels()
-            pacc.MoveTo(pdata, xy[0], xy[1])
-            return pacc.Get()[:3]
+            if self._HitTestArray is None:
+                if self._ForegroundHTBitmap:
+                    bitmap = self._ForegroundHTBitmap
+                else:
+                    bitmap = self._HTBitmap
+                if not bitmap:
+                    raise RuntimeError("Trouble Accessing Hit Test bitmap")
+                w, h = bitmap.GetSize()
+                self._HitTestArray = N.empty((h, w, 4), N.uint8)
+                bitmap.CopyToBuffer(self._HitTestArray, wx.BitmapBufferFormat_RGBA)
+            x, y = xy
+            h, w = self._HitTestArray.shape[:2]
+            if not (0 <= x < w and 0 <= y < h):
+                return None
+            return tuple(self._HitTestArray[y, x, :3].tolist())
     else:
         HitTestBitmapDepth = 24
         #print("using pre-2.8 hit test code")
@@ -339,12 +406,14 @@ class FloatCanvas(wx.Panel):
         """Removes all bindings to Objects."""
         self.HitDict = None
 
-    def _CallHitCallback(self, Object, xy, HitEvent):
+    def _CallHitCallback(self, Object, xy, HitEvent, color=None):
         """
         A little book keeping to be done when a callback is called.
         """
         Object.HitCoords = self.PixelToWorld( xy )
         Object.HitCoordsPixel = xy
+        if color is not None:
+            Object._SetHit(color)
         Object.CallBackFuncs[HitEvent](Object)
 
     def HitTest(self, event, HitEvent):
@@ -355,7 +424,7 @@ class FloatCanvas(wx.Panel):
                 color = self.GetHitTestColor( xy )
                 if color in self.HitDict[ HitEvent ]:
                     Object = self.HitDict[ HitEvent ][color]
-                    self._CallHitCallback(Object, xy, HitEvent)
+                    self._CallHitCallback(Object, xy, HitEvent, color)
                     return True
             return False
 
@@ -375,7 +444,7 @@ class FloatCanvas(wx.Panel):
                 Object = self.HitDict[ EVT_FC_ENTER_OBJECT][color]
                 if (OldObject is None):
                     try:
-                        self._CallHitCallback(Object, xy, EVT_FC_ENTER_OBJECT)
+                        self._CallHitCallback(Object, xy, EVT_FC_ENTER_OBJECT, color)
                         ObjectCallbackCalled =  True
                     except KeyError:
                         pass # this means the enter event isn't bound for that object
@@ -390,7 +459,7 @@ class FloatCanvas(wx.Panel):
                     except KeyError:
                         pass # this means the leave event isn't bound for that object
                     try:
-                        self._CallHitCallback(Object, xy, EVT_FC_ENTER_OBJECT)
+                        self._CallHitCallback(Object, xy, EVT_FC_ENTER_OBJECT, color)
                         ObjectCallbackCalled =  True
                     except KeyError:
                         pass # this means the enter event isn't bound for that object
@@ -526,6 +595,7 @@ class FloatCanvas(wx.Panel):
         self._HTBitmap = wx.Bitmap(self.PanelSize[0],
                                         self.PanelSize[1],
                                         depth=self.HitTestBitmapDepth)
+        self._HitTestArray = None
 
     def MakeNewForegroundHTBitmap(self):
         ## Note: the foreground and backround HT bitmaps are in separate functions
@@ -538,6 +608,7 @@ class FloatCanvas(wx.Panel):
         self._ForegroundHTBitmap = wx.Bitmap(self.PanelSize[0],
                                                   self.PanelSize[1],
                                                   depth=self.HitTestBitmapDepth)
+        self._HitTestArray = None
 
     def OnSize(self, event=None):
         """On size handler."""
@@ -596,6 +667,16 @@ class FloatCanvas(wx.Panel):
         background to get re-drawn. This can be used to support simple
         animation, for instance.
 
+        If ``TileSize`` is set, the background objects are drawn in tiles of
+        that many pixels, which are kept as long as the scale doesn't change.
+        When the image is moved, only the tiles that were not drawn before
+        are rendered. Objects that are added, removed or moved mark their
+        tiles dirty, but if an object is changed in any other way, you need
+        to Draw(Force=True), which throws away all tiles. An object may be
+        drawn up to ``TileMargin`` pixels outside its bounding box (for
+        text, points, etc.), anything further out may be cut off at tile
+        edges. Tiles are not used while there is a GridUnder.
+
         """
 
         if N.sometrue(self.PanelSize <= 2 ):
@@ -609,9 +690,13 @@ class FloatCanvas(wx.Panel):
         self.ViewPortBB = N.array( ( N.minimum.reduce(ViewPortWorld),
                               N.maximum.reduce(ViewPortWorld) ) )
 
+        # the hit test bitmaps are about to change
+        self._HitTestArray = None
         dc = wx.MemoryDC()
         dc.SelectObject(self._Buffer)
         if self._BackgroundDirty or Force:
+            if Force:
+                self._Tiles = None
             dc.SetBackground(self.BackgroundBrush)
             dc.Clear()
             if self._HTBitmap is not None:
@@ -620,9 +705,12 @@ class FloatCanvas(wx.Panel):
                 HTdc.Clear()
             else:
                 HTdc = None
-            if self.GridUnder is not None:
-                self.GridUnder._Draw(dc, self)
-            self._DrawObjects(dc, self._DrawList, ScreenDC, self.ViewPortBB, HTdc)
+            if self.TileSize and self.GridUnder is None:
+                self._DrawTiles(dc, HTdc)
+            else:
+                if self.GridUnder is not None:
+                    self.GridUnder._Draw(dc, self)
+                self._DrawObjects(dc, self._DrawList, ScreenDC, self.ViewPortBB, HTdc)
             self._BackgroundDirty = False
             del HTdc
 
@@ -663,14 +751,110 @@ class FloatCanvas(wx.Panel):
             if self._HTBitmap is not None:
                 self._HTBitmap.SaveFile('junk.png', wx.BITMAP_TYPE_PNG)
 
-        ## Clear the font cache. If you don't do this, the X font server
-        ## starts to take up Massive amounts of memory This is mostly a
-        ## problem with very large fonts, that you get with scaled text
-        ## when zoomed in.
-        DrawObject.FontList = {}
+    def _DrawTiles(self, dc, HTdc=None):
+        """
+        Draw the background objects from the tile cache, rendering only the
+        tiles that are not in it.
+        """
+        TileSize = int(self.TileSize)
+        Key = (TileSize, tuple(self.TransformVector), HTdc is not None)
+        Tiles = self._Tiles
+        if Tiles is not None and Tiles.Key == Key:
+            Origin = ((self.ViewPortCenter - Tiles.Anchor) * self.TransformVector
+                      - self.HalfPanelSize)
+            if N.abs(Origin - N.round(Origin)).max() > 1e-3:
+                # not moved by whole pixels: the old tiles won't line up
+                Tiles = None
+        else:
+            Tiles = None
+        if Tiles is None:
+            # anchor the tile grid so that the top left pixel is on it
+            Anchor = (self.ViewPortCenter -
+                      (self.HalfPanelSize % 1) / self.TransformVector)
+            Tiles = self._Tiles = _TileCache(TileSize, Key, Anchor)
+            Origin = (self.ViewPortCenter - Anchor) * self.TransformVector - self.HalfPanelSize
+        x0, y0 = [int(v) for v in N.round(Origin)]
+        w, h = self.PanelSize
+
+        count = 0
+        for j in range(y0 // TileSize, (y0 + h - 1) // TileSize + 1):
+            for i in range(x0 // TileSize, (x0 + w - 1) // TileSize + 1):
+                tile = Tiles.Get((i, j))
+                if tile is None:
+                    tile = self._RenderTile(i, j, HTdc is not None)
+                    Tiles.Set((i, j), tile)
+                dc.DrawBitmap(tile[0], i * TileSize - x0, j * TileSize - y0)
+                if HTdc is not None:
+                    HTdc.DrawBitmap(tile[1], i * TileSize - x0, j * TileSize - y0)
+                count += 1
+        Tiles.Trim(max(self.MaxTiles, 2 * count))
+
+    def _RenderTile(self, i, j, HitTest):
+        """Draw the background objects on tile (i, j) of the tile cache."""
+        TileSize = self._Tiles.TileSize
+        Anchor = self._Tiles.Anchor
+        TransformVector = self.TransformVector
+        Corner = N.array((i, j), N.float64) * TileSize
+
+        def WorldToPixel(Coordinates):
+            # floor, rather than truncate, so that all tiles round the same way
+            return (N.floor((N.asarray(Coordinates, N.float64) - Anchor) *
+                            TransformVector) - Corner).astype('i')
+
+        Pixels = N.array((Corner, Corner + TileSize))
+        Margin = self.TileMargin
+        TileBB = BBox.fromPoints(Pixels / TransformVector + Anchor)
+        QueryBB = BBox.fromPoints((Pixels + ((-Margin, -Margin), (Margin, Margin)))
+                                  / TransformVector + Anchor)
+
+        bitmap = wx.Bitmap(TileSize, TileSize)
+        dc = wx.MemoryDC()
+        dc.SelectObject(bitmap)
+        dc.SetBackground(self.BackgroundBrush)
+        dc.Clear()
+        if HitTest:
+            HTbitmap = wx.Bitmap(TileSize, TileSize, depth=self.HitTestBitmapDepth)
+            HTdc = wx.MemoryDC()
+            HTdc.SelectObject(HTbitmap)
+            HTdc.Clear()
+        else:
+            HTbitmap = HTdc = None
+
+        # some objects (ScaledBitmap2) only draw what is in the ViewPortBB
+        ViewPortBB = self.ViewPortBB
+        self.ViewPortBB = TileBB
+        try:
+            for Object in self._DrawList.Query(QueryBB):
+                if Object.Visible:
+                    Object._Draw(dc, WorldToPixel, self.ScaleWorldToPixel, HTdc)
+        finally:
+            self.ViewPortBB = ViewPortBB
+        dc.SelectObject(wx.NullBitmap)
+        if HTdc is not None:
+            HTdc.SelectObject(wx.NullBitmap)
+        return (bitmap, HTbitmap)
+
+    def _InvalidateBB(self, BB):
+        """Mark the tiles that a bounding box is drawn on as dirty."""
+        Tiles = self._Tiles
+        if Tiles is None or not Tiles.Tiles:
+            return
+        BB = N.asarray(BB, N.float64)
+        if N.isnan(BB).any():
+            return
+        if not N.isfinite(BB).all():
+            Tiles.Tiles.clear()
+            return
+        Pixels = N.floor((BB - Tiles.Anchor) * self.TransformVector)
+        Margin = self.TileMargin
+        i0, j0 = (Pixels.min(0) - Margin) // Tiles.TileSize
+        i1, j1 = (Pixels.max(0) + Margin) // Tiles.TileSize
+        Tiles.Discard(int(i0), int(j0), int(i1), int(j1))
 
     def _ShouldRedraw(DrawList, ViewPortBB):
         # lrk: Returns the objects that should be redrawn
+        if isinstance(DrawList, SpatialIndex):
+            return DrawList.Query(ViewPortBB)
         ## fixme: should this check be moved into the object?
         BB2 = ViewPortBB
         redrawlist = []
@@ -825,7 +1009,8 @@ class FloatCanvas(wx.Panel):
 
         """
         for Object in Objects:
-            self.RemoveObject(Object, ResetBB=False)
+            self._RemoveObject(Object)
+        self._ObjectsRemoved()
         self.BoundingBoxDirty = True
 
     def RemoveObject(self, Object, ResetBB=True):
@@ -836,17 +1021,75 @@ class FloatCanvas(wx.Panel):
         :param boolean `ResetBB`: reset the bounding box
 
         """
-        ##fixme: Using the list.remove method is kind of slow
+        self._RemoveObject(Object)
+        self._ObjectsRemoved()
+        if ResetBB:
+            self.BoundingBoxDirty = True
+
+    def _RemoveObject(self, Object):
         if Object.InForeground:
             self._ForeDrawList.remove(Object)
-            if not self._ForeDrawList:
-                self._ForegroundBuffer = None
-                self._ForegroundHTdc = None
         else:
             self._DrawList.remove(Object)
+            self._InvalidateBB(Object.BoundingBox)
             self._BackgroundDirty = True
-        if ResetBB:
-            self.BoundingBoxDirty = True
+
+    def _ObjectsRemoved(self):
+        """Drop the foreground buffers once the foreground is empty."""
+        if not self._ForeDrawList:
+            self._ForegroundBuffer = None
+            self._ForegroundHTBitmap = None
+            self._HitTestArray = None
+
+    def RaiseObject(self, Object):
+        """
+        Draw an object on top of all the others in its layer (foreground or
+        background).
+
+        :param DrawObject `Object`: the :class:`DrawObject` to raise
+
+        """
+        self._GetLayer(Object).Raise(Object)
+
+    def LowerObject(self, Object):
+        """
+        Draw an object below all the others in its layer (foreground or
+        background).
+
+        :param DrawObject `Object`: the :class:`DrawObject` to lower
+
+        """
+        self._GetLayer(Object).Lower(Object)
+
+    def GetZIndex(self, Object):
+        """
+        Get the position of an object in the drawing order of its layer.
+
+        :param DrawObject `Object`: a :class:`DrawObject` on the canvas
+
+        :return: integer, 0 for the object that is drawn first
+
+        """
+        return self._GetLayer(Object).GetPosition(Object)
+
+    def SetZIndex(self, Object, ZIndex):
+        """
+        Move an object to a position in the drawing order of its layer.
+
+        :param DrawObject `Object`: a :class:`DrawObject` on the canvas
+        :param integer `ZIndex`: the new position, 0 is drawn first. Negative
+         values count from the top, as with list indices.
+
+        """
+        self._GetLayer(Object).SetPosition(Object, ZIndex)
+
+    def _GetLayer(self, Object):
+        # changing the order of the background objects means it needs a redraw
+        if Object.InForeground:
+            return self._ForeDrawList
+        self._InvalidateBB(Object.BoundingBox)
+        self._BackgroundDirty = True
+        return self._DrawList
 
     def ClearAll(self, ResetBB=True):
         """
@@ -857,11 +1100,13 @@ class FloatCanvas(wx.Panel):
         If ResetBB is set to False, the original bounding box will remain
 
         """
-        self._DrawList = []
-        self._ForeDrawList = []
+        self._DrawList.Clear()
+        self._ForeDrawList.Clear()
+        self._Tiles = None
         self._BackgroundDirty = True
         self.HitColorGenerator = None
         self.UseHitTest = False
+        self._HitTestArray = None
         if ResetBB:
             self._ResetBoundingBox()
         self.MakeNewBuffers()
@@ -870,12 +1115,11 @@ class FloatCanvas(wx.Panel):
     def _ResetBoundingBox(self):
         SetToNull=False
         if self._DrawList or self._ForeDrawList:
-            bblist = []
-            for obj in self._DrawList + self._ForeDrawList:
-                if not obj.BoundingBox.IsNull():
-                    bblist.append(obj.BoundingBox)
-            if bblist: # if there are only NullBBoxes in DrawLists
-                self.BoundingBox = BBox.fromBBArray(bblist)
+            # the indexes keep track of the bounding box of their objects
+            BB = self._DrawList.GetBoundingBox()
+            BB.Merge(self._ForeDrawList.GetBoundingBox())
+            if not BB.IsNull(): # if there are only NullBBoxes in DrawLists
+                self.BoundingBox = BB
             else:
                 SetToNull = True
             if self.BoundingBox.Width == 0 or self.BoundingBox.Height == 0:
@@ -950,10 +1194,25 @@ class FloatCanvas(wx.Panel):
             self.UseForeground = True
         else:
             self._DrawList.append(obj)
+            self._InvalidateBB(obj.BoundingBox)
             self._BackgroundDirty = True
         self.BoundingBoxDirty = True
         return obj
 
+    def _UpdateObjectBB(self, obj):
+        """
+        Called by a DrawObject when its bounding box has changed, to keep
+        the spatial index up to date.
+        """
+        if obj.InForeground:
+            self._ForeDrawList.Update(obj, obj.BoundingBox)
+        elif obj in self._DrawList:
+            self._InvalidateBB(self._DrawList.GetBox(obj))
+            self._InvalidateBB(obj.BoundingBox)
+            self._DrawList.Update(obj, obj.BoundingBox)
+            self._BackgroundDirty = True
+        self.BoundingBoxDirty = True
+
     def AddObjects(self, Objects):
         """
         Add objects to the canvas
@@ -1000,7 +1259,8 @@ class FloatCanvas(wx.Panel):
 def _makeFloatCanvasAddMethods(): ## lrk's code for doing this in module __init__
     classnames = ["Circle", "Ellipse", "Arc", "Rectangle", "ScaledText", "Polygon",
                   "Line", "Text", "PointSet","Point", "Arrow", "ArrowLine", "ScaledTextBox",
-                  "SquarePoint","Bitmap", "ScaledBitmap", "Spline", "Group"]
+                  "SquarePoint","Bitmap", "ScaledBitmap", "Spline", "Group",
+                  "CircleSet", "RectangleSet", "LineSet", "ScaledBitmapPyramid"]
     for classname in classnames:
         klass = globals()[classname]
         def getaddshapemethod(klass=klass):
@@ -0,0 +1,228 @@
+#----------------------------------------------------------------------------
+# Name:         ImagePyramid.py
+# Purpose:
+#
+# Author:
+#
+# Created:
+# Version:
+# Date:
+# Licence:
+# Tags:         phoenix-port
+#----------------------------------------------------------------------------
+"""
+An image pyramid, for drawing very large images at any scale.
+
+The image is split in square tiles, and copies of it that are halved in
+size, again and again, are made the first time they are needed. To draw the
+image at some scale, only the tiles that are on the screen are taken from
+the level that is closest to that scale, and they are only scaled by a
+factor between one half and one, so zooming never scales the whole image.
+
+The levels can be kept in files in a cache directory rather than in memory,
+in which case only the tiles that are drawn are read from them.
+"""
+
+from __future__ import division
+
+import math
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy as N
+
+import wx
+
+
+def _Shrink(data, out, Rows=512):
+    """
+    Halve the size of an image array by averaging blocks of 2x2 pixels, a
+    block of rows at a time. Odd rows and columns at the end are repeated.
+    """
+    h, w = data.shape[:2]
+    for r in range(0, h, 2 * Rows):
+        chunk = N.asarray(data[r:r + 2 * Rows], N.uint16)
+        if len(chunk) % 2:
+            chunk = N.concatenate((chunk, chunk[-1:]))
+        if w % 2:
+            chunk = N.concatenate((chunk, chunk[:, -1:]), 1)
+        total = (chunk[0::2, 0::2] + chunk[1::2, 0::2] +
+                 chunk[0::2, 1::2] + chunk[1::2, 1::2])
+        out[r // 2:r // 2 + len(total)] = (total + 2) // 4
+
+
+class ImagePyramid(object):
+    """
+    A tiled pyramid of a :class:`wx.Image`, halved in size at every level.
+
+    Level 0 is the image itself, the last level is the first one that fits
+    in a single tile.
+    """
+
+    def __init__(self, Image, TileSize=256, CacheDir=None, MaxTiles=256):
+        """
+        Default class constructor.
+
+        :param wx.Image `Image`: the image, it is not copied, so it should
+         not be changed while the pyramid is used
+        :param integer `TileSize`: the size of the tiles in pixels
+        :param string `CacheDir`: a directory to keep the levels in, or
+         ``None`` to keep them in memory. The files are removed by
+         :meth:`Close`.
+        :param integer `MaxTiles`: how many scaled tiles to keep
+
+        """
+        if Image.HasMask():
+            Image = Image.Copy()
+            Image.InitAlpha()
+        self.Image = Image
+        self.TileSize = TileSize
+        self.MaxTiles = MaxTiles
+        self.Width, self.Height = Image.GetWidth(), Image.GetHeight()
+
+        Sizes = [(self.Width, self.Height)]
+        while max(Sizes[-1]) > TileSize:
+            w, h = Sizes[-1]
+            Sizes.append(((w + 1) // 2, (h + 1) // 2))
+        self.Sizes = Sizes
+
+        RGB = N.frombuffer(Image.GetDataBuffer(), N.uint8)
+        RGB = RGB.reshape(self.Height, self.Width, 3)
+        if Image.HasAlpha():
+            Alpha = N.frombuffer(Image.GetAlphaBuffer(), N.uint8)
+            Alpha = Alpha.reshape(self.Height, self.Width)
+        else:
+            Alpha = None
+        self._Levels = [(RGB, Alpha)]
+
+        if CacheDir is None:
+            self._Dir = None
+        else:
+            self._Dir = tempfile.mkdtemp(prefix="pyramid-", dir=CacheDir)
+        self._Tiles = OrderedDict()
+
+    def __len__(self):
+        return len(self.Sizes)
+
+    def Close(self):
+        """Drop all levels and tiles, and remove the cache files."""
+        self._Levels = self._Levels[:1]
+        self._Tiles.clear()
+        if self._Dir is not None:
+            shutil.rmtree(self._Dir, ignore_errors=True)
+            self._Dir = None
+
+    def __del__(self):
+        try:
+            self.Close()
+        except Exception:
+            pass
+
+    def GetLevel(self, Scale):
+        """
+        The level to draw the image from at a scale.
+
+        :param float `Scale`: screen pixels per pixel of the image
+        :returns: the highest level that still has at least one pixel per
+         screen pixel
+
+        """
+        if Scale >= 1:
+            return 0
+        return min(int(math.floor(math.log(1 / Scale, 2))), len(self.Sizes) - 1)
+
+    def _Level(self, level):
+        """The (RGB, Alpha) arrays of a level, made when first needed."""
+        while len(self._Levels) <= level:
+            k = len(self._Levels)
+            w, h = self.Sizes[k]
+            RGB, Alpha = self._Levels[-1]
+            NewRGB = self._NewArray(k, "rgb", (h, w, 3))
+            _Shrink(RGB, NewRGB)
+            if Alpha is not None:
+                NewAlpha = self._NewArray(k, "alpha", (h, w))
+                _Shrink(Alpha, NewAlpha)
+            else:
+                NewAlpha = None
+            self._Levels.append((NewRGB, NewAlpha))
+        return self._Levels[level]
+
+    def _NewArray(self, level, name, shape):
+        if self._Dir is None:
+            return N.empty(shape, N.uint8)
+        path = os.path.join(self._Dir, "%i.%s" % (level, name))
+        return N.memmap(path, N.uint8, "w+", shape=shape)
+
+    def _GetImage(self, level, x, y, w, h):
+        """A part of a level as a :class:`wx.Image`."""
+        RGB, Alpha = self._Level(level)
+        data = N.ascontiguousarray(RGB[y:y + h, x:x + w])
+        if Alpha is None:
+            return wx.Image(w, h, data.tobytes())
+        alpha = N.ascontiguousarray(Alpha[y:y + h, x:x + w])
+        return wx.Image(w, h, data.tobytes(), alpha.tobytes())
+
+    def GetTiles(self, Origin, Size, Clip):
+        """
+        Get the bitmaps needed to draw the image.
+
+        :param `Origin`: the (x, y) pixel position of the top left corner of
+         the image
+        :param `Size`: the (width, height) in pixels to draw the whole image
+        :param `Clip`: the (x0, y0, x1, y1) pixel rectangle that is visible
+        :returns: a list of (:class:`wx.Bitmap`, (x, y)) pairs
+
+        """
+        W, H = float(Size[0]), float(Size[1])
+        if W < 1 or H < 1:
+            return []
+        level = self.GetLevel(max(W / self.Width, H / self.Height))
+        w, h = self.Sizes[level]
+        sx, sy = W / w, H / h
+        ox, oy = Origin
+        T = self.TileSize
+
+        # the columns and rows of the tiles that are on screen
+        i0 = max(0, int((Clip[0] - ox) // (T * sx)))
+        i1 = min((w - 1) // T, int((Clip[2] - ox) // (T * sx)))
+        j0 = max(0, int((Clip[1] - oy) // (T * sy)))
+        j1 = min((h - 1) // T, int((Clip[3] - oy) // (T * sy)))
+
+        # past 4 times the size, only the visible part of a tile is scaled
+        Crop = max(sx, sy) > 4
+        Tiles = []
+        for j in range(j0, j1 + 1):
+            for i in range(i0, i1 + 1):
+                u0, u1 = i * T, min((i + 1) * T, w)
+                v0, v1 = j * T, min((j + 1) * T, h)
+                if Crop:
+                    u0 = max(u0, int((Clip[0] - ox) // sx))
+                    u1 = min(u1, int(-((ox - Clip[2]) // sx)) + 1)
+                    v0 = max(v0, int((Clip[1] - oy) // sy))
+                    v1 = min(v1, int(-((oy - Clip[3]) // sy)) + 1)
+                    if u1 <= u0 or v1 <= v0:
+                        continue
+                # round the edges, so that neighbouring tiles meet exactly
+                x0, x1 = int(round(ox + u0 * sx)), int(round(ox + u1 * sx))
+                y0, y1 = int(round(oy + v0 * sy)), int(round(oy + v1 * sy))
+                if x1 <= x0 or y1 <= y0:
+                    continue
+                key = (level, u0, v0, u1, v1, x1 - x0, y1 - y0)
+                bitmap = self._Tiles.pop(key, None)
+                if bitmap is None:
+                    Image = self._GetImage(level, u0, v0, u1 - u0, v1 - v0)
+                    if (x1 - x0, y1 - y0) != (u1 - u0, v1 - v0):
+                        if sx < 1 or sy < 1:
+                            quality = wx.IMAGE_QUALITY_BILINEAR
+                        else:
+                            quality = wx.IMAGE_QUALITY_NORMAL
+                        Image = Image.Scale(x1 - x0, y1 - y0, quality)
+                    bitmap = wx.Bitmap(Image)
+                self._Tiles[key] = bitmap
+                Tiles.append((bitmap, (x0, y0)))
+
+        while len(self._Tiles) > self.MaxTiles:
+            self._Tiles.popitem(last=False)
+        return Tiles
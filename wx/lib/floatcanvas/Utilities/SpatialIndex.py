@@ -0,0 +1,396 @@
+#----------------------------------------------------------------------------
+# Name:         SpatialIndex.py
+# Purpose:
+#
+# Author:
+#
+# Created:
+# Version:
+# Date:
+# Licence:
+# Tags:         phoenix-port
+#----------------------------------------------------------------------------
+"""
+A spatial index of the bounding boxes of the objects on a FloatCanvas.
+
+The index is a packed R-tree that is bulk loaded from numpy arrays, so that
+finding the objects in the viewport doesn't require looping over all of
+them in Python. Objects that are added or moved after the tree was built are
+kept in a short pending list until the next rebuild, and removed objects are
+simply marked dead, so all changes are cheap.
+
+The index also keeps its objects in drawing order, so it is used as the
+draw list of the canvas: objects can be removed, raised or lowered without
+searching a list.
+"""
+
+from __future__ import division
+
+import numpy as N
+
+from . import BBox
+
+
+class SpatialIndex(object):
+    """
+    A spatial index of objects and their bounding boxes.
+
+    The objects are kept in order: new objects are added at the end, and
+    can be moved with :meth:`Raise`, :meth:`Lower` and :meth:`SetPosition`.
+    Iterating over the index and :meth:`Query` return the objects in that
+    order, so the index can be used as a draw list.
+
+    Objects are hashed by identity.
+    """
+
+    #: number of children of every node of the tree
+    NodeSize = 16
+
+    #: never rebuild the tree for fewer pending objects than this
+    MinPending = 256
+
+    def __init__(self):
+        self.Clear()
+
+    def Clear(self):
+        """Remove all objects from the index."""
+        self._Objects = []
+        self._Slots = {}
+        self._Free = []
+        self._Boxes = N.empty((0, 4), N.float64)
+        self._Order = N.empty((0,), N.float64)
+        self._Alive = N.empty((0,), N.bool_)
+        self._InTree = N.empty((0,), N.bool_)
+        self._Counter = 0
+        self._Low = 0
+        self._Sorted = None
+
+        self._Pending = set()
+        self._PendingArray = None
+        self._Levels = []
+        self._TreeSlots = N.empty((0,), N.intp)
+        self._TreeSize = 0
+        self._Stale = 0
+
+        self._BB = None
+
+    def __len__(self):
+        return len(self._Slots)
+
+    def __contains__(self, obj):
+        return id(obj) in self._Slots
+
+    def __iter__(self):
+        Objects = self._Objects
+        return iter([Objects[slot] for slot in self._SortedSlots()])
+
+    def append(self, obj):
+        """Add an object at the end, like ``list.append``."""
+        self.Insert(obj, obj.BoundingBox)
+
+    def remove(self, obj):
+        """Remove an object, like ``list.remove``."""
+        self.Remove(obj)
+
+    def index(self, obj):
+        """
+        The position of an object in the order, like ``list.index``.
+
+        :raises ValueError: if the object is not in the index
+
+        """
+        return self.GetPosition(obj)
+
+    def Insert(self, obj, BB):
+        """
+        Add an object to the index, after all the objects already in it.
+
+        :param `obj`: the object
+        :param `BB`: its bounding box, a :class:`~lib.floatcanvas.Utilities.BBox.BBox`
+         or anything that can be turned into a 2x2 array
+
+        """
+        if id(obj) in self._Slots:
+            self.Update(obj, BB)
+            return
+        if self._Free:
+            slot = self._Free.pop()
+        else:
+            slot = len(self._Objects)
+            self._Objects.append(None)
+            if slot >= len(self._Boxes):
+                self._Grow()
+        self._Objects[slot] = obj
+        self._Slots[id(obj)] = slot
+        self._Order[slot] = self._Counter
+        self._Counter += 1
+        self._Alive[slot] = True
+        self._InTree[slot] = False
+        self._Sorted = None
+        self._SetBox(slot, BB)
+
+    def Update(self, obj, BB):
+        """
+        Set the bounding box of an object that is already in the index.
+
+        Objects that are not in the index are ignored.
+
+        """
+        slot = self._Slots.get(id(obj))
+        if slot is None:
+            return
+        if self._InTree[slot]:
+            self._InTree[slot] = False
+            self._Stale += 1
+        self._BB = None
+        self._SetBox(slot, BB)
+
+    def Remove(self, obj):
+        """
+        Remove an object from the index.
+
+        :raises ValueError: if the object is not in the index
+
+        """
+        slot = self._Slot(obj)
+        del self._Slots[id(obj)]
+        if self._InTree[slot]:
+            self._InTree[slot] = False
+            self._Stale += 1
+        self._Alive[slot] = False
+        self._Objects[slot] = None
+        self._Boxes[slot] = N.nan
+        if slot in self._Pending:
+            self._Pending.discard(slot)
+            self._PendingArray = None
+        self._Free.append(slot)
+        self._Sorted = None
+        self._BB = None
+
+    def GetBox(self, obj):
+        """
+        The bounding box of an object, as it is stored in the index.
+
+        :returns: a :class:`~lib.floatcanvas.Utilities.BBox.BBox`
+
+        """
+        slot = self._Slot(obj)
+        return BBox.asBBox(self._Boxes[slot].reshape(2, 2).copy())
+
+    def Raise(self, obj):
+        """Move an object to the end of the order."""
+        slot = self._Slot(obj)
+        self._Order[slot] = self._Counter
+        self._Counter += 1
+        self._Sorted = None
+
+    def Lower(self, obj):
+        """Move an object to the start of the order."""
+        slot = self._Slot(obj)
+        self._Low -= 1
+        self._Order[slot] = self._Low
+        self._Sorted = None
+
+    def GetPosition(self, obj):
+        """The position of an object in the order, starting at 0."""
+        slot = self._Slot(obj)
+        Sorted = self._SortedSlots()
+        return int(N.searchsorted(self._Order[Sorted], self._Order[slot]))
+
+    def SetPosition(self, obj, position):
+        """
+        Move an object to a position in the order.
+
+        :param `obj`: the object
+        :param integer `position`: the new position, 0 is the start. Negative
+         values count from the end, as with list indices.
+
+        """
+        slot = self._Slot(obj)
+        Sorted = self._SortedSlots()
+        Sorted = Sorted[Sorted != slot]
+        if position < 0:
+            position += len(Sorted) + 1
+        position = max(0, min(position, len(Sorted)))
+        if position == 0:
+            self.Lower(obj)
+            return
+        if position == len(Sorted):
+            self.Raise(obj)
+            return
+        before, after = self._Order[Sorted[position - 1:position + 1]]
+        key = (before + after) / 2
+        if not before < key < after:
+            # out of precision between the two: number all objects again
+            Sorted = N.insert(Sorted, position, slot)
+            self._Order[Sorted] = N.arange(len(Sorted))
+            self._Counter = len(Sorted)
+            self._Low = 0
+        else:
+            self._Order[slot] = key
+        self._Sorted = None
+
+    def Query(self, BB):
+        """
+        Find the objects that overlap a bounding box.
+
+        As with :meth:`~lib.floatcanvas.Utilities.BBox.BBox.Overlaps`,
+        objects that just touch the box count as overlapping, and objects
+        with a null bounding box are never found.
+
+        :param `BB`: the bounding box to look in
+        :returns: the objects, in the order they were inserted in
+
+        """
+        if not self._Slots:
+            return []
+        self._CheckTree()
+        BB = N.asarray(BB, N.float64)
+        x0, y0, x1, y1 = BB[0, 0], BB[0, 1], BB[1, 0], BB[1, 1]
+
+        def Overlaps(boxes):
+            return ((boxes[:, 2] >= x0) & (boxes[:, 0] <= x1) &
+                    (boxes[:, 3] >= y0) & (boxes[:, 1] <= y1))
+
+        found = []
+        if self._Levels:
+            NodeSize = self.NodeSize
+            nodes = None
+            for boxes in self._Levels:
+                if nodes is None:
+                    nodes = N.arange(len(boxes))
+                else:
+                    nodes = (nodes[:, None] * NodeSize +
+                             N.arange(NodeSize)).ravel()
+                    nodes = nodes[nodes < len(boxes)]
+                nodes = nodes[Overlaps(boxes[nodes])]
+                if not len(nodes):
+                    break
+            slots = self._TreeSlots[nodes]
+            found.append(slots[self._InTree[slots]])
+        if self._Pending:
+            if self._PendingArray is None:
+                self._PendingArray = N.fromiter(self._Pending, N.intp,
+                                                len(self._Pending))
+            slots = self._PendingArray
+            found.append(slots[Overlaps(self._Boxes[slots])])
+
+        if not found:
+            return []
+        slots = N.concatenate(found)
+        slots = slots[N.argsort(self._Order[slots], kind='mergesort')]
+        Objects = self._Objects
+        return [Objects[slot] for slot in slots]
+
+    def GetBoundingBox(self):
+        """
+        The bounding box of all the objects in the index.
+
+        :returns: a :class:`~lib.floatcanvas.Utilities.BBox.BBox`, which is
+         a null bounding box if there are no objects or they all have null
+         bounding boxes.
+
+        """
+        if self._BB is None:
+            boxes = self._Boxes[self._Alive]
+            boxes = boxes[~N.isnan(boxes).any(axis=1)]
+            if len(boxes):
+                self._BB = ((boxes[:, 0].min(), boxes[:, 1].min()),
+                            (boxes[:, 2].max(), boxes[:, 3].max()))
+            else:
+                self._BB = ()
+        if not self._BB:
+            return BBox.NullBBox()
+        return BBox.asBBox(N.array(self._BB, N.float64))
+
+    def _Slot(self, obj):
+        try:
+            return self._Slots[id(obj)]
+        except KeyError:
+            raise ValueError("object is not in the index")
+
+    def _SortedSlots(self):
+        """The slots of all objects, in order."""
+        if self._Sorted is None:
+            slots = N.nonzero(self._Alive)[0]
+            self._Sorted = slots[N.argsort(self._Order[slots],
+                                           kind='mergesort')]
+        return self._Sorted
+
+    def _SetBox(self, slot, BB):
+        x0, y0, x1, y1 = N.asarray(BB, N.float64).reshape(4).tolist()
+        self._Boxes[slot] = (x0, y0, x1, y1)
+        if x0 != x0 or y0 != y0 or x1 != x1 or y1 != y1:
+            # a null bounding box can never be found
+            if slot in self._Pending:
+                self._Pending.discard(slot)
+                self._PendingArray = None
+            return
+        self._Pending.add(slot)
+        self._PendingArray = None
+        if self._BB:
+            (X0, Y0), (X1, Y1) = self._BB
+            self._BB = ((min(X0, x0), min(Y0, y0)), (max(X1, x1), max(Y1, y1)))
+        elif self._BB is not None:
+            self._BB = ((x0, y0), (x1, y1))
+
+    def _Grow(self):
+        size = max(2 * len(self._Boxes), 64)
+        count = len(self._Boxes)
+        Boxes = N.empty((size, 4), N.float64)
+        Boxes[:count] = self._Boxes
+        Boxes[count:] = N.nan
+        self._Boxes = Boxes
+        for name, dtype in (('_Order', N.float64),
+                            ('_Alive', N.bool_),
+                            ('_InTree', N.bool_)):
+            new = N.zeros((size,), dtype)
+            new[:count] = getattr(self, name)
+            setattr(self, name, new)
+
+    def _CheckTree(self):
+        """Rebuild the tree if too much of the index is outside of it."""
+        if (len(self._Pending) > max(self.MinPending, self._TreeSize // 4) or
+            self._Stale > max(self.MinPending, self._TreeSize // 2)):
+            self._Build()
+
+    def _Build(self):
+        """Bulk load the tree with the Sort-Tile-Recursive algorithm."""
+        count = len(self._Objects)
+        boxes = self._Boxes[:count]
+        slots = N.nonzero(self._Alive[:count] &
+                          ~N.isnan(boxes).any(axis=1))[0]
+        boxes = boxes[slots]
+        NodeSize = self.NodeSize
+
+        if len(slots):
+            with N.errstate(invalid='ignore'):
+                centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+            centers = N.nan_to_num(centers)
+            leaves = -(-len(slots) // NodeSize)
+            SliceSize = int(N.ceil(N.sqrt(leaves))) * NodeSize
+            byx = N.argsort(centers[:, 0], kind='mergesort')
+            tile = N.arange(len(slots)) // SliceSize
+            perm = byx[N.lexsort((centers[byx, 1], tile))]
+            slots = slots[perm]
+            boxes = boxes[perm]
+
+        Levels = [boxes]
+        while len(Levels[0]) > NodeSize:
+            child = Levels[0]
+            starts = N.arange(0, len(child), NodeSize)
+            parent = N.empty((len(starts), 4), N.float64)
+            parent[:, 0] = N.minimum.reduceat(child[:, 0], starts)
+            parent[:, 1] = N.minimum.reduceat(child[:, 1], starts)
+            parent[:, 2] = N.maximum.reduceat(child[:, 2], starts)
+            parent[:, 3] = N.maximum.reduceat(child[:, 3], starts)
+            Levels.insert(0, parent)
+
+        self._Levels = Levels if len(slots) else []
+        self._TreeSlots = slots
+        self._TreeSize = len(slots)
+        self._InTree[:] = False
+        self._InTree[slots] = True
+        self._Stale = 0
+        self._Pending = set()
+        self._PendingArray = None
@@ -13,6 +13,7 @@ __docformat__ = "restructuredtext en"
 __all__ = [
     'PolyLine',
     'PolySpline',
+    'PolyStream',
     'PolyMarker',
     'PolyBars',
     'PolyHistogram',
@@ -31,6 +32,7 @@ from .plotcanvas import PlotCanvas
 from .polyobjects import PolyPoints
 from .polyobjects import PolyLine
 from .polyobjects import PolySpline
+from .polyobjects import PolyStream
 from .polyobjects import PolyMarker
 from .polyobjects import PolyBars
 from .polyobjects import PolyHistogram
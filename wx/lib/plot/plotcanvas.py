@@ -22,7 +22,7 @@ import numpy as np
 
 # Package
 from .polyobjects import PlotPrintout
-from .polyobjects import PolyMarker, PolyLine, PolyBoxPlot
+from .polyobjects import PolyMarker, PolyLine, PolyBoxPlot, PolyStream
 from .utils import DisplaySide
 from .utils import set_displayside
 from .utils import pendingDeprecation
@@ -121,6 +121,12 @@ class PlotCanvas(wx.Panel):
         self.last_draw = None
         self._pointScale = 1
         self._pointShift = 0
+        self._lastScaleShift = None
+        # (key, bitmap, scale, shift, pointSize, fontScale) of the cached
+        # background layer, see _drawCachedBackground
+        self._background = None
+        # (x, y) axes that follow the data in UpdateStreams
+        self._autoAxes = (False, False)
         self._xSpec = 'auto'
         self._ySpec = 'auto'
 
@@ -1438,12 +1444,14 @@ class PlotCanvas(wx.Panel):
     def Reset(self):
         """Unzoom the plot."""
         self.last_PointLabel = None  # reset pointLabel
+        self._autoAxes = (True, True)
         if self.last_draw is not None:
             self._Draw(self.last_draw[0])
 
     def ScrollRight(self, units):
         """Move view right number of axis units."""
         self.last_PointLabel = None  # reset pointLabel
+        self._autoAxes = (False, False)
         if self.last_draw is not None:
             graphics, xAxis, yAxis = self.last_draw
             xAxis = (xAxis[0] + units, xAxis[1] + units)
@@ -1452,6 +1460,7 @@ class PlotCanvas(wx.Panel):
     def ScrollUp(self, units):
         """Move view up number of axis units."""
         self.last_PointLabel = None  # reset pointLabel
+        self._autoAxes = (False, False)
         if self.last_draw is not None:
             graphics, xAxis, yAxis = self.last_draw
             yAxis = (yAxis[0] + units, yAxis[1] + units)
@@ -1741,6 +1750,7 @@ class PlotCanvas(wx.Panel):
         """Wrapper around _Draw, which handles log axes"""
 
         graphics.logScale = self.logScale
+        self._autoAxes = (xAxis is None, yAxis is None)
 
         # check Axis is either tuple or none
         err_txt = "xAxis should be None or (minX, maxX). Got type `{}`."
@@ -1771,16 +1781,76 @@ class PlotCanvas(wx.Panel):
         xAxis - tuple with (min, max) axis range to view
         yAxis - same as xAxis
         dc - drawing context - doesn't have to be specified.
-        If it's not, the offscreen buffer is used
+        If it's not, the offscreen buffer is used, and everything but the
+        data (grid, ticks, axes, labels, title and legend) is taken from a
+        cached background layer when nothing that affects it has changed.
         """
+        # sizes axis to axis type, create lower left and upper right
+        # corners of plot
+        if xAxis is None or yAxis is None:
+            # One or both axis not specified in Draw
+            p1, p2 = graphics.boundingBox()     # min, max points of graphics
+            if xAxis is None:
+                xAxis = self._axisInterval(
+                    self._xSpec, p1[0], p2[0])  # in user units
+            if yAxis is None:
+                yAxis = self._axisInterval(self._ySpec, p1[1], p2[1])
+            # Adjust bounding box for axis spec
+            # lower left corner user scale (xmin,ymin)
+            p1[0], p1[1] = xAxis[0], yAxis[0]
+            # upper right corner user scale (xmax,ymax)
+            p2[0], p2[1] = xAxis[1], yAxis[1]
+        else:
+            # Both axis specified in Draw
+            # lower left corner user scale (xmin,ymin)
+            p1 = np.array([xAxis[0], yAxis[0]])
+            # upper right corner user scale (xmax,ymax)
+            p2 = np.array([xAxis[1], yAxis[1]])
+
+        # saves most recent values
+        self.last_draw = (graphics, np.array(xAxis), np.array(yAxis))
 
         if dc is None:
-            # sets new dc and clears it
-            dc = wx.BufferedDC(wx.ClientDC(self.canvas), self._Buffer)
-            bbr = wx.Brush(self.GetBackgroundColour(), wx.BRUSHSTYLE_SOLID)
-            dc.SetBackground(bbr)
-            dc.SetBackgroundMode(wx.SOLID)
-            dc.Clear()
+            dc, scale, shift = self._drawCachedBackground(
+                graphics, xAxis, yAxis, p1, p2)
+        else:
+            dc, scale, shift = self._drawBackground(
+                dc, graphics, xAxis, yAxis, p1, p2)
+
+        # make available for mouse events
+        self._pointScale = scale / self._pointSize
+        self._pointShift = shift / self._pointSize
+        self._lastScaleShift = (scale, shift)
+
+        graphics._pointSize = self._pointSize
+        graphics.scaleAndShift(scale, shift)
+        # thicken up lines and markers if printing
+        graphics.printerScale = self.printerScale
+
+        # set clipping area so drawing does not occur outside axis box
+        ptx, pty, rectWidth, rectHeight = self._point2ClientCoord(p1, p2)
+        # allow graph to overlap axis lines by adding units to w and h
+        dc.SetClippingRegion(ptx * self._pointSize[0],
+                             pty * self._pointSize[1],
+                             rectWidth * self._pointSize[0] + 2,
+                             rectHeight * self._pointSize[1] + 1)
+        # Draw the lines and markers
+#        start = _time.perf_counter()
+        graphics.draw(dc)
+#        time_str = "entire graphics drawing took: {} seconds"
+#        print(time_str.format(_time.perf_counter() - start))
+        # remove the clipping region
+        dc.DestroyClippingRegion()
+
+        self._adjustScrollbars()
+
+    def _prepareDC(self, dc):
+        """
+        Sets up anti-aliasing, the point size and the font scale for a DC.
+
+        Returns the DC to draw on, which may be a :class:`wx.GCDC` wrapped
+        around ``dc``.
+        """
         if self._antiAliasingEnabled:
             if not isinstance(dc, wx.GCDC):
                 try:
@@ -1814,41 +1884,113 @@ class PlotCanvas(wx.Panel):
                 / 2.0
             )
 
-        graphics._pointSize = self._pointSize
-
         dc.SetTextForeground(self.GetForegroundColour())
         dc.SetTextBackground(self.GetBackgroundColour())
+        return dc
+
+    def _backgroundKey(self, graphics, xAxis, yAxis):
+        """
+        Returns a hashable description of everything that the background
+        layer (grid, ticks, axes, labels, title and legend) depends on.
+        """
+        def pen(p):
+            return (tuple(p.GetColour().Get()), p.GetWidth(), p.GetStyle())
+
+        legend = ()
+        if self._legendEnabled:
+            legend = tuple((type(o), o.getLegend(),
+                            repr(sorted(o.attributes.items())))
+                           for o in graphics)
+
+        return (tuple(float(v) for v in xAxis),
+                tuple(float(v) for v in yAxis),
+                tuple(self.canvas.GetClientSize()),
+                self._antiAliasingEnabled,
+                self._hiResEnabled,
+                self.printerScale,
+                self.GetFont().GetNativeFontInfoDesc(),
+                self._fontSizeAxis,
+                self._fontSizeTitle,
+                self._fontSizeLegend,
+                tuple(self.GetForegroundColour().Get()),
+                tuple(self.GetBackgroundColour().Get()),
+                repr(self._xSpec),
+                repr(self._ySpec),
+                tuple(self._logscale),
+                self._useScientificNotation,
+                repr(self._gridEnabled),
+                self._legendEnabled,
+                self._titleEnabled,
+                self._xAxisLabelEnabled,
+                self._yAxisLabelEnabled,
+                self._axesLabelsEnabled,
+                self._centerLinesEnabled,
+                self._diagonalsEnabled,
+                tuple(self._ticksEnabled),
+                tuple(self._axesEnabled),
+                tuple(self._axesValuesEnabled),
+                pen(self._gridPen),
+                pen(self._centerLinePen),
+                pen(self._axesPen),
+                pen(self._tickPen),
+                pen(self._diagonalPen),
+                tuple(self._tickLength),
+                graphics.title,
+                graphics.xLabel,
+                graphics.yLabel,
+                legend,
+                )
+
+    def _drawCachedBackground(self, graphics, xAxis, yAxis, p1, p2):
+        """
+        Copies the background layer into the offscreen buffer, rendering
+        it first if it is out of date.
+
+        Returns ``(dc, scale, shift)``: the buffer DC to draw the data on,
+        and the scaling of the plot area.
+        """
+        key = self._backgroundKey(graphics, xAxis, yAxis)
+        if self._background is None or self._background[0] != key:
+            bitmap = wx.Bitmap(self._Buffer.GetWidth(),
+                               self._Buffer.GetHeight())
+            mdc = wx.MemoryDC(bitmap)
+            bbr = wx.Brush(self.GetBackgroundColour(), wx.BRUSHSTYLE_SOLID)
+            mdc.SetBackground(bbr)
+            mdc.SetBackgroundMode(wx.SOLID)
+            mdc.Clear()
+            bdc, scale, shift = self._drawBackground(
+                mdc, graphics, xAxis, yAxis, p1, p2)
+            del bdc                 # flush the wx.GCDC, if there is one
+            mdc.SelectObject(wx.NullBitmap)
+            self._background = (key, bitmap, scale, shift,
+                                self._pointSize, self._fontScale)
+        else:
+            # the sizes and scales of the cached layout still apply
+            self._pointSize, self._fontScale = self._background[4:6]
+            self._setSize()
+
+        _, bitmap, scale, shift = self._background[:4]
+        dc = wx.BufferedDC(wx.ClientDC(self.canvas), self._Buffer)
+        dc.DrawBitmap(bitmap, 0, 0)
+        dc = self._prepareDC(dc)
+        return dc, scale, shift
+
+    def _drawBackground(self, dc, graphics, xAxis, yAxis, p1, p2):
+        """
+        Draws everything but the data: the title, axes labels, legend,
+        grid, ticks, axes and axes values.
+
+        Returns ``(dc, scale, shift)``: the DC to draw the data on, and
+        the scaling of the plot area.
+        """
+        dc = self._prepareDC(dc)
+        graphics._pointSize = self._pointSize
 
         # dc.Clear()
 
         # set font size for every thing but title and legend
         dc.SetFont(self._getFont(self._fontSizeAxis))
 
-        # sizes axis to axis type, create lower left and upper right
-        # corners of plot
-        if xAxis is None or yAxis is None:
-            # One or both axis not specified in Draw
-            p1, p2 = graphics.boundingBox()     # min, max points of graphics
-            if xAxis is None:
-                xAxis = self._axisInterval(
-                    self._xSpec, p1[0], p2[0])  # in user units
-            if yAxis is None:
-                yAxis = self._axisInterval(self._ySpec, p1[1], p2[1])
-            # Adjust bounding box for axis spec
-            # lower left corner user scale (xmin,ymin)
-            p1[0], p1[1] = xAxis[0], yAxis[0]
-            # upper right corner user scale (xmax,ymax)
-            p2[0], p2[1] = xAxis[1], yAxis[1]
-        else:
-            # Both axis specified in Draw
-            # lower left corner user scale (xmin,ymin)
-            p1 = np.array([xAxis[0], yAxis[0]])
-            # upper right corner user scale (xmax,ymax)
-            p2 = np.array([xAxis[1], yAxis[1]])
-
-        # saves most recent values
-        self.last_draw = (graphics, np.array(xAxis), np.array(yAxis))
-
         # Get ticks and textExtents for axis if required
         xticks = yticks = None
         xTextExtent = yTextExtent = (0, 0)  # No text for ticks
@@ -1908,38 +2050,71 @@ class PlotCanvas(wx.Panel):
                  * np.array((1, -1)))
         shift = (-p1 * scale + self.plotbox_origin
                  + textSize_shift * np.array((1, -1)))
-        # make available for mouse events
-        self._pointScale = scale / self._pointSize
-        self._pointShift = shift / self._pointSize
         self._drawPlotAreaItems(dc, p1, p2, scale, shift, xticks, yticks)
 
-        graphics.scaleAndShift(scale, shift)
-        # thicken up lines and markers if printing
-        graphics.printerScale = self.printerScale
+        return dc, scale, shift
 
-        # set clipping area so drawing does not occur outside axis box
+    def Redraw(self, dc=None):
+        """Redraw the existing plot."""
+        if self.last_draw is not None:
+            graphics, xAxis, yAxis = self.last_draw
+            self._Draw(graphics, xAxis, yAxis, dc)
+
+    def UpdateStreams(self):
+        """
+        Update the plot after samples were appended to its
+        :class:`~wx.lib.plot.polyobjects.PolyStream` objects.
+
+        Axes that were calculated automatically by :meth:`Draw` follow the
+        data. As long as the axes don't change, only the new samples of
+        each stream are drawn, so the cost of an update depends on the
+        number of new samples instead of the total number of points.
+        Otherwise the whole plot is redrawn.
+        """
+        if self.last_draw is None:
+            return
+        graphics, xAxis, yAxis = self.last_draw
+        streams = [o for o in graphics if isinstance(o, PolyStream)]
+
+        newXAxis, newYAxis = xAxis, yAxis
+        if any(self._autoAxes):
+            p1, p2 = graphics.boundingBox()
+            if self._autoAxes[0]:
+                newXAxis = self._axisInterval(self._xSpec, p1[0], p2[0])
+            if self._autoAxes[1]:
+                newYAxis = self._axisInterval(self._ySpec, p1[1], p2[1])
+
+        if (tuple(newXAxis) != tuple(xAxis)
+                or tuple(newYAxis) != tuple(yAxis)
+                or self._lastScaleShift is None
+                or not all(s._canDrawNew(xAxis[0]) for s in streams)):
+            self.last_PointLabel = None  # reset pointLabel
+            self._Draw(graphics,
+                       None if self._autoAxes[0] else xAxis,
+                       None if self._autoAxes[1] else yAxis)
+            return
+
+        if self.last_PointLabel is not None:
+            self._drawPointLabel(self.last_PointLabel)  # erase old
+            self.last_PointLabel = None
+
+        dc = wx.BufferedDC(wx.ClientDC(self.canvas), self._Buffer)
+        dc = self._prepareDC(dc)
+
+        scale, shift = self._lastScaleShift
+        p1 = np.array([xAxis[0], yAxis[0]])
+        p2 = np.array([xAxis[1], yAxis[1]])
         ptx, pty, rectWidth, rectHeight = self._point2ClientCoord(p1, p2)
-        # allow graph to overlap axis lines by adding units to w and h
         dc.SetClippingRegion(ptx * self._pointSize[0],
                              pty * self._pointSize[1],
                              rectWidth * self._pointSize[0] + 2,
                              rectHeight * self._pointSize[1] + 1)
-        # Draw the lines and markers
-#        start = _time.perf_counter()
-        graphics.draw(dc)
-#        time_str = "entire graphics drawing took: {} seconds"
-#        print(time_str.format(_time.perf_counter() - start))
-        # remove the clipping region
+        for stream in streams:
+            stream._pointSize = self._pointSize
+            stream.scaleAndShift(scale, shift)
+            stream.drawNew(dc, self.printerScale)
         dc.DestroyClippingRegion()
 
-        self._adjustScrollbars()
-
-    def Redraw(self, dc=None):
-        """Redraw the existing plot."""
-        if self.last_draw is not None:
-            graphics, xAxis, yAxis = self.last_draw
-            self._Draw(graphics, xAxis, yAxis, dc)
-
     def Clear(self):
         """Erase the window."""
         self.last_PointLabel = None  # reset pointLabel
@@ -1964,6 +2139,7 @@ class PlotCanvas(wx.Panel):
         Zooms by the Ratio = (Xratio, Yratio) given
         """
         self.last_PointLabel = None  # reset maker
+        self._autoAxes = (False, False)
         x, y = Center
         if self.last_draw is not None:
             (graphics, xAxis, yAxis) = self.last_draw
@@ -2085,6 +2261,7 @@ class PlotCanvas(wx.Panel):
             )
             dist = newpos - oldpos
             self._screenCoordinates = coordinates
+            self._autoAxes = (False, False)
 
             if self.last_draw is not None:
                 graphics, xAxis, yAxis = self.last_draw
@@ -2109,6 +2286,7 @@ class PlotCanvas(wx.Panel):
                 minX, minY = np.minimum(self._zoomCorner1, self._zoomCorner2)
                 maxX, maxY = np.maximum(self._zoomCorner1, self._zoomCorner2)
                 self.last_PointLabel = None  # reset pointLabel
+                self._autoAxes = (False, False)
                 if self.last_draw is not None:
                     self._Draw(self.last_draw[0],
                                xAxis=(minX, maxX),
@@ -2158,6 +2336,7 @@ class PlotCanvas(wx.Panel):
         # current drawing in it, so it can be used to save the image to
         # a file, or whatever.
         self._Buffer = wx.Bitmap(Size.width, Size.height)
+        self._background = None
         self._setSize()
 
         self.last_PointLabel = None  # reset pointLabel
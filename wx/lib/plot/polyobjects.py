@@ -34,6 +34,10 @@ except:
 from .utils import pendingDeprecation
 from .utils import TempStyle
 from .utils import pairwise
+from .utils import minmax_decimate
+from .utils import pixel_decimate
+from .utils import PointIndex
+from .utils import stamp_sprite
 
 
 # XXX: Comment out this line to disable deprecation warnings
@@ -52,9 +56,17 @@ class PolyPoints(object):
     .. warning::
        All methods are private.
     """
+    # curves with fewer points are searched without a spatial index
+    _pointIndexThreshold = 1000
 
     def __init__(self, points, attr):
         self._points = np.array(points).astype(np.float64)
+        self._pointsCache = None
+        self._bboxCache = None
+        self._sortedX = None
+        self._scaledValid = False
+        self._decimateCache = None
+        self._pointIndex = {}
         self._logscale = (False, False)
         self._absScale = (False, False)
         self._symlogscale = (False, False)
@@ -87,7 +99,9 @@ class PolyPoints(object):
     def logScale(self, logscale):
         if not isinstance(logscale, tuple) or len(logscale) != 2:
             raise ValueError("`logscale` must be a 2-tuple of bools")
-        self._logscale = logscale
+        if logscale != self._logscale:
+            self._logscale = logscale
+            self._invalidateCache()
 
     def setLogScale(self, logscale):
         """
@@ -101,7 +115,7 @@ class PolyPoints(object):
            property instead.
         """
         pendingDeprecation("self.logScale property")
-        self._logscale = logscale
+        self.logScale = logscale
 
     @property
     def symLogScale(self):
@@ -213,7 +227,9 @@ class PolyPoints(object):
 
         if not isinstance(absscale, tuple) and len(absscale) == 2:
             raise ValueError("`absscale` must be a 2-tuple of bools")
-        self._absScale = absscale
+        if absscale != self._absScale:
+            self._absScale = absscale
+            self._invalidateCache()
 
     @property
     def points(self):
@@ -229,10 +245,36 @@ class PolyPoints(object):
 
            Only set unscaled points - do not perform the log, abs, or symlog
            adjustments yourself.
+
+        .. Note::
+
+           The returned array is cached and read-only. It is only rebuilt
+           when the points or the log, abs, or symlog settings change.
+        """
+        if self._pointsCache is None:
+            self._pointsCache = self._transformPoints()
+        return self._pointsCache
+
+    @points.setter
+    def points(self, points):
+        self._points = np.array(points).astype(np.float64)
+        self._invalidateCache()
+
+    def _transformPoints(self):
         """
-        data = np.array(self._points, copy=True)    # need the copy
-                                                    # TODO: get rid of the
-                                                    # need for copy
+        Apply the Log, Abs, or SymLog adjustments to the raw points.
+
+        The raw points are only copied when an adjustment actually has to
+        modify them.
+
+        :returns: read-only array of the adjusted points
+        :rtype: numpy array
+        """
+        if any(self.absScale) or any(self.logScale):
+            # the adjustments work in place, so don't touch the raw data
+            data = np.array(self._points, copy=True)
+        else:
+            data = self._points.view()
 
         # work on X:
         if self.absScale[0]:
@@ -257,11 +299,66 @@ class PolyPoints(object):
             # TODO: implement symLogScale
             pass
 
+        data.flags.writeable = False
         return data
 
-    @points.setter
-    def points(self, points):
-        self._points = points
+    def _invalidateCache(self):
+        """
+        Forget the cached adjusted points, bounding box, and scaling.
+
+        Must be called whenever the raw points or the scale options change.
+        """
+        self._pointsCache = None
+        self._bboxCache = None
+        self._sortedX = None
+        self._scaledValid = False
+        self._decimateCache = None
+        self._pointIndex = {}
+
+    def _isSortedX(self):
+        """
+        Return ``True`` if the x values of the points never decrease.
+        """
+        if self._sortedX is None:
+            x = self.points[:, 0]
+            self._sortedX = bool(np.all(x[1:] >= x[:-1]))
+        return self._sortedX
+
+    def _visiblePoints(self, dc, margin=0):
+        """
+        Return the scaled points that need to be drawn on the DC.
+
+        If the ``decimate`` attribute is set, the points are reduced to what
+        is visible inside the clipping box of the DC at screen resolution.
+        The result is cached until the points or the scaling change.
+
+        :param dc: The DC that is being drawn on.
+        :type dc: :class:`wx.DC`
+        :param margin: How far outside the clipping box a point may be and
+                       still affect the drawing.
+        :type margin: float
+        :rtype: numpy array of ``[x, y]`` values
+        """
+        if not self.attributes.get('decimate', False):
+            return self.scaled
+
+        bbox = tuple(dc.GetClippingBox())
+        if bbox[2] <= 0 or bbox[3] <= 0:
+            # no clipping region
+            bbox = None
+        key = (bbox, margin)
+        if self._decimateCache is None or self._decimateCache[0] != key:
+            index = self._decimate(self.scaled, bbox, margin)
+            self._decimateCache = (key, self.scaled[index])
+        return self._decimateCache[1]
+
+    def _decimate(self, scaled, bbox, margin):
+        """
+        Return the indices of the scaled points that should be drawn.
+
+        Override method.
+        """
+        return np.arange(len(scaled))
 
     def _log10(self, data, index):
         """ Take the Log10 of the data, dropping any negative values """
@@ -284,15 +381,19 @@ class PolyPoints(object):
         :returns: boundingbox
         :rtype: numpy array of ``[[minX, minY], [maxX, maxY]]``
         """
-        if len(self.points) == 0:
-            # no curves to draw
-            # defaults to (-1,-1) and (1,1) but axis can be set in Draw
-            minXY = np.array([-1.0, -1.0])
-            maxXY = np.array([1.0, 1.0])
-        else:
-            minXY = np.minimum.reduce(self.points)
-            maxXY = np.maximum.reduce(self.points)
-        return minXY, maxXY
+        if self._bboxCache is None:
+            if len(self.points) == 0:
+                # no curves to draw
+                # defaults to (-1,-1) and (1,1) but axis can be set in Draw
+                minXY = np.array([-1.0, -1.0])
+                maxXY = np.array([1.0, 1.0])
+            else:
+                minXY = np.minimum.reduce(self.points)
+                maxXY = np.maximum.reduce(self.points)
+            self._bboxCache = (minXY, maxXY)
+        # return copies: callers (PlotCanvas._Draw) modify the result
+        minXY, maxXY = self._bboxCache
+        return minXY.copy(), maxXY.copy()
 
     def scaleAndShift(self, scale=(1, 1), shift=(0, 0)):
         """
@@ -309,17 +410,19 @@ class PolyPoints(object):
             # no curves to draw
             return
 
-        # TODO: Can we remove the if statement alltogether? Does
-        #       scaleAndShift ever get called when the current value equals
-        #       the new value?
-
+        # self.scaled is reused as long as neither the points nor the
+        # scaling have changed.
         # cast everything to list: some might be np.ndarray objects
-        if (list(scale) != list(self.currentScale)
+        if (not self._scaledValid
+                or list(scale) != list(self.currentScale)
                 or list(shift) != list(self.currentShift)):
             # update point scaling
             self.scaled = scale * self.points + shift
             self.currentScale = scale
             self.currentShift = shift
+            self._scaledValid = True
+            self._decimateCache = None
+            self._pointIndex.pop(True, None)
         # else unchanged use the current scaling
 
     def getLegend(self):
@@ -341,10 +444,18 @@ class PolyPoints(object):
             # Using user coords
             p = self.points
             pxy = np.array(pntXY)
-        # determine distance for each point
-        d = np.sqrt(np.add.reduce((p - pxy) ** 2, 1))  # sqrt(dx^2+dy^2)
-        pntIndex = np.argmin(d)
-        dist = d[pntIndex]
+        if len(p) < self._pointIndexThreshold:
+            # determine distance for each point
+            d = np.sqrt(np.add.reduce((p - pxy) ** 2, 1))  # sqrt(dx^2+dy^2)
+            pntIndex = np.argmin(d)
+            dist = d[pntIndex]
+        else:
+            # build the spatial index on first use
+            index = self._pointIndex.get(pointScaled)
+            if index is None:
+                index = PointIndex(p)
+                self._pointIndex[pointScaled] = index
+            pntIndex, dist = index.nearest(pxy)
         return [pntIndex,
                 self.points[pntIndex],
                 self.scaled[pntIndex] / self._pointSize,
@@ -367,6 +478,7 @@ class PolyLine(PolyPoints):
     ``style=wx.PENSTYLE_SOLID``  Line style     :class:`wx.PenStyle`
     ``legend=''``                Legend string  str
     ``drawstyle='line'``         see below      str
+    ``decimate=False``           see below      bool
     ===========================  =============  ====================
 
     ==================  ==================================================
@@ -386,6 +498,12 @@ class PolyLine(PolyPoints):
                         *Note: This typically does not look very good*
     ==================  ==================================================
 
+    If ``decimate`` is ``True``, only the points that make a visible
+    difference at screen resolution are drawn: for every pixel column of
+    the plot area the first, lowest, highest and last point is kept. This
+    makes drawing, zooming, and dragging of large datasets much faster.
+    The points are reduced again on every zoom or scroll.
+
     .. warning::
 
        All methods except ``__init__`` are private.
@@ -396,6 +514,7 @@ class PolyLine(PolyPoints):
                    'style': wx.PENSTYLE_SOLID,
                    'legend': '',
                    'drawstyle': 'line',
+                   'decimate': False,
                    }
     _drawstyles = ("line", "steps-pre", "steps-post",
                    "steps-mid-x", "steps-mid-y")
@@ -426,11 +545,29 @@ class PolyLine(PolyPoints):
         dc.SetPen(pen)
         if coord is None:
             if len(self.scaled):  # bugfix for Mac OS X
-                for c1, c2 in zip(self.scaled, self.scaled[1:]):
-                    self._path(dc, c1, c2, drawstyle)
+                points = self._visiblePoints(dc, width)
+                self._drawLines(dc, points, drawstyle)
         else:
             dc.DrawLines(coord)  # draw legend line
 
+    def _drawLines(self, dc, points, drawstyle):
+        """
+        Draw the scaled points as connected lines.
+
+        :param dc: The DC to draw on.
+        :type dc: :class:`wx.DC`
+        :param points: The scaled points to connect
+        :type points: numpy array of ``[x, y]`` values
+        :param drawstyle: The type of connector to use
+        :type drawstyle: str
+        """
+        if self.attributes.get('decimate') and drawstyle == 'line':
+            if len(points) >= 2:
+                dc.DrawLines(points)
+        else:
+            for c1, c2 in zip(points, points[1:]):
+                self._path(dc, c1, c2, drawstyle)
+
     def getSymExtent(self, printerScale):
         """
         Get the Width and Height of the symbol.
@@ -442,6 +579,26 @@ class PolyLine(PolyPoints):
         w = 5 * h
         return (w, h)
 
+    def _decimate(self, scaled, bbox, margin):
+        """
+        Return the indices of the scaled points that should be drawn.
+
+        Override method.
+        """
+        if self._isSortedX():
+            if bbox is None:
+                return minmax_decimate(scaled)
+            return minmax_decimate(scaled,
+                                   bbox[0] - margin,
+                                   bbox[0] + bbox[2] + margin)
+
+        # Unsorted data can't be binned into columns, so only drop points
+        # that are in the same pixel as the point before them.
+        pix = np.round(scaled)
+        keep = np.ones(len(scaled), dtype=bool)
+        keep[1:-1] = np.any(pix[1:-1] != pix[:-2], axis=1)
+        return np.flatnonzero(keep)
+
     def _path(self, dc, coord1, coord2, drawstyle):
         """
         Calculates the path from coord1 to coord 2 along X and Y
@@ -485,6 +642,337 @@ class PolyLine(PolyPoints):
         dc.DrawLines(line)
 
 
+class PolyStream(PolyLine):
+    """
+    Creates a PolyStream object: a line for live, append-only data.
+
+    The samples are kept in a fixed-capacity ring buffer, so appending never
+    reallocates and the oldest samples are dropped once the buffer is full.
+    The bounding box and the scaled points are updated incrementally, which
+    lets :meth:`~wx.lib.plot.plotcanvas.PlotCanvas.UpdateStreams` draw only
+    the newly appended segment while the axes don't change.
+
+    :param capacity: The maximum number of samples to keep.
+    :type capacity: int
+    :param window: The width of the rolling x-window, in user units. If
+                   ``None``, the x range covers all samples in the buffer.
+    :type window: float
+    :param step: The fraction of ``window`` that the x-window jumps forward
+                 by when the data reaches its right edge. Jumping instead of
+                 following every sample keeps the axes unchanged between
+                 jumps, so most updates only need to draw the new samples.
+                 If 0, the window follows the data exactly.
+    :type step: float
+    :param **attr: keyword attributes, same as
+                   :class:`~wx.lib.plot.polyobjects.PolyLine`.
+
+    ::
+
+        stream = PolyStream(10000, window=10.0, colour='blue')
+        canvas.Draw(PlotGraphics([stream]))
+
+        # then, for every batch of new data:
+        stream.append(samples)
+        canvas.UpdateStreams()
+
+    .. note::
+
+       The y range of the bounding box covers all samples kept in the
+       buffer, so ``capacity`` should match the number of samples that fit
+       in ``window``.
+
+    .. warning::
+
+       All methods except ``__init__``, ``append`` and ``clear`` are private.
+    """
+
+    def __init__(self, capacity, window=None, step=0.25, **attr):
+        capacity = int(capacity)
+        if capacity < 1:
+            raise ValueError("`capacity` must be a positive integer")
+        if window is not None and window <= 0:
+            raise ValueError("`window` must be None or a positive number")
+        self._capacity = capacity
+        self._window = window
+        self._step = step
+        # Every sample is stored twice, at i and i + capacity, so that the
+        # samples in the buffer are always a contiguous slice.
+        self._buffer = np.zeros((2 * capacity, 2), np.float64)
+        self._scaledBuffer = np.zeros((2 * capacity, 2), np.float64)
+        self._start = 0
+        self._count = 0
+        self._appended = 0      # total number of samples ever appended
+        self._scaledUpTo = 0    # value of _appended when last scaled
+        self._drawnUpTo = 0     # value of _appended when last drawn
+        self._droppedAtDraw = 0
+        self._dropped = 0       # total number of samples ever dropped
+        self._monotonic = True
+        self._extent = None
+        PolyLine.__init__(self, np.zeros((0, 2)), **attr)
+        self._points = self._buffer[0:0]
+
+    @property
+    def capacity(self):
+        """
+        The maximum number of samples kept in the buffer.
+
+        :getter: Returns the capacity.
+        :type: int
+        """
+        return self._capacity
+
+    @property
+    def window(self):
+        """
+        The width of the rolling x-window in user units, or ``None``.
+
+        :getter: Returns the current value of window
+        :setter: Sets the value of window
+        :type: float
+        """
+        return self._window
+
+    @window.setter
+    def window(self, window):
+        if window is not None and window <= 0:
+            raise ValueError("`window` must be None or a positive number")
+        self._window = window
+
+    @property
+    def points(self):
+        """
+        Get or set the plotted points.
+
+        Setting the points replaces the content of the buffer. Only the
+        last ``capacity`` points are kept.
+
+        :type: list of `(x, y)` pairs
+        """
+        return PolyLine.points.fget(self)
+
+    @points.setter
+    def points(self, points):
+        self.clear()
+        self.append(points)
+
+    def append(self, samples):
+        """
+        Append samples to the end of the stream.
+
+        Once the buffer is full, the oldest samples are dropped.
+
+        :param samples: The new samples.
+        :type samples: list of ``(x, y)`` pairs, or numpy array
+        """
+        samples = np.asarray(samples, dtype=np.float64).reshape(-1, 2)
+        k = len(samples)
+        if k == 0:
+            return
+        cap = self._capacity
+        if k > cap:
+            self._dropped += self._count + k - cap
+            samples = samples[-cap:]
+            k = cap
+            self._start = 0
+            self._count = 0
+            self._extent = None
+            self._monotonic = True
+
+        # check what is about to be dropped before overwriting it
+        drop = max(self._count + k - cap, 0)
+        if drop and self._extent is not None:
+            dropped = self._buffer[self._start:self._start + drop]
+            if (np.any(dropped <= self._extent[0])
+                    or np.any(dropped >= self._extent[1])):
+                # an extreme value is dropped: recalculate when needed
+                self._extent = None
+
+        # monotonic x is what allows the fast decimation of lines
+        x = samples[:, 0]
+        if self._monotonic:
+            previous = self._buffer[self._start + self._count - 1, 0]
+            self._monotonic = bool(
+                np.all(x[1:] >= x[:-1])
+                and (self._count == 0 or x[0] >= previous))
+
+        # write the new samples into both halves of the buffer
+        idx = (self._start + self._count + np.arange(k)) % cap
+        self._buffer[idx] = samples
+        self._buffer[idx + cap] = samples
+
+        self._start = (self._start + drop) % cap
+        self._count = self._count + k - drop
+        self._appended += k
+        self._dropped += drop
+
+        if self._extent is not None:
+            self._extent = (
+                np.minimum(self._extent[0], np.minimum.reduce(samples)),
+                np.maximum(self._extent[1], np.maximum.reduce(samples)))
+
+        self._points = self._buffer[self._start:self._start + self._count]
+        if any(self.logScale) or any(self.absScale):
+            self._invalidateCache()
+        else:
+            # keep the scaling: scaleAndShift only scales the new samples
+            self._pointsCache = None
+            self._bboxCache = None
+            self._decimateCache = None
+            self._pointIndex = {}
+
+    def clear(self):
+        """
+        Remove all samples from the stream.
+        """
+        self._dropped += self._count
+        self._start = 0
+        self._count = 0
+        self._monotonic = True
+        self._extent = None
+        self._points = self._buffer[0:0]
+        self._invalidateCache()
+
+    def _isSortedX(self):
+        """
+        Return ``True`` if the x values of the points never decrease.
+        """
+        if self.absScale[0]:
+            return PolyLine._isSortedX(self)
+        return self._monotonic
+
+    def _windowRange(self, first, last):
+        """
+        Return the ``(min, max)`` x range of the rolling window.
+
+        :param first: The x value of the oldest sample.
+        :param last: The x value of the newest sample.
+        """
+        window = self._window
+        if self._step:
+            step = window * self._step
+            start = np.ceil((last - window) / step) * step
+            start = max(start, np.floor(first / step) * step)
+        else:
+            start = max(last - window, first)
+        return start, start + window
+
+    def boundingBox(self):
+        """
+        Returns the bouding box for the stream as a tuple with this
+        format::
+
+            ((minX, minY), (maxX, maxY))
+
+        If a ``window`` is set, the x range is the range of the rolling
+        window.
+
+        :returns: boundingbox
+        :rtype: numpy array of ``[[minX, minY], [maxX, maxY]]``
+        """
+        if self._count == 0:
+            return PolyLine.boundingBox(self)
+        if any(self.logScale) or any(self.absScale):
+            minXY, maxXY = PolyLine.boundingBox(self)
+        else:
+            if self._extent is None:
+                self._extent = (np.minimum.reduce(self._points),
+                                np.maximum.reduce(self._points))
+            minXY = self._extent[0].copy()
+            maxXY = self._extent[1].copy()
+        if self._window is not None:
+            points = self.points
+            minXY[0], maxXY[0] = self._windowRange(points[0, 0],
+                                                   points[-1, 0])
+        return minXY, maxXY
+
+    def scaleAndShift(self, scale=(1, 1), shift=(0, 0)):
+        """
+        Scales and shifts the data for plotting.
+
+        Only the samples appended since the last call are scaled, unless
+        the scaling changed.
+
+        :param scale: The values to scale the data by.
+        :type scale: list of floats: ``[x_scale, y_scale]``
+        :param shift: The value to shift the data by. This should be in scaled
+                      units
+        :type shift: list of floats: ``[x_shift, y_shift]``
+        :returns: None
+        """
+        if any(self.logScale) or any(self.absScale):
+            # the adjusted points don't map 1:1 onto the buffer
+            PolyLine.scaleAndShift(self, scale, shift)
+            return
+        if self._count == 0:
+            return
+
+        cap = self._capacity
+        if (self._scaledValid
+                and list(scale) == list(self.currentScale)
+                and list(shift) == list(self.currentShift)):
+            new = min(self._appended - self._scaledUpTo, self._count)
+        else:
+            new = self._count
+        if new:
+            first = self._start + self._count - new
+            idx = np.arange(first, first + new) % cap
+            scaled = scale * self._buffer[idx] + shift
+            self._scaledBuffer[idx] = scaled
+            self._scaledBuffer[idx + cap] = scaled
+            self._decimateCache = None
+            self._pointIndex.pop(True, None)
+
+        self.scaled = self._scaledBuffer[self._start:
+                                         self._start + self._count]
+        self.currentScale = scale
+        self.currentShift = shift
+        self._scaledValid = True
+        self._scaledUpTo = self._appended
+
+    def draw(self, dc, printerScale, coord=None):
+        """ Draw the stream """
+        PolyLine.draw(self, dc, printerScale, coord)
+        if coord is None:
+            self._drawnUpTo = self._appended
+            self._droppedAtDraw = self._dropped
+
+    def _canDrawNew(self, xmin):
+        """
+        Return ``True`` if drawing only the new samples is enough to update
+        a plot whose x axis starts at ``xmin``.
+        """
+        if any(self.logScale) or any(self.absScale):
+            return False
+        if self._dropped != self._droppedAtDraw and self._count:
+            # dropped samples might still be visible
+            if self._points[0, 0] > xmin:
+                return False
+        return True
+
+    def drawNew(self, dc, printerScale):
+        """
+        Draw only the samples appended since the last draw.
+
+        The segment is joined to the last sample that was already drawn.
+        :meth:`scaleAndShift` must have been called first.
+        """
+        new = min(self._appended - self._drawnUpTo, self._count)
+        if new:
+            colour = self.attributes['colour']
+            width = (self.attributes['width'] * printerScale
+                     * self._pointSize[0])
+            style = self.attributes['style']
+            if not isinstance(colour, wx.Colour):
+                colour = wx.Colour(colour)
+            pen = wx.Pen(colour, width, style)
+            pen.SetCap(wx.CAP_BUTT)
+            dc.SetPen(pen)
+            segment = self.scaled[-(new + 1):]
+            self._drawLines(dc, segment, self.attributes['drawstyle'])
+        self._drawnUpTo = self._appended
+        self._droppedAtDraw = self._dropped
+
+
 class PolySpline(PolyLine):
     """
     Creates PolySpline object
@@ -500,6 +988,7 @@ class PolySpline(PolyLine):
     ``width=1``                  Line width     float
     ``style=wx.PENSTYLE_SOLID``  Line style     :class:`wx.PenStyle`
     ``legend=''``                Legend string  str
+    ``decimate=False``           see PolyLine   bool
     ===========================  =============  ====================
 
     .. warning::
@@ -510,7 +999,8 @@ class PolySpline(PolyLine):
     _attributes = {'colour': 'black',
                    'width': 1,
                    'style': wx.PENSTYLE_SOLID,
-                   'legend': ''}
+                   'legend': '',
+                   'decimate': False}
 
     def __init__(self, points, **attr):
         PolyLine.__init__(self, points, **attr)
@@ -526,8 +1016,10 @@ class PolySpline(PolyLine):
         pen.SetCap(wx.CAP_ROUND)
         dc.SetPen(pen)
         if coord is None:
-            if len(self.scaled) >= 3:
-                dc.DrawSpline(self.scaled)
+            if len(self.scaled):
+                points = self._visiblePoints(dc, width)
+                if len(points) >= 3:
+                    dc.DrawSpline(points)
         else:
             dc.DrawLines(coord)  # draw legend line
 
@@ -551,6 +1043,7 @@ class PolyMarker(PolyPoints):
     ``fillcolour=colour``              fill color     :class:`wx.Colour`
     ``fillstyle=wx.BRUSHSTYLE_SOLID``  fill style     :class:`wx.BrushStyle`
     ``legend=''``                      Legend string  str
+    ``decimate=False``                 see below      bool
     =================================  =============  ====================
 
     ===================  ==================================
@@ -565,6 +1058,12 @@ class PolyMarker(PolyPoints):
     ``'plus'``           A "+" shape
     ===================  ==================================
 
+    If ``decimate`` is ``True``, markers outside of the plot area are skipped
+    and markers that fall on the same pixel are only drawn once.
+
+    Large numbers of markers are drawn by rendering a single marker and
+    copying it to every point, then drawing the result as one bitmap.
+
     .. warning::
 
        All methods except ``__init__`` are private.
@@ -575,10 +1074,15 @@ class PolyMarker(PolyPoints):
                    'fillcolour': None,
                    'fillstyle': wx.BRUSHSTYLE_SOLID,
                    'marker': 'circle',
-                   'legend': ''}
+                   'legend': '',
+                   'decimate': False}
+
+    #: Above this many markers, render one marker and stamp it everywhere.
+    _stampThreshold = 5000
 
     def __init__(self, points, **attr):
         PolyPoints.__init__(self, points, attr)
+        self._sprite = None
 
     def draw(self, dc, printerScale, coord=None):
         """ Draw the points """
@@ -601,7 +1105,12 @@ class PolyMarker(PolyPoints):
             dc.SetBrush(wx.Brush(colour, fillstyle))
         if coord is None:
             if len(self.scaled):  # bugfix for Mac OS X
-                self._drawmarkers(dc, self.scaled, marker, size)
+                points = self._visiblePoints(dc, 2.5 * size + width)
+                if (len(points) >= self._stampThreshold
+                        and self._canStamp(dc, printerScale)):
+                    self._drawStamped(dc, points, marker, size)
+                elif len(points):
+                    self._drawmarkers(dc, points, marker, size)
         else:
             self._drawmarkers(dc, coord, marker, size)  # draw legend marker
 
@@ -610,54 +1119,150 @@ class PolyMarker(PolyPoints):
         s = 5 * self.attributes['size'] * printerScale * self._pointSize[0]
         return (s, s)
 
+    def _decimate(self, scaled, bbox, margin):
+        """
+        Return the indices of the scaled points that should be drawn.
+
+        Override method.
+        """
+        return pixel_decimate(scaled, bbox, margin)
+
     def _drawmarkers(self, dc, coords, marker, size=1):
         f = getattr(self, "_{}".format(marker))
         f(dc, coords, size)
 
-    def _circle(self, dc, coords, size=1):
+    def _canStamp(self, dc, printerScale):
+        """
+        Return True if the markers can be stamped as a bitmap.
+
+        Only when drawing to the screen at one logical unit per pixel, so
+        that the bitmap looks exactly like the markers drawn one by one.
+        The sprite is drawn without anti-aliasing and has a binary alpha,
+        so markers drawn on a :class:`wx.GCDC` are never stamped.
+        """
+        return (printerScale == 1
+                and not isinstance(dc, wx.GCDC)
+                and self._pointSize == (1.0, 1.0)
+                and tuple(dc.GetUserScale()) == (1.0, 1.0)
+                and tuple(dc.GetLogicalOrigin()) == (0, 0))
+
+    def _getSprite(self, marker, size, pen, brush):
+        """
+        Render a single marker and return it as an RGBA numpy array.
+
+        The marker is drawn twice, once in its own colours and once in
+        white on black, which gives the alpha channel.
+        """
+        key = (marker, size,
+               pen.GetColour().GetRGBA(), pen.GetWidth(), pen.GetStyle(),
+               brush.GetColour().GetRGBA(), brush.GetStyle())
+        if self._sprite is not None and self._sprite[0] == key:
+            return self._sprite[1]
+
+        half = int(np.ceil(2.5 * size + pen.GetWidth())) + 1
+        n = 2 * half + 1
+        center = np.array([[half, half]], np.float64)
+
+        def render(pen, brush):
+            bmp = wx.Bitmap(n, n, 24)
+            mdc = wx.MemoryDC(bmp)
+            mdc.SetBackground(wx.BLACK_BRUSH)
+            mdc.Clear()
+            mdc.SetPen(pen)
+            mdc.SetBrush(brush)
+            self._drawmarkers(mdc, center, marker, size)
+            mdc.SelectObject(wx.NullBitmap)
+            buf = np.zeros((n, n, 3), np.uint8)
+            bmp.CopyToBuffer(buf, wx.BitmapBufferFormat_RGB)
+            return buf
+
+        colour = render(pen, brush)
+        mask = render(wx.Pen(wx.WHITE, pen.GetWidth(), pen.GetStyle()),
+                      wx.Brush(wx.WHITE, brush.GetStyle()))
+        alpha = np.where(mask.any(axis=2), 255, 0).astype(np.uint8)
+        sprite = np.dstack((colour, alpha))
+        self._sprite = (key, sprite)
+        return sprite
+
+    def _drawStamped(self, dc, coords, marker, size):
+        """
+        Draw all markers with a single bitmap.
+
+        The marker is rendered once and then copied to every coordinate
+        with numpy, which is much faster than having the DC draw every
+        marker when there are many of them.
+        """
+        x, y, w, h = dc.GetClippingBox()
+        if w <= 0 or h <= 0:
+            x, y = 0, 0
+            w, h = dc.GetSize()
+        if w <= 0 or h <= 0:
+            return
+        sprite = self._getSprite(marker, size, dc.GetPen(), dc.GetBrush())
+        image = stamp_sprite(sprite, coords - (x, y), (w, h))
+        bmp = wx.Bitmap.FromBufferRGBA(w, h, image)
+        dc.DrawBitmap(bmp, x, y)
+
+    @staticmethod
+    def _rects(coords, size=1):
+        """The ``(x, y, width, height)`` boxes of the markers, as int32"""
         fact = 2.5 * size
         wh = 5.0 * size
-        rect = np.zeros((len(coords), 4), np.float) + [0.0, 0.0, wh, wh]
-        rect[:, 0:2] = coords - [fact, fact]
-        dc.DrawEllipseList(rect.astype(np.int32))
+        rect = np.empty((len(coords), 4), np.float64)
+        rect[:, 0:2] = coords
+        rect[:, 0:2] -= fact
+        rect[:, 2:4] = wh
+        return rect.astype(np.int32)
+
+    @staticmethod
+    def _polygons(coords, shape):
+        """The marker ``shape`` translated to every coordinate, as int32"""
+        coords = np.asarray(coords, np.float64)
+        poly = coords[:, np.newaxis, :] + np.asarray(shape, np.float64)
+        return poly.astype(np.int32)
+
+    @staticmethod
+    def _lines(coords, offsets):
+        """
+        All line segments of the markers, as int32.
+
+        ``offsets`` holds one ``[x1, y1, x2, y2]`` offset per segment of a
+        single marker.
+        """
+        coords = np.asarray(coords, np.float64)
+        ends = np.concatenate((coords, coords), axis=1)
+        offsets = np.asarray(offsets, np.float64)
+        lines = ends[np.newaxis, :, :] + offsets[:, np.newaxis, :]
+        return lines.reshape(-1, 4).astype(np.int32)
+
+    def _circle(self, dc, coords, size=1):
+        dc.DrawEllipseList(self._rects(coords, size))
 
     def _dot(self, dc, coords, size=1):
         dc.DrawPointList(coords)
 
     def _square(self, dc, coords, size=1):
-        fact = 2.5 * size
-        wh = 5.0 * size
-        rect = np.zeros((len(coords), 4), np.float) + [0.0, 0.0, wh, wh]
-        rect[:, 0:2] = coords - [fact, fact]
-        dc.DrawRectangleList(rect.astype(np.int32))
+        dc.DrawRectangleList(self._rects(coords, size))
 
     def _triangle(self, dc, coords, size=1):
         shape = [(-2.5 * size, 1.44 * size),
                  (2.5 * size, 1.44 * size), (0.0, -2.88 * size)]
-        poly = np.repeat(coords, 3, 0)
-        poly.shape = (len(coords), 3, 2)
-        poly += shape
-        dc.DrawPolygonList(poly.astype(np.int32))
+        dc.DrawPolygonList(self._polygons(coords, shape))
 
     def _triangle_down(self, dc, coords, size=1):
         shape = [(-2.5 * size, -1.44 * size),
                  (2.5 * size, -1.44 * size), (0.0, 2.88 * size)]
-        poly = np.repeat(coords, 3, 0)
-        poly.shape = (len(coords), 3, 2)
-        poly += shape
-        dc.DrawPolygonList(poly.astype(np.int32))
+        dc.DrawPolygonList(self._polygons(coords, shape))
 
     def _cross(self, dc, coords, size=1):
         fact = 2.5 * size
-        for f in [[-fact, -fact, fact, fact], [-fact, fact, fact, -fact]]:
-            lines = np.concatenate((coords, coords), axis=1) + f
-            dc.DrawLineList(lines.astype(np.int32))
+        offsets = [[-fact, -fact, fact, fact], [-fact, fact, fact, -fact]]
+        dc.DrawLineList(self._lines(coords, offsets))
 
     def _plus(self, dc, coords, size=1):
         fact = 2.5 * size
-        for f in [[-fact, 0, fact, 0], [0, -fact, 0, fact]]:
-            lines = np.concatenate((coords, coords), axis=1) + f
-            dc.DrawLineList(lines.astype(np.int32))
+        offsets = [[-fact, 0, fact, 0], [0, -fact, 0, fact]]
+        dc.DrawLineList(self._lines(coords, offsets))
 
 
 class PolyBarsBase(PolyPoints):
@@ -1194,11 +1799,7 @@ class PolyBoxPlot(PolyPoints):
 
         # Draw the outliers
         size = 0.5
-        fact = 2.5 * size
-        wh = 5.0 * size
-        rect = np.zeros((len(pt_data), 4), np.float) + [0.0, 0.0, wh, wh]
-        rect[:, 0:2] = pt_data - [fact, fact]
-        dc.DrawRectangleList(rect.astype(np.int32))
+        dc.DrawRectangleList(PolyMarker._rects(pt_data, size))
 
 
 class PlotGraphics(object):
@@ -320,5 +320,352 @@ def pairwise(iterable):
     next(b, None)
     return zip(a, b)
 
+def minmax_decimate(points, xmin=None, xmax=None):
+    """
+    Reduce a line to what is visible at screen resolution.
+
+    The points are binned into pixel columns and, for every column, only
+    the first, minimum, maximum and last points are kept (in their original
+    order). A line drawn through the remaining points looks the same as the
+    full line once it is rasterized.
+
+    Points outside of ``[xmin, xmax]`` are dropped, except for the
+    neighbours of the visible range, so that lines entering or leaving the
+    visible area are still drawn.
+
+    :param points: The scaled (screen coordinate) points. The x values must
+                   be sorted in increasing order.
+    :type points: numpy array of shape ``(n, 2)``
+    :param xmin: The leftmost visible x value, or ``None`` for no limit.
+    :type xmin: float
+    :param xmax: The rightmost visible x value, or ``None`` for no limit.
+    :type xmax: float
+    :returns: The sorted indices of the points to draw.
+    :rtype: numpy array of int
+    """
+    x = points[:, 0]
+    y = points[:, 1]
+    n = len(x)
+
+    # only look at the visible points, plus one on either side
+    lo = 0
+    hi = n
+    if xmin is not None:
+        lo = max(int(np.searchsorted(x, xmin, side='left')) - 1, 0)
+    if xmax is not None:
+        hi = min(int(np.searchsorted(x, xmax, side='right')) + 1, n)
+    if hi - lo <= 0:
+        return np.arange(0, dtype=np.intp)
+
+    x = x[lo:hi]
+    y = y[lo:hi]
+    count = hi - lo
+
+    # split into runs of points that fall in the same pixel column
+    cols = np.floor(x)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(cols)) + 1))
+    if 4 * len(starts) >= count:
+        # nothing to gain
+        return np.arange(lo, hi)
+    ends = np.concatenate((starts[1:], [count])) - 1
+    segment = np.repeat(np.arange(len(starts)), np.diff(
+        np.concatenate((starts, [count]))))
+
+    index = np.arange(count)
+    # fmin/fmax ignore NaN values
+    ymin = np.fmin.reduceat(y, starts)
+    ymax = np.fmax.reduceat(y, starts)
+    imin = np.minimum.reduceat(np.where(y == ymin[segment], index, count),
+                               starts)
+    imax = np.minimum.reduceat(np.where(y == ymax[segment], index, count),
+                               starts)
+    # all-NaN columns: fall back to the first point
+    imin = np.where(imin >= count, starts, imin)
+    imax = np.where(imax >= count, starts, imax)
+
+    keep = np.sort(np.column_stack((starts, imin, imax, ends)), axis=1)
+    keep = keep.ravel()
+    keep = keep[np.concatenate(([True], np.diff(keep) != 0))]
+    return keep + lo
+
+
+def pixel_decimate(points, bbox=None, margin=0):
+    """
+    Reduce a set of markers to what is visible at screen resolution.
+
+    Markers that round to the same pixel are drawn on top of each other, so
+    only one of them is kept. Markers that lie outside of ``bbox`` (grown by
+    ``margin``) are dropped as well.
+
+    :param points: The scaled (screen coordinate) points.
+    :type points: numpy array of shape ``(n, 2)``
+    :param bbox: The visible area as ``(x, y, width, height)``, or ``None``
+                 for no limit.
+    :type bbox: tuple of 4 numbers
+    :param margin: How far outside of ``bbox`` a point may be and still be
+                   drawn. Usually the size of the marker.
+    :type margin: float
+    :returns: The sorted indices of the points to draw.
+    :rtype: numpy array of int
+    """
+    index = np.arange(len(points))
+    if bbox is not None:
+        x, y, w, h = bbox
+        with np.errstate(invalid='ignore'):
+            visible = ((points[:, 0] >= x - margin)
+                       & (points[:, 0] <= x + w + margin)
+                       & (points[:, 1] >= y - margin)
+                       & (points[:, 1] <= y + h + margin))
+        index = index[visible]
+        points = points[visible]
+    if len(points) == 0:
+        return index
+
+    pix = np.round(points).astype(np.int64)
+    pix -= pix.min(axis=0)
+    key = pix[:, 0] * (int(pix[:, 1].max()) + 1) + pix[:, 1]
+    _, first = np.unique(key, return_index=True)
+    return index[np.sort(first)]
+
+
+def stamp_sprite(sprite, points, size):
+    """
+    Composite a copy of ``sprite`` centered on each of ``points``.
+
+    This draws any number of identical markers into a single image, so that
+    they can be blitted with one ``DrawBitmap`` call. Later points are drawn
+    on top of earlier ones, just like drawing the markers one at a time.
+
+    :param sprite: The marker image, with a transparent (zero) alpha channel
+                   everywhere the marker was not drawn.
+    :type sprite: numpy uint8 array of shape ``(h, w, 4)``
+    :param points: The pixel coordinates of the marker centers, relative to
+                   the top left corner of the image.
+    :type points: numpy array of shape ``(n, 2)``
+    :param size: The ``(width, height)`` of the image.
+    :type size: tuple of 2 ints
+    :returns: The RGBA image.
+    :rtype: numpy uint8 array of shape ``(height, width, 4)``
+    """
+    width, height = size
+    sh, sw = sprite.shape[:2]
+    ys, xs = np.nonzero(sprite[:, :, 3])
+    if len(ys) == 0 or len(points) == 0:
+        return np.zeros((height, width, 4), np.uint8)
+
+    points = np.asarray(points, np.float64)
+    with np.errstate(invalid='ignore'):
+        corner = points - (sw // 2, sh // 2)
+        visible = ((corner[:, 0] > -sw) & (corner[:, 0] < width)
+                   & (corner[:, 1] > -sh) & (corner[:, 1] < height))
+    corner = np.round(corner[visible]).astype(np.int64)
+
+    # Draw into an image with a border as wide as the sprite, so that no
+    # marker pixel needs to be clipped; the border is cut off at the end.
+    pwidth = width + 2 * sw
+    padded = np.zeros((height + 2 * sh, pwidth, 4), np.uint8)
+    flat = padded.view(np.uint32).reshape(-1)
+    base = (corner[:, 1] + sh) * pwidth + corner[:, 0] + sw
+    offsets = ys * pwidth + xs
+    pixels = sprite[ys, xs].copy().view(np.uint32).reshape(-1)
+
+    if len(base) and (pixels == pixels[0]).all():
+        # A single colour, so the drawing order does not matter.
+        for offset in offsets:
+            flat[base + offset] = pixels[0]
+    elif len(base):
+        # An outline in a different colour than the fill: every image pixel
+        # takes its colour from the last marker that covers it.
+        # Markers on the same pixel are hidden by the last one of them,
+        # which also makes the pixels of every pass below unique.
+        _, last = np.unique(base[::-1], return_index=True)
+        order = np.sort(len(base) - 1 - last)
+        base = base[order]
+        owner = np.full(len(flat), -1, np.int64)
+        for offset in offsets:
+            target = base + offset
+            owner[target] = np.maximum(owner[target], order)
+        for offset, pixel in zip(offsets, pixels):
+            target = base + offset
+            flat[target[owner[target] == order]] = pixel
+
+    return np.ascontiguousarray(padded[sh:sh + height, sw:sw + width])
+
+
+class PointIndex(object):
+    """
+    Spatial index for nearest-point lookups on a fixed set of points.
+
+    If the x values are sorted, the lookup is a binary search on x followed
+    by a distance check of the points in a narrow x band. Otherwise the
+    points are sorted into a uniform grid, and the lookup searches the grid
+    cells in rings around the query point until no closer point can exist.
+
+    A uniform grid does not help with heavily clustered points: if a single
+    cell holds too many of the points, or if no point is found in the first
+    rings around the query point, all the points are checked instead, which
+    is never much slower than a brute-force search.
+
+    The result is the same as a brute-force search: the index of the
+    closest point, and the lowest such index if several are equally close.
+
+    :param points: The points to index.
+    :type points: numpy array of shape ``(n, 2)``
+    """
+    # number of neighbours used to get the first estimate on sorted data
+    _probe = 8
+    # average number of points per grid cell
+    _cellPoints = 4
+    # the grid is not used if one cell holds more than this share of the points
+    _maxCellShare = 0.02
+    # rings searched for a first point before checking all the points
+    _maxRings = 16
+
+    def __init__(self, points):
+        self._points = np.asarray(points, dtype=np.float64)
+        x = self._points[:, 0]
+        self._sortedX = bool(np.all(x[1:] >= x[:-1]))
+        if not self._sortedX:
+            self._buildGrid()
+
+    def _buildGrid(self):
+        """ Sort the (finite) points into grid cells. """
+        finite = np.flatnonzero(np.isfinite(self._points).all(axis=1))
+        pts = self._points[finite]
+        if len(pts) == 0:
+            self._grid = None
+            return
+
+        origin = pts.min(axis=0)
+        span = pts.max(axis=0) - origin
+        ncells = max(len(pts) // self._cellPoints, 1)
+        area = span[0] * span[1]
+        if area > 0:
+            cell = np.sqrt(area / ncells)
+        else:
+            cell = max(span.max() / ncells, 1e-12)
+        shape = (span // cell).astype(np.int64) + 1
+
+        cells = ((pts - origin) // cell).astype(np.int64)
+        cells = np.minimum(cells, shape - 1)
+        keys = cells[:, 0] * shape[1] + cells[:, 1]
+        order = np.argsort(keys, kind='mergesort')
+
+        # the number of points in the fullest cell
+        sortedKeys = keys[order]
+        bounds = np.flatnonzero(np.diff(sortedKeys)) + 1
+        fullest = np.diff(np.concatenate(([0], bounds, [len(keys)]))).max()
+        if fullest > max(self._cellPoints * 16, self._maxCellShare * len(pts)):
+            # clustered points: the grid would not be faster
+            self._grid = None
+            return
+
+        self._grid = (origin, cell, shape)
+        self._keys = sortedKeys
+        self._order = finite[order]
+
+    def nearest(self, pnt):
+        """
+        Find the point closest to ``pnt``.
+
+        :param pnt: The ``(x, y)`` point to look up.
+        :returns: ``(index, distance)`` of the closest point.
+        :rtype: tuple
+        """
+        pnt = np.asarray(pnt, dtype=np.float64)
+        if self._sortedX:
+            candidates = self._candidatesSorted(pnt)
+        else:
+            candidates = self._candidatesGrid(pnt)
+        if candidates is None:
+            # check all the points
+            d = np.sqrt(np.add.reduce((self._points - pnt) ** 2, 1))
+            i = np.argmin(d)
+            return int(i), d[i]
+
+        d = np.sqrt(np.add.reduce((self._points[candidates] - pnt) ** 2, 1))
+        i = np.argmin(d)
+        if np.isnan(d[i]):
+            # only NaN distances: behave like the brute-force search
+            return int(candidates[i]), d[i]
+        best = candidates[d == d[i]].min()
+        return int(best), d[i]
+
+    def _candidatesSorted(self, pnt):
+        """ Indices of the points that may be closest, for sorted x. """
+        x = self._points[:, 0]
+        n = len(x)
+        i = int(np.searchsorted(x, pnt[0]))
+        lo = max(i - self._probe, 0)
+        hi = min(i + self._probe, n)
+        d = np.sqrt(np.add.reduce((self._points[lo:hi] - pnt) ** 2, 1))
+        if len(d) == 0 or not np.isfinite(d).any():
+            return None
+        bound = np.nanmin(d)
+        # nothing outside of this x band can be closer
+        lo = int(np.searchsorted(x, pnt[0] - bound, side='left'))
+        hi = int(np.searchsorted(x, pnt[0] + bound, side='right'))
+        return np.arange(lo, hi)
+
+    def _candidatesGrid(self, pnt):
+        """ Indices of the points that may be closest, from the grid. """
+        if self._grid is None:
+            return None
+        origin, cell, shape = self._grid
+        q = np.floor((pnt - origin) / cell).astype(np.int64)
+
+        # first and last ring that touch the grid
+        r = max(0, -q[0], -q[1], q[0] - shape[0] + 1, q[1] - shape[1] + 1)
+        rmax = max(q[0], shape[0] - 1 - q[0], q[1], shape[1] - 1 - q[1])
+
+        found = []
+        bound = None
+        first = r
+        while r <= rmax:
+            if bound is not None and (r - 1) * cell > bound:
+                break
+            if (bound is None and r - first >= self._maxRings) or 8 * r > len(self._keys):
+                # far from all the points, or a ring has more cells than
+                # there are points: checking them all is faster
+                return None
+            ring = self._ringCells(q, r, shape)
+            if len(ring):
+                keys = ring[:, 0] * shape[1] + ring[:, 1]
+                starts = np.searchsorted(self._keys, keys, side='left')
+                counts = np.searchsorted(self._keys, keys, side='right') - starts
+                starts, counts = starts[counts > 0], counts[counts > 0]
+                if len(counts):
+                    # the positions of all the points of the ring's cells
+                    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+                    found.append(self._order[offsets + np.arange(len(offsets))])
+                if found and bound is None:
+                    pts = self._points[np.concatenate(found)]
+                    bound = np.sqrt(
+                        np.add.reduce((pts - pnt) ** 2, 1)).min()
+            r += 1
+
+        if not found:
+            return None
+        return np.concatenate(found)
+
+    @staticmethod
+    def _ringCells(q, r, shape):
+        """ Grid cells at chebyshev distance ``r`` from cell ``q``. """
+        if r == 0:
+            cells = np.array([q])
+        else:
+            span = np.arange(-r, r + 1)
+            inner = np.arange(-r + 1, r)
+            cells = np.concatenate((
+                np.column_stack((span, np.full(len(span), -r))),
+                np.column_stack((span, np.full(len(span), r))),
+                np.column_stack((np.full(len(inner), -r), inner)),
+                np.column_stack((np.full(len(inner), r), inner)),
+            )) + q
+        inside = ((cells[:, 0] >= 0) & (cells[:, 0] < shape[0])
+                  & (cells[:, 1] >= 0) & (cells[:, 1] < shape[1]))
+        return cells[inside]
+
+
 if __name__ == "__main__":
     raise RuntimeError("This module is not intended to be run by itself.")
@@ -7,6 +7,7 @@ import sys
 import inspect
 import tokenize
 import types
+import weakref
 import wx
 from six import BytesIO, PY3, string_types
 
@@ -34,7 +35,6 @@ def getAttributeNames(obj, includeMagic=1, includeSingle=1,
                       includeDouble=1):
     """Return list of unique attributes, including inherited, for obj."""
     attributes = []
-    dict = {}
     if not hasattrAlwaysReturnsTrue(obj):
         # Add some attributes that don't always get picked up.
         special_attrs = ['__bases__', '__class__', '__dict__', '__name__',
@@ -62,20 +62,21 @@ def getAttributeNames(obj, includeMagic=1, includeSingle=1,
         attrdict = getAllAttributeNames(obj)
         # Store the obj's dir.
         obj_dir = dir(obj)
-        for (obj_type_name, technique, count), attrlist in attrdict.items():
-            # This complexity is necessary to avoid accessing all the
-            # attributes of the obj.  This is very handy for objects
-            # whose attributes are lazily evaluated.
-            if type(obj).__name__ == obj_type_name and technique == 'dir':
+        obj_type_name = type(obj).__name__
+        names = set()
+        for (type_name, technique, count), attrlist in attrdict.items():
+            if type_name == obj_type_name and technique == 'dir':
                 attributes += attrlist
             else:
-                attributes += [attr for attr in attrlist \
-                               if attr not in obj_dir and hasattr(obj, attr)]
+                names.update(attrlist)
+        # This complexity is necessary to avoid accessing all the
+        # attributes of the obj.  This is very handy for objects
+        # whose attributes are lazily evaluated.
+        names.difference_update(obj_dir)
+        attributes += [attr for attr in names if hasattr(obj, attr)]
 
     # Remove duplicates from the attribute list.
-    for item in attributes:
-        dict[item] = None
-    attributes = dict.keys()
+    attributes = set(attributes)
     # new-style swig wrappings can result in non-string attributes
     # e.g. ITK http://www.itk.org/
     attributes = [attribute for attribute in attributes \
@@ -132,7 +133,7 @@ def getAllAttributeNames(obj):
             # classes.
             pass
         else:
-            attrdict.update(getAllAttributeNames(klass))
+            attrdict.update(getClassAttributeNames(klass))
     # Also get attributes from any and all parent classes.
     try:
         bases = obj.__bases__
@@ -145,9 +146,41 @@ def getAllAttributeNames(obj):
                     # Break a circular reference. Happens in Python 2.2.
                     pass
                 else:
-                    attrdict.update(getAllAttributeNames(base))
+                    attrdict.update(getClassAttributeNames(base))
     return attrdict
 
+_classAttributeNames = weakref.WeakKeyDictionary()
+
+def getClassAttributeNames(klass):
+    """Return dict of all attributes, including inherited, for a class.
+
+    Same as getAllAttributeNames(), but the dict is cached per class,
+    until attributes are added to or removed from the class, its base
+    classes or its metaclass.  The dict must not be changed."""
+    try:
+        version = _getClassVersion(klass)
+        cached = _classAttributeNames.get(klass)
+    except Exception:  # Not weakly referenceable, or has no proper __mro__.
+        version = cached = None
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    attrdict = getAllAttributeNames(klass)
+    if version is not None:
+        try:
+            _classAttributeNames[klass] = (version, attrdict)
+        except TypeError:  # Not weakly referenceable.
+            pass
+    return attrdict
+
+def _getClassVersion(klass):
+    """Return a tuple that changes when attributes are added to or
+    removed from a class, its base classes or its metaclass."""
+    classes = inspect.getmro(klass) + inspect.getmro(type(klass))
+    return tuple([(id(cls), len(cls.__dict__)) for cls in classes])
+
+_callTips = weakref.WeakKeyDictionary()
+_builtinCallTips = {}
+
 def getCallTip(command='', locals=None):
     """For a command, return a tuple of object name, argspec, tip text.
 
@@ -162,8 +195,54 @@ def getCallTip(command='', locals=None):
             obj = eval(root)
     except:
         return calltip
-    name = ''
+    return getObjectCallTip(obj)
+
+def getObjectCallTip(obj):
+    """For an object, return a tuple of object name, argspec, tip text.
+
+    The call tip is cached per callable, until its doc, code or
+    defaults change."""
     obj, dropSelf = getBaseObject(obj)
+    cache, key = _getCallTipKey(obj)
+    stamp = (type(obj), dropSelf, getattr(obj, '__code__', None),
+             getattr(obj, '__defaults__', None))
+    doc = getattr(obj, '__doc__', None)
+    try:
+        cachedStamp, cachedDoc, calltip = cache[key]
+    except Exception:  # Not cached, or not weakly referenceable.
+        pass
+    else:
+        # Builtins make a new doc string every time, so compare them.
+        if all(a is b for a, b in zip(cachedStamp, stamp)) and \
+               cachedDoc == doc:
+            return calltip
+    calltip = _getCallTip(obj, dropSelf)
+    try:
+        cache[key] = (stamp, doc, calltip)
+    except Exception:
+        pass
+    return calltip
+
+def _getCallTipKey(obj):
+    """Return the cache and the key to keep the call tip of obj in."""
+    if hasattr(obj, '__func__'):
+        # Bound methods are made anew every time, so key on their function.
+        return _callTips, obj.__func__
+    if inspect.isbuiltin(obj) or hasattr(obj, '__objclass__'):
+        # Builtin and wrapped methods are made anew every time too, and
+        # can't be weakly referenced, so key on their owner and name.
+        owner = getattr(obj, '__self__', None)
+        if owner is None:
+            owner = getattr(obj, '__objclass__', None)
+        if not isinstance(owner, (type, types.ModuleType)):
+            owner = type(owner)
+        return _builtinCallTips, (owner, getattr(obj, '__module__', None),
+                                  getattr(obj, '__name__', None))
+    return _callTips, obj
+
+def _getCallTip(obj, dropSelf):
+    """Return a tuple of object name, argspec, tip text for a base object."""
+    name = ''
     try:
         name = obj.__name__
     except AttributeError:
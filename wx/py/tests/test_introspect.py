@@ -854,5 +854,49 @@ class GetConstructorTestCase(unittest.TestCase):
             self.assertEqual(varnames, args)
 
 
+class R(object):
+    def spam(self, a, b=1):
+        """Return spam."""
+
+class S(R):
+    pass
+
+class CacheTestCase(unittest.TestCase):
+
+    def test_getAttributeNames_ClassChanged(self):
+        s = S()
+        self.failIf('eggs' in introspect.getAttributeNames(s))
+        R.eggs = 1
+        try:
+            self.assert_('eggs' in introspect.getAttributeNames(s))
+        finally:
+            del R.eggs
+        self.failIf('eggs' in introspect.getAttributeNames(s))
+
+    def test_getClassAttributeNames_Cached(self):
+        attrdict = introspect.getClassAttributeNames(S)
+        self.assert_(introspect.getClassAttributeNames(S) is attrdict)
+        self.assertEqual(attrdict, introspect.getAllAttributeNames(S))
+
+    def test_getObjectCallTip_Cached(self):
+        s = S()
+        calltip = introspect.getObjectCallTip(s.spam)
+        self.assertEqual(calltip[0], 'spam')
+        self.assert_(introspect.getObjectCallTip(s.spam) is calltip)
+        R.__dict__['spam'].__doc__ = 'Return eggs.'
+        try:
+            self.assert_('eggs' in introspect.getObjectCallTip(s.spam)[2])
+        finally:
+            R.__dict__['spam'].__doc__ = 'Return spam.'
+
+    def test_getObjectCallTip_Builtin(self):
+        calltip = introspect.getObjectCallTip([].append)
+        self.assert_(introspect.getObjectCallTip([].append) is calltip)
+        calltip = introspect.getObjectCallTip(dict.get)
+        self.assert_(introspect.getObjectCallTip(dict.get) is calltip)
+        self.assertNotEqual(introspect.getObjectCallTip(len),
+                            introspect.getObjectCallTip(abs))
+
+
 if __name__ == '__main__':
     unittest.main()